@@ -1,1411 +1,506 @@
 from __future__ import annotations
 
+import asyncio
 import datetime
+from contextlib import asynccontextmanager
+from contextlib import suppress
+from typing import Annotated
 from typing import Any
+from typing import AsyncIterator
+from typing import Awaitable
+from typing import Callable
 from typing import Dict
+from typing import Iterator
+from typing import Literal
 
-import httpx
+from fastapi import Depends
 from fastapi import FastAPI
+from fastapi import Query
+from fastapi import Request
+from fastapi import Response
 from fastapi.encoders import jsonable_encoder
 from fastapi.responses import JSONResponse
+from fastapi.responses import StreamingResponse
+from sqlalchemy import Row  # noqa: TC002
+from sqlalchemy.orm import Session  # noqa: TC002
 from starlette.applications import Starlette
 from starlette.middleware import Middleware
 from starlette.middleware.cors import CORSMiddleware
 from starlette.routing import Mount
 
 from gw2tp.constants import API
-from gw2tp.constants import TAX_RATE
-from gw2tp.constants import ItemIDs
-from gw2tp.constants import Kits
-from gw2tp.helper import copper_to_gsc
+from gw2tp.helper import get_sub_dct
 from gw2tp.helper import gsc_dict_to_copper
-from gw2tp.helper import host_url
 
-from backend.db import SessionLocal
+from backend.commerce import ItemsNotFoundError
+from backend.commerce import circuit_breaker
+from backend.commerce import close_client
+from backend.commerce import missing_item_ids
+from backend.commerce import open_client
+from backend.commerce import price_cache
+from backend.config import FLIP_SCAN_ENABLED
+from backend.config import RETENTION_ROLLUP
+from backend.config import SCHEDULER_ENABLED
+from backend.db import get_db
+from backend.db import init_db
+from backend.db import pool_stats
+from backend.db import session_scope
+from backend.db_schema import HistoryCursor
 from backend.db_schema import get_db_data
+from backend.db_schema import iter_db_data
+from backend.db_schema import timestamp_now
+from backend.flips import FlipSort
+from backend.flips import market_scanner
+from backend.flips import run_market_scanner
+from backend.history import Aggregation
+from backend.history import Bucket
+from backend.history import HistoryFormat
+from backend.history import build_history
+from backend.history import history_record
+from backend.history import to_ndjson
+from backend.listings import fetch_listings
+from backend.scheduler import scheduler_health
 from backend.scheduler import start_scheduler
+from backend.scheduler import stop_scheduler
+from backend.sections import SECTIONS
+from backend.sections import STACK_SIZE
+from backend.sections import Section
+from backend.sections import compute_sections
+from backend.sections import section_item_ids
+from backend.snapshot import get_prices
+from backend.snapshot import is_stale
+from backend.snapshot import run_snapshot_poller
+from backend.snapshot import snapshot
+from backend.stream import broadcaster
+from backend.stream import stream_events
 
 
-api_base = host_url()
 fastapi_app = FastAPI()
+HISTORY_WINDOW = datetime.timedelta(hours=24)
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
 
 
-def get_sub_dct(
-    item_name: str,
-    copper_price: float,
-) -> Dict[str, Any]:
-    g, s, c = copper_to_gsc(copper_price)
-    return {
-        f"{item_name}_g": g,
-        f"{item_name}_s": s,
-        f"{item_name}_c": c,
-    }
-
-
-def fetch_tp_prices(
-    item_ids: list[int],
-) -> dict[int, dict[str, Any]]:
-    params = {"ids": ",".join(str(i) for i in item_ids)}
-    with httpx.Client() as client:
-        response = client.get(
-            API.GW2_COMMERCE_API_URL,
-            params=params,
-            timeout=10.0,
-        )
-    response.raise_for_status()
-    data: list[dict[str, Any]] = response.json()
-    if len(data) == 0:
-        raise RuntimeError("No items found")
-
-    fetched_data: dict[int, dict[str, Any]] = {}
-    for item in data:
-        item_id = int(item["id"])
-        buy_price = int(item["buys"]["unit_price"])
-        sell_price = int(item["sells"]["unit_price"])
-        flip_profit = int(round(sell_price * TAX_RATE, 6) - buy_price)
-        buy_g, buy_s, buy_c = copper_to_gsc(buy_price)
-        sell_g, sell_s, sell_c = copper_to_gsc(sell_price)
-        flip_g, flip_s, flip_c = copper_to_gsc(flip_profit)
-
-        fetched_data[item_id] = {
-            "buy": buy_price,
-            "sell": sell_price,
-            "buy_g": buy_g,
-            "buy_s": buy_s,
-            "buy_c": buy_c,
-            "sell_g": sell_g,
-            "sell_s": sell_s,
-            "sell_c": sell_c,
-            "flip_g": flip_g,
-            "flip_s": flip_s,
-            "flip_c": flip_c,
-            "sell_after_tax_g": int(sell_price * TAX_RATE // 10_000),
-            "sell_after_tax_s": int((sell_price * TAX_RATE % 10_000) // 100),
-            "sell_after_tax_c": int(sell_price * TAX_RATE % 100),
-        }
-    return fetched_data
-
-
-def get_unid_gear_data(
-    gear_id: int,
-) -> dict[int, dict[str, float]] | None:
+def _query_item_ids(
+    request: Request,
+    key: str,
+) -> list[int] | None:
+    value = request.query_params.get(key)
     try:
-        fetched_data = fetch_tp_prices(
-            [
-                gear_id,
-                ItemIDs.ECTOPLASM,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.MIRTHIL,
-                ItemIDs.ELDER_WOOD,
-                ItemIDs.THICK_LEATHER,
-                ItemIDs.GOSSAMER_SCRAP,
-                ItemIDs.SILK_SCRAP,
-                ItemIDs.HARDENED_LEATHER,
-                ItemIDs.ANCIENT_WOOD_LOG,
-                ItemIDs.SYMBOL_OF_ENH,
-                ItemIDs.SYMBOL_OF_PAIN,
-                ItemIDs.ORICHALCUM_ORE,
-                ItemIDs.SYMBOL_OF_CONTROL,
-                ItemIDs.CHARM_OF_BRILLIANCE,
-                ItemIDs.CHARM_OF_POTENCE,
-                ItemIDs.CHARM_OF_SKILL,
-                ItemIDs.COMMON_GEAR,
-            ],
-        )
-    except Exception:
+        return [int(i) for i in value.split(",")] if value else []
+    except ValueError:
         return None
 
-    return fetched_data
-
-
-@fastapi_app.get("/history")
-async def get_item_history(
-    item_name: str,
-) -> JSONResponse:
-    db = SessionLocal()
-    end_datetime = datetime.datetime.now(
-        tz=datetime.timezone(datetime.timedelta(hours=2), "UTC")
-    )
-    start_datetime = end_datetime - datetime.timedelta(hours=24)
-    try:
-        data = get_db_data(
-            db,
-            item_name,
-            start_datetime=start_datetime,
-            end_datetime=end_datetime,
-        )
-        return JSONResponse(content=jsonable_encoder(data))
-    except Exception as e:
-        return JSONResponse(
-            content={"error": str(e)},
-            status_code=500,
-        )
-
-
-@fastapi_app.get("/price")
-async def get_price(
-    item_id: int,
-) -> JSONResponse:
-    try:
-        # with flask_app.app_context():
-        data = fetch_tp_prices([item_id])
-        return JSONResponse(content=jsonable_encoder(data[item_id]))
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-
-@fastapi_app.get("/rare_gear_salvage")
-def get_rare_gear_salvage() -> JSONResponse:
-    fetched_data = get_unid_gear_data(gear_id=ItemIDs.RARE_UNID_GEAR)
-    if fetched_data is None:
-        return JSONResponse(content=jsonable_encoder({"error"}))
-
-    stack_buy = fetched_data[ItemIDs.RARE_UNID_GEAR]["buy"] * 250.0
-    ecto_sell = fetched_data[ItemIDs.ECTOPLASM]["sell"]
-    lucent_mote_sell = fetched_data[ItemIDs.LUCENT_MOTE]["sell"]
-    mithril_sell = fetched_data[ItemIDs.MIRTHIL]["sell"]
-    elder_wood_sell = fetched_data[ItemIDs.ELDER_WOOD]["sell"]
-    thick_leather_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
-    gossamer_scrap_sell = fetched_data[ItemIDs.GOSSAMER_SCRAP]["sell"]
-    silk_scrap_sell = fetched_data[ItemIDs.SILK_SCRAP]["sell"]
-    hardened_sell = fetched_data[ItemIDs.HARDENED_LEATHER]["sell"]
-    ancient_wood_sell = fetched_data[ItemIDs.ANCIENT_WOOD_LOG]["sell"]
-    symbol_of_enh_sell = fetched_data[ItemIDs.SYMBOL_OF_ENH]["sell"]
-    symbol_of_pain_sell = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["sell"]
-    orichalcum_sell = fetched_data[ItemIDs.ORICHALCUM_ORE]["sell"]
-    symbol_of_control_sell = fetched_data[ItemIDs.SYMBOL_OF_CONTROL]["sell"]
-    charm_of_brilliance_sell = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["sell"]
-    charm_of_potence_sell = fetched_data[ItemIDs.CHARM_OF_POTENCE]["sell"]
-    charm_of_skill_sell = fetched_data[ItemIDs.CHARM_OF_SKILL]["sell"]
-
-    mats_value_after_tax = (
-        mithril_sell * (250.0 * 0.4879) * TAX_RATE
-        + elder_wood_sell * (250.0 * 0.3175) * TAX_RATE
-        + silk_scrap_sell * (250.0 * 0.3367) * TAX_RATE
-        + thick_leather_sell * (250.0 * 0.3457) * TAX_RATE
-        + orichalcum_sell * (250.0 * 0.041) * TAX_RATE
-        + ancient_wood_sell * (250.0 * 0.0249) * TAX_RATE
-        + gossamer_scrap_sell * (250.0 * 0.018) * TAX_RATE
-        + hardened_sell * (250.0 * 0.0162) * TAX_RATE
-        + ecto_sell * (250.0 * 0.87) * TAX_RATE  # lowered
-        + lucent_mote_sell * (250.0 * 0.2387) * TAX_RATE
-        + symbol_of_control_sell * (250.0 * 0.001) * TAX_RATE
-        + symbol_of_enh_sell * (250.0 * 0.0003) * TAX_RATE
-        + symbol_of_pain_sell * (250.0 * 0.0004) * TAX_RATE
-        + charm_of_brilliance_sell * (250.0 * 0.0006) * TAX_RATE
-        + charm_of_potence_sell * (250.0 * 0.0009) * TAX_RATE
-        + charm_of_skill_sell * (250.0 * 0.0009) * TAX_RATE
-    )
 
-    salvage_costs = Kits.SILVER_FED * 250.0
-
-    profit_stack = mats_value_after_tax - stack_buy - salvage_costs
-
-    data = {
-        **get_sub_dct("stack_buy", stack_buy),
-        **get_sub_dct("salvage_costs", salvage_costs),
-        **get_sub_dct("mats_value_after_tax", mats_value_after_tax),
-        **get_sub_dct("profit_stack", profit_stack),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/krait_shield_craft")
-def get_krait_shield_craft() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.ECTOPLASM,
-                ItemIDs.MITHRIL_INGOT,
-                ItemIDs.MITHRIL_ORE,
-                ItemIDs.ELDER_WOOD_PLANK,
-                ItemIDs.ELDER_WOOD_LOG,
-                ItemIDs.LARGE_CLAW,
-                ItemIDs.POTENT_BLOOD,
-                ItemIDs.LARGE_BONE,
-                ItemIDs.INTRICATE_TOTEM,
-                ItemIDs.LARGE_FANG,
-                ItemIDs.POTENT_VENOM_SAC,
-            ],
-        )
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    ecto_sell_after_tax = fetched_data[ItemIDs.ECTOPLASM]["sell"] * TAX_RATE
-    mithril_ore_buy = fetched_data[ItemIDs.MITHRIL_ORE]["buy"]
-    mithril_ingot_buy = fetched_data[ItemIDs.MITHRIL_INGOT]["buy"]
-    elder_wood_log_buy = fetched_data[ItemIDs.ELDER_WOOD_LOG]["buy"]
-    elder_wood_plank_buy = fetched_data[ItemIDs.ELDER_WOOD_PLANK]["buy"]
-    large_claw_buy = fetched_data[ItemIDs.LARGE_CLAW]["buy"]
-    potent_blood_buy = fetched_data[ItemIDs.POTENT_BLOOD]["buy"]
-    large_bone_buy = fetched_data[ItemIDs.LARGE_BONE]["buy"]
-    intricate_totem_buy = fetched_data[ItemIDs.INTRICATE_TOTEM]["buy"]
-    large_fang_buy = fetched_data[ItemIDs.LARGE_FANG]["buy"]
-    potent_sac_buy = fetched_data[ItemIDs.POTENT_VENOM_SAC]["buy"]
-
-    lowest_t5_mat = min(
-        large_claw_buy,
-        potent_blood_buy,
-        large_bone_buy,
-        intricate_totem_buy,
-        large_fang_buy,
-        potent_sac_buy,
-    )
-
-    crafting_cost_ingot = (
-        mithril_ingot_buy
-        if mithril_ingot_buy < 2.0 * mithril_ore_buy
-        else mithril_ore_buy * 2.0
-    )
-    crafting_cost_plank = (
-        elder_wood_plank_buy
-        if elder_wood_plank_buy < 3.0 * elder_wood_log_buy
-        else elder_wood_log_buy * 3.0
-    )
-
-    crafting_cost_backing = 2.0 * crafting_cost_ingot
-    crafting_cost_boss = 2.0 * crafting_cost_ingot
-    crafting_cost_dowwl = 2.0 * crafting_cost_plank + 3.0 * crafting_cost_ingot
-    crafting_cost_inscr = 15.0 * lowest_t5_mat + 2.0 * crafting_cost_dowwl
-
-    crafting_cost_with_cheap_materials = (
-        crafting_cost_inscr + crafting_cost_backing + crafting_cost_boss
-    )
-    rare_gear_craft_profit = (
-        ecto_sell_after_tax * 0.9 - crafting_cost_with_cheap_materials
-    )
-
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost_with_cheap_materials),
-        **get_sub_dct("ecto_sell_after_tax", ecto_sell_after_tax),
-        **get_sub_dct("profit", rare_gear_craft_profit),
-    }
-
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/krait_trident_craft")
-def get_krait_trident_craft() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.ECTOPLASM,
-                ItemIDs.MITHRIL_INGOT,
-                ItemIDs.MITHRIL_ORE,
-                ItemIDs.ELDER_WOOD_PLANK,
-                ItemIDs.ELDER_WOOD_LOG,
-                ItemIDs.LARGE_CLAW,
-                ItemIDs.POTENT_BLOOD,
-                ItemIDs.LARGE_BONE,
-                ItemIDs.INTRICATE_TOTEM,
-                ItemIDs.LARGE_FANG,
-                ItemIDs.POTENT_VENOM_SAC,
-            ],
-        )
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    ecto_sell_after_tax = fetched_data[ItemIDs.ECTOPLASM]["sell"] * TAX_RATE
-    mithril_ore_buy = fetched_data[ItemIDs.MITHRIL_ORE]["buy"]
-    mithril_ingot_buy = fetched_data[ItemIDs.MITHRIL_INGOT]["buy"]
-    elder_wood_log_buy = fetched_data[ItemIDs.ELDER_WOOD_LOG]["buy"]
-    elder_wood_plank_buy = fetched_data[ItemIDs.ELDER_WOOD_PLANK]["buy"]
-    large_claw_buy = fetched_data[ItemIDs.LARGE_CLAW]["buy"]
-    potent_blood_buy = fetched_data[ItemIDs.POTENT_BLOOD]["buy"]
-    large_bone_buy = fetched_data[ItemIDs.LARGE_BONE]["buy"]
-    intricate_totem_buy = fetched_data[ItemIDs.INTRICATE_TOTEM]["buy"]
-    large_fang_buy = fetched_data[ItemIDs.LARGE_FANG]["buy"]
-    potent_sac_buy = fetched_data[ItemIDs.POTENT_VENOM_SAC]["buy"]
-
-    lowest_t5_mat = min(
-        large_claw_buy,
-        potent_blood_buy,
-        large_bone_buy,
-        intricate_totem_buy,
-        large_fang_buy,
-        potent_sac_buy,
-    )
-
-    crafting_cost_ingot = (
-        mithril_ingot_buy
-        if mithril_ingot_buy < 2.0 * mithril_ore_buy
-        else mithril_ore_buy * 2.0
-    )
-    crafting_cost_plank = (
-        elder_wood_plank_buy
-        if elder_wood_plank_buy < 3.0 * elder_wood_log_buy
-        else elder_wood_log_buy * 3.0
-    )
-
-    crafting_cost_trident_head = 2.0 * crafting_cost_ingot
-    crafting_cost_trident_shaft = 2.0 * crafting_cost_plank
-    crafting_cost_dowwl = 2.0 * crafting_cost_plank + 3.0 * crafting_cost_ingot
-    crafting_cost_inscr = 15.0 * lowest_t5_mat + 2.0 * crafting_cost_dowwl
-
-    crafting_cost_with_cheap_materials = (
-        crafting_cost_inscr
-        + crafting_cost_trident_head
-        + crafting_cost_trident_shaft
-    )
-    rare_gear_craft_profit = (
-        ecto_sell_after_tax * 0.9 - crafting_cost_with_cheap_materials
-    )
-
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost_with_cheap_materials),
-        **get_sub_dct("ecto_sell_after_tax", ecto_sell_after_tax),
-        **get_sub_dct("profit", rare_gear_craft_profit),
+def _snapshot_item_ids(
+    request: Request,
+    path: str,
+) -> list[int] | None:
+    # Item IDs priced by a snapshot-backed route, None for other requests.
+    name = path.removeprefix("/")
+    if name in SECTIONS:
+        # Order book depth is not part of the snapshot.
+        if "depth" in request.query_params:
+            return None
+        return section_item_ids([name])
+    if name == "profits":
+        return section_item_ids(sorted(API.CRAFTS))
+    if name == "price":
+        item_ids = _query_item_ids(request, "item_id")
+        return item_ids if item_ids and len(item_ids) == 1 else None
+    if name == "batch":
+        sections = request.query_params.get("sections")
+        names = sections.split(",") if sections else list(SECTIONS)
+        item_ids = _query_item_ids(request, "item_ids")
+        if item_ids is None or not all(n in SECTIONS for n in names):
+            return None
+        return [*section_item_ids(names), *item_ids]
+    return None
+
+
+@fastapi_app.middleware("http")
+async def add_snapshot_etag(
+    request: Request,
+    call_next: Callable[[Request], Awaitable[Response]],
+) -> Response:
+    path = request.url.path.removeprefix(request.scope.get("root_path", ""))
+    etag = snapshot.etag
+    if request.method != "GET" or etag is None:
+        return await call_next(request)
+    item_ids = _snapshot_item_ids(request, path)
+    # Prices outside the snapshot come from the upstream cache, which the
+    # snapshot ETag does not cover.
+    if item_ids is None or not all(i in snapshot.prices for i in item_ids):
+        return await call_next(request)
+
+    headers = {
+        "ETag": etag,
+        "Cache-Control": f"max-age={snapshot.max_age()}",
     }
+    if_none_match = request.headers.get("if-none-match", "")
+    if etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=304, headers=headers)
 
-    return JSONResponse(content=jsonable_encoder(data))
+    response = await call_next(request)
+    if response.status_code == 200:
+        response.headers.update(headers)
+    return response
 
 
-@fastapi_app.get("/t5_mats_buy")
-def get_t5_mats_buy() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.LARGE_CLAW,
-                ItemIDs.POTENT_BLOOD,
-                ItemIDs.LARGE_BONE,
-                ItemIDs.INTRICATE_TOTEM,
-                ItemIDs.LARGE_FANG,
-                ItemIDs.POTENT_VENOM_SAC,
-                ItemIDs.LARGE_SCALE,
-            ],
-        )
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    large_claw_buy = fetched_data[ItemIDs.LARGE_CLAW]["buy"]
-    potent_blood_buy = fetched_data[ItemIDs.POTENT_BLOOD]["buy"]
-    large_bone_buy = fetched_data[ItemIDs.LARGE_BONE]["buy"]
-    intricate_totem_buy = fetched_data[ItemIDs.INTRICATE_TOTEM]["buy"]
-    large_fang_buy = fetched_data[ItemIDs.LARGE_FANG]["buy"]
-    venom_sac_buy = fetched_data[ItemIDs.POTENT_VENOM_SAC]["buy"]
-    large_scale_buy = fetched_data[ItemIDs.LARGE_SCALE]["buy"]
-
-    data = {
-        **get_sub_dct("large_claw", large_claw_buy),
-        **get_sub_dct("potent_blood", potent_blood_buy),
-        **get_sub_dct("large_bone", large_bone_buy),
-        **get_sub_dct("intricate_totem", intricate_totem_buy),
-        **get_sub_dct("large_fang", large_fang_buy),
-        **get_sub_dct("potent_venom", venom_sac_buy),
-        **get_sub_dct("large_scale", large_scale_buy),
-    }
-
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/mats_crafting_compare")
-def get_mats_crafting_compare() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.MITHRIL_INGOT,
-                ItemIDs.MITHRIL_ORE,
-                ItemIDs.ELDER_WOOD_PLANK,
-                ItemIDs.ELDER_WOOD_LOG,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.PILE_OF_LUCENT_CRYSTAL,
-            ],
-        )
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    mithril_ore_buy = fetched_data[ItemIDs.MITHRIL_ORE]["buy"]
-    mithril_ingot_buy = fetched_data[ItemIDs.MITHRIL_INGOT]["buy"]
-    elder_wood_log_buy = fetched_data[ItemIDs.ELDER_WOOD_LOG]["buy"]
-    elder_wood_plank_buy = fetched_data[ItemIDs.ELDER_WOOD_PLANK]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-    lucent_crystal_buy = fetched_data[ItemIDs.PILE_OF_LUCENT_CRYSTAL]["buy"]
-
-    lucent_mote_to_crystal = lucent_mote_buy * 10.0
-
-    data = {
-        **get_sub_dct("mithril_ore_to_ingot", mithril_ore_buy * 2.0),
-        **get_sub_dct("mithril_ingot_buy", mithril_ingot_buy),
-        **get_sub_dct("elder_wood_log_to_plank", elder_wood_log_buy * 3.0),
-        **get_sub_dct("elder_wood_plank_buy", elder_wood_plank_buy),
-        **get_sub_dct("lucent_mote_to_crystal", lucent_mote_to_crystal),
-        **get_sub_dct("lucent_crystal_buy", lucent_crystal_buy),
-    }
-
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/scholar_rune")
-def get_scholar_rune() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.ECTOPLASM,
-                ItemIDs.ELABORATE_TOTEM,
-                ItemIDs.PILE_OF_LUCENT_CRYSTAL,
-                ItemIDs.CHARM_OF_BRILLIANCE,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.SCHOLAR_RUNE,
-            ],
-        )
-    except Exception:
-        return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
-        )
-
-    ecto_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    totem_buy = fetched_data[ItemIDs.ELABORATE_TOTEM]["buy"]
-    lucent_crystal_buy = fetched_data[ItemIDs.PILE_OF_LUCENT_CRYSTAL]["buy"]
-    charm_buy = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-
-    scholar_rune_sell = fetched_data[ItemIDs.SCHOLAR_RUNE]["sell"]
-
-    crafting_cost = (
-        ecto_buy * 5.0
-        + totem_buy * 5.0
-        + lucent_crystal_buy * 8.0
-        + charm_buy * 2.0
-    )
-    crafting_cost2 = (
-        ecto_buy * 5.0
-        + totem_buy * 5.0
-        + lucent_mote_buy * 80.0
-        + charm_buy * 2.0
-    )
-
-    profit = scholar_rune_sell * TAX_RATE - crafting_cost
-    profit2 = scholar_rune_sell * TAX_RATE - crafting_cost2
-
-    cheap_crafting_cost = min(crafting_cost, crafting_cost2)
-    highest_profit = max(profit, profit2)
-
-    data = {
-        **get_sub_dct("crafting_cost", cheap_crafting_cost),
-        **get_sub_dct("sell", scholar_rune_sell),
-        **get_sub_dct("profit", highest_profit),
-    }
-
-    return JSONResponse(content=jsonable_encoder(data))
+def price_response(
+    data: Dict[str, Any],
+) -> JSONResponse:
+    content = {**data, "snapshot_age": snapshot.age(), "stale": is_stale()}
+    return JSONResponse(content=jsonable_encoder(content))
 
 
-@fastapi_app.get("/guardian_rune")
-def get_guardian_rune() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.GUARD_RUNE,
-                ItemIDs.PILE_OF_LUCENT_CRYSTAL,
-                ItemIDs.CHARGED_LODESTONE,
-                ItemIDs.CHARM_OF_POTENCE,
-                ItemIDs.ECTOPLASM,
-            ],
-        )
-    except Exception:
-        return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
-        )
+def _history_window(
+    start: datetime.datetime | None,
+    end: datetime.datetime | None,
+) -> tuple[datetime.datetime, datetime.datetime]:
+    end = end or timestamp_now()
+    return start or end - HISTORY_WINDOW, end
 
-    rune_sell = fetched_data[ItemIDs.GUARD_RUNE]["sell"]
-    charged_lodestone_sell = fetched_data[ItemIDs.CHARGED_LODESTONE]["sell"]
-    charm_buy = fetched_data[ItemIDs.CHARM_OF_POTENCE]["buy"]
-    ecto_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    lucent_crystal_buy = fetched_data[ItemIDs.PILE_OF_LUCENT_CRYSTAL]["buy"]
 
-    crafting_cost = (
-        charged_lodestone_sell
-        + charm_buy
-        + ecto_buy * 5.0
-        + lucent_crystal_buy * 12.0
+def _parse_cursor(
+    value: str,
+) -> HistoryCursor:
+    # "<ts>,<id>" from X-Next-Cursor, a bare timestamp is still accepted.
+    ts, _, row_id = value.partition(",")
+    return HistoryCursor(
+        ts=datetime.datetime.fromisoformat(ts),
+        id=int(row_id) if row_id else None,
     )
 
-    profit = rune_sell * TAX_RATE - crafting_cost
 
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost),
-        **get_sub_dct("sell", rune_sell),
-        **get_sub_dct("profit", profit),
-    }
+def _format_cursor(
+    row: Row[Any],
+) -> str:
+    return f"{row.ts.isoformat()},{row.id}"
 
-    return JSONResponse(content=jsonable_encoder(data))
 
-
-@fastapi_app.get("/dragonhunter_rune")
-def get_dragonhunter_rune() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.GUARD_RUNE,
-                ItemIDs.DRAGONHUNTER_RUNE,
-                ItemIDs.EVERGREEN_LODESTONE,
-                ItemIDs.BARBED_THORN,
-                ItemIDs.PILE_OF_LUCENT_CRYSTAL,
-                ItemIDs.CHARGED_LODESTONE,
-                ItemIDs.CHARM_OF_POTENCE,
-                ItemIDs.ECTOPLASM,
-            ],
-        )
-    except Exception:
-        return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
+def _stream_history(
+    item_name: str,
+    start_datetime: datetime.datetime,
+    end_datetime: datetime.datetime,
+    cursor: HistoryCursor | None,
+) -> Iterator[str]:
+    # The response outlives the request's session, so it owns its own.
+    with session_scope() as db:
+        rows = iter_db_data(
+            db,
+            item_name,
+            start_datetime=start_datetime,
+            end_datetime=end_datetime,
+            after=cursor,
+            rollup_bucket=RETENTION_ROLLUP,
         )
+        yield from to_ndjson(map(history_record, rows))
 
-    rune_sell = fetched_data[ItemIDs.DRAGONHUNTER_RUNE]["sell"]
-    charged_lodestone_sell = fetched_data[ItemIDs.CHARGED_LODESTONE]["sell"]
-    evergreen_lodestone_buy = fetched_data[ItemIDs.EVERGREEN_LODESTONE]["buy"]
-    thorns_buy = fetched_data[ItemIDs.BARBED_THORN]["buy"]
-    charm_buy = fetched_data[ItemIDs.CHARM_OF_POTENCE]["buy"]
-    ecto_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    lucent_crystal_buy = fetched_data[ItemIDs.PILE_OF_LUCENT_CRYSTAL]["buy"]
 
-    guardian_rune_cost = (
-        charged_lodestone_sell
-        + charm_buy
-        + ecto_buy * 5.0
-        + lucent_crystal_buy * 12.0
-    )
-
-    crafting_cost = (
-        guardian_rune_cost * 1.0
-        + evergreen_lodestone_buy * 1.0
-        + thorns_buy * 10.0
-    )
-
-    profit = rune_sell * TAX_RATE - crafting_cost
-
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost),
-        **get_sub_dct("sell", rune_sell),
-        **get_sub_dct("profit", profit),
-    }
-
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-def _get_relic_profits(
-    crafting_cost_base: float,
-    lucent_mote_buy: float,
-    lucent_crystal_buy: float,
-) -> tuple[float, float]:
-    crafting_cost = crafting_cost_base + lucent_crystal_buy * 48.0
-    crafting_cost2 = crafting_cost_base + lucent_mote_buy * 480.0
-    return crafting_cost, crafting_cost2
-
-
-@fastapi_app.get("/relic_of_fireworks")
-def get_relic_of_fireworks() -> JSONResponse:
+@fastapi_app.get("/history")
+def get_item_history(
+    db: Annotated[Session, Depends(get_db)],
+    item_name: str,
+    start: datetime.datetime | None = None,
+    end: datetime.datetime | None = None,
+    cursor: str | None = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+    bucket: Bucket | None = None,
+    agg: Aggregation = "mean",
+    points: Annotated[int | None, Query(ge=3)] = None,
+    output_format: Annotated[HistoryFormat, Query(alias="format")] = "json",
+) -> Response:
+    start_datetime, end_datetime = _history_window(start, end)
     try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.ECTOPLASM,
-                ItemIDs.PILE_OF_LUCENT_CRYSTAL,
-                ItemIDs.CHARM_OF_SKILL,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.RELIC_OF_FIREWORKS,
-            ],
-        )
-    except Exception:
+        after = _parse_cursor(cursor) if cursor else None
+    except ValueError:
         return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
+            content={"error": "cursor must be an X-Next-Cursor value"},
+            status_code=400,
+        )
+    if (
+        output_format == "ndjson"
+        and limit is None
+        and bucket is None
+        and points is None
+    ):
+        # Plain rows are streamed straight from the cursor, so a client
+        # pulling the full retention window never loads it all at once.
+        return StreamingResponse(
+            _stream_history(item_name, start_datetime, end_datetime, after),
+            media_type=NDJSON_MEDIA_TYPE,
         )
 
-    ecto_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    lucent_crystal_buy = fetched_data[ItemIDs.PILE_OF_LUCENT_CRYSTAL]["buy"]
-    charm_buy = fetched_data[ItemIDs.CHARM_OF_SKILL]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-    relic_sell = fetched_data[ItemIDs.RELIC_OF_FIREWORKS]["sell"]
-
-    crafting_cost_base = ecto_buy * 15.0 + charm_buy * 3.0
-    crafting_cost, crafting_cost2 = _get_relic_profits(
-        crafting_cost_base,
-        lucent_mote_buy,
-        lucent_crystal_buy,
-    )
-
-    profit = relic_sell * TAX_RATE - crafting_cost
-    profit2 = relic_sell * TAX_RATE - crafting_cost2
-
-    cheap_crafting_cost = min(
-        crafting_cost,
-        crafting_cost2,
-    )
-    highest_profit = max(profit, profit2)
-
-    data = {
-        **get_sub_dct("crafting_cost", cheap_crafting_cost),
-        **get_sub_dct("sell", relic_sell),
-        **get_sub_dct("profit", highest_profit),
-    }
-
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/relic_of_thief")
-def get_relic_of_thief() -> JSONResponse:
     try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.ECTOPLASM,
-                ItemIDs.PILE_OF_LUCENT_CRYSTAL,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.CHARM_OF_SKILL,
-                ItemIDs.CURED_HARDENED_LEATHER_SQUARE,
-                ItemIDs.RELIC_OF_THIEF,
-            ],
+        rows = get_db_data(
+            db,
+            item_name,
+            start_datetime=start_datetime,
+            end_datetime=end_datetime,
+            after=after,
+            limit=None if limit is None else limit + 1,
+            rollup_bucket=RETENTION_ROLLUP,
         )
-    except Exception:
+    except Exception as e:
         return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
+            content={"error": str(e)},
+            status_code=500,
         )
 
-    ecto_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    lucent_crystal_buy = fetched_data[ItemIDs.PILE_OF_LUCENT_CRYSTAL]["buy"]
-    charm_buy = fetched_data[ItemIDs.CHARM_OF_SKILL]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-    leather_buy = fetched_data[ItemIDs.CURED_HARDENED_LEATHER_SQUARE]["buy"]
-    relic_sell = fetched_data[ItemIDs.RELIC_OF_THIEF]["sell"]
-
-    crafting_cost_base = ecto_buy * 15.0 + charm_buy * 3.0 + leather_buy * 5.0
-    crafting_cost, crafting_cost2 = _get_relic_profits(
-        crafting_cost_base,
-        lucent_mote_buy,
-        lucent_crystal_buy,
-    )
-
-    profit = relic_sell * TAX_RATE - crafting_cost
-    profit2 = relic_sell * TAX_RATE - crafting_cost2
-
-    cheap_crafting_cost = min(
-        crafting_cost,
-        crafting_cost2,
-    )
-    highest_profit = max(profit, profit2)
-
-    data = {
-        **get_sub_dct("crafting_cost", cheap_crafting_cost),
-        **get_sub_dct("sell", relic_sell),
-        **get_sub_dct("profit", highest_profit),
-    }
-
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/relic_of_aristocracy")
-def get_relic_of_aristocracy() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.ECTOPLASM,
-                ItemIDs.PILE_OF_LUCENT_CRYSTAL,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.CHARM_OF_BRILLIANCE,
-                ItemIDs.RELIC_OF_ARISTOCRACY,
-            ],
-        )
-    except Exception:
-        return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
+    headers = {}
+    if limit is not None and len(rows) > limit:
+        rows = rows[:limit]
+        headers["X-Next-Cursor"] = _format_cursor(rows[-1])
+    records = build_history(rows, bucket, agg, points)
+    if output_format == "ndjson":
+        return StreamingResponse(
+            to_ndjson(records),
+            media_type=NDJSON_MEDIA_TYPE,
+            headers=headers,
         )
+    return JSONResponse(content=records, headers=headers)
 
-    ecto_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    lucent_crystal_buy = fetched_data[ItemIDs.PILE_OF_LUCENT_CRYSTAL]["buy"]
-    charm_buy = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-    bottle_elonian_wine_buy = 2504.0
-    relic_sell = fetched_data[ItemIDs.RELIC_OF_ARISTOCRACY]["sell"]
-
-    crafting_cost_base = (
-        ecto_buy * 15.0 + charm_buy * 3.0 + bottle_elonian_wine_buy * 3.0
-    )
-    crafting_cost, crafting_cost2 = _get_relic_profits(
-        crafting_cost_base,
-        lucent_mote_buy,
-        lucent_crystal_buy,
-    )
-
-    profit = relic_sell * TAX_RATE - crafting_cost
-    profit2 = relic_sell * TAX_RATE - crafting_cost2
-
-    cheap_crafting_cost = min(
-        crafting_cost,
-        crafting_cost2,
-    )
-    highest_profit = max(profit, profit2)
-
-    data = {
-        **get_sub_dct("crafting_cost", cheap_crafting_cost),
-        **get_sub_dct("sell", relic_sell),
-        **get_sub_dct("profit", highest_profit),
-    }
-
-    return JSONResponse(content=jsonable_encoder(data))
 
+@fastapi_app.get("/cache_stats")
+async def get_cache_stats() -> JSONResponse:
+    return JSONResponse(content=jsonable_encoder(price_cache.stats()))
 
-@fastapi_app.get("/common_gear_salvage")
-def get_common_gear_salvage() -> JSONResponse:
-    fetched_data = get_unid_gear_data(gear_id=ItemIDs.COMMON_GEAR)
-    if fetched_data is None:
-        return JSONResponse(content=jsonable_encoder({"error"}))
 
-    stack_buy = fetched_data[ItemIDs.COMMON_GEAR]["buy"] * 250.0
-    ecto_sell = fetched_data[ItemIDs.ECTOPLASM]["sell"]
-    lucent_mote_sell = fetched_data[ItemIDs.LUCENT_MOTE]["sell"]
-    mithril_sell = fetched_data[ItemIDs.MIRTHIL]["sell"]
-    elder_wood_sell = fetched_data[ItemIDs.ELDER_WOOD]["sell"]
-    thick_leather_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
-    gossamer_scrap_sell = fetched_data[ItemIDs.GOSSAMER_SCRAP]["sell"]
-    silk_scrap_sell = fetched_data[ItemIDs.SILK_SCRAP]["sell"]
-    hardened_sell = fetched_data[ItemIDs.HARDENED_LEATHER]["sell"]
-    ancient_wood_sell = fetched_data[ItemIDs.ANCIENT_WOOD_LOG]["sell"]
-    symbol_of_enh_sell = fetched_data[ItemIDs.SYMBOL_OF_ENH]["sell"]
-    symbol_of_pain_sell = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["sell"]
-    orichalcum_sell = fetched_data[ItemIDs.ORICHALCUM_ORE]["sell"]
-    symbol_of_control_sell = fetched_data[ItemIDs.SYMBOL_OF_CONTROL]["sell"]
-    charm_of_brilliance_sell = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["sell"]
-    charm_of_potence_sell = fetched_data[ItemIDs.CHARM_OF_POTENCE]["sell"]
-    charm_of_skill_sell = fetched_data[ItemIDs.CHARM_OF_SKILL]["sell"]
-
-    mats_value_after_tax = (
-        mithril_sell * (250.0 * 0.4291) * TAX_RATE
-        + elder_wood_sell * (250.0 * 0.3884) * TAX_RATE
-        + silk_scrap_sell * (250.0 * 0.3059) * TAX_RATE
-        + thick_leather_sell * (250.0 * 0.25) * TAX_RATE  # lowered
-        + orichalcum_sell * (250.0 * 0.0394) * TAX_RATE
-        + ancient_wood_sell * (250.0 * 0.0305) * TAX_RATE
-        + gossamer_scrap_sell * (250.0 * 0.0153) * TAX_RATE
-        + hardened_sell * (250.0 * 0.0143) * TAX_RATE
-        + ecto_sell * (250.0 * 0.007) * TAX_RATE  # lowered
-        + lucent_mote_sell * (250.0 * 0.1075) * TAX_RATE  # lowered
-        + symbol_of_control_sell * (250.0 * 0.0002) * TAX_RATE
-        + symbol_of_enh_sell * (250.0 * 0.0006) * TAX_RATE
-        + symbol_of_pain_sell * (250.0 * 0.0005) * TAX_RATE
-        + charm_of_brilliance_sell * (250.0 * 0.0004) * TAX_RATE
-        + charm_of_potence_sell * (250.0 * 0.0003) * TAX_RATE
-        + charm_of_skill_sell * (250.0 * 0.0003) * TAX_RATE
-    )
-
-    salvage_costs = (
-        Kits.COPPER_FED * 223.0
-        + Kits.RUNECRAFTER * 25.0
-        + Kits.SILVER_FED * 2.0
-    )
-
-    profit_stack = mats_value_after_tax - stack_buy - salvage_costs
-
-    data = {
-        **get_sub_dct("stack_buy", stack_buy),
-        **get_sub_dct("salvage_costs", salvage_costs),
-        **get_sub_dct("mats_value_after_tax", mats_value_after_tax),
-        **get_sub_dct("profit_stack", profit_stack),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/gear_salvage")
-def get_gear_salvage() -> JSONResponse:
-    fetched_data = get_unid_gear_data(gear_id=ItemIDs.UNID_GEAR)
-    if fetched_data is None:
-        return JSONResponse(content=jsonable_encoder({"error"}))
-
-    stack_buy = fetched_data[ItemIDs.UNID_GEAR]["buy"] * 250.0
-    ecto_sell = fetched_data[ItemIDs.ECTOPLASM]["sell"]
-    lucent_mote_sell = fetched_data[ItemIDs.LUCENT_MOTE]["sell"]
-    mithril_sell = fetched_data[ItemIDs.MIRTHIL]["sell"]
-    elder_wood_sell = fetched_data[ItemIDs.ELDER_WOOD]["sell"]
-    thick_leather_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
-    gossamer_scrap_sell = fetched_data[ItemIDs.GOSSAMER_SCRAP]["sell"]
-    silk_scrap_sell = fetched_data[ItemIDs.SILK_SCRAP]["sell"]
-    hardened_sell = fetched_data[ItemIDs.HARDENED_LEATHER]["sell"]
-    ancient_wood_sell = fetched_data[ItemIDs.ANCIENT_WOOD_LOG]["sell"]
-    symbol_of_enh_sell = fetched_data[ItemIDs.SYMBOL_OF_ENH]["sell"]
-    symbol_of_pain_sell = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["sell"]
-    orichalcum_sell = fetched_data[ItemIDs.ORICHALCUM_ORE]["sell"]
-    symbol_of_control_sell = fetched_data[ItemIDs.SYMBOL_OF_CONTROL]["sell"]
-    charm_of_brilliance_sell = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["sell"]
-    charm_of_potence_sell = fetched_data[ItemIDs.CHARM_OF_POTENCE]["sell"]
-    charm_of_skill_sell = fetched_data[ItemIDs.CHARM_OF_SKILL]["sell"]
-
-    mats_value_after_tax = (
-        mithril_sell * (250.0 * 0.4299) * TAX_RATE
-        + elder_wood_sell * (250.0 * 0.3564) * TAX_RATE
-        + silk_scrap_sell * (250.0 * 0.3521) * TAX_RATE
-        + thick_leather_sell * (250.0 * 0.2673) * TAX_RATE
-        + orichalcum_sell * (250.0 * 0.0387) * TAX_RATE
-        + ancient_wood_sell * (250.0 * 0.0287) * TAX_RATE
-        + gossamer_scrap_sell * (250.0 * 0.018) * TAX_RATE
-        + hardened_sell * (250.0 * 0.0164) * TAX_RATE  # lowered
-        + ecto_sell * (250.0 * 0.0291) * TAX_RATE  # lowered
-        + lucent_mote_sell * (250.0 * 0.98) * TAX_RATE
-        + symbol_of_control_sell * (250.0 * 0.0018) * TAX_RATE
-        + symbol_of_enh_sell * (250.0 * 0.001) * TAX_RATE
-        + symbol_of_pain_sell * (250.0 * 0.0006) * TAX_RATE
-        + charm_of_brilliance_sell * (250.0 * 0.0042) * TAX_RATE
-        + charm_of_potence_sell * (250.0 * 0.0029) * TAX_RATE
-        + charm_of_skill_sell * (250.0 * 0.0028) * TAX_RATE
+@fastapi_app.get("/health")
+async def get_health() -> JSONResponse:
+    return JSONResponse(
+        content={
+            "snapshot_age": snapshot.age(),
+            "stale": snapshot.is_stale(),
+            "upstream": circuit_breaker.stats(),
+            "scheduler": scheduler_health(),
+        }
     )
 
-    salvage_costs = Kits.RUNECRAFTER * 245 + Kits.SILVER_FED * 5
-
-    profit_stack = mats_value_after_tax - stack_buy - salvage_costs
-
-    data = {
-        **get_sub_dct("stack_buy", stack_buy),
-        **get_sub_dct("salvage_costs", salvage_costs),
-        **get_sub_dct("mats_value_after_tax", mats_value_after_tax),
-        **get_sub_dct("profit_stack", profit_stack),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
 
-@fastapi_app.get("/profits")
-def get_profits() -> JSONResponse:
-    data: dict[str, Any] = {}
-    try:
-        for craft in API.CRAFTS:
-            response = httpx.Client().get(
-                f"{api_base}{craft}",
-            )
-            data_ = response.json()
-            profit = gsc_dict_to_copper(data_)
-            data = {**data, **get_sub_dct(f"{craft}_profit", profit)}
-    except Exception:  # noqa: S110
-        pass
-    return JSONResponse(content=jsonable_encoder(data))
+@fastapi_app.get("/pool_stats")
+async def get_pool_stats() -> JSONResponse:
+    return JSONResponse(content=pool_stats())
 
 
-@fastapi_app.get("/symbol_enh_forge")
-def get_symbol_enh_forge() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.SYMBOL_OF_ENH,
-                ItemIDs.SYMBOL_OF_PAIN,
-                ItemIDs.SYMBOL_OF_CONTROL,
-            ],
-        )
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    enh_buy = fetched_data[ItemIDs.SYMBOL_OF_ENH]["buy"]
-    enh_sell = fetched_data[ItemIDs.SYMBOL_OF_ENH]["sell"]
-    pain_sell = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["sell"]
-    control_sell = fetched_data[ItemIDs.SYMBOL_OF_CONTROL]["sell"]
-
-    cost = enh_buy * 3.0
-    reward = enh_sell * 0.2 + pain_sell * 0.4 + control_sell * 0.4
-    profit = (reward * TAX_RATE) - cost
-
-    data = {
-        **get_sub_dct("cost", cost),
-        **get_sub_dct("profit_per_try", profit),
-        **get_sub_dct("profit_per_shard", profit * 10.0),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/charm_brilliance_forge")
-def get_charm_brilliance_forge() -> JSONResponse:
+@fastapi_app.get("/price")
+async def get_price(
+    item_id: int,
+) -> JSONResponse:
     try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.CHARM_OF_BRILLIANCE,
-                ItemIDs.CHARM_OF_POTENCE,
-                ItemIDs.CHARM_OF_SKILL,
-            ],
-        )
+        # with flask_app.app_context():
+        data = await get_prices([item_id])
+    except ItemsNotFoundError:
+        data = {}
     except Exception as e:
         return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    charm_brilliance_buy = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["buy"]
-    charm_brilliance_sell = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["sell"]
-    charm_potence_sell = fetched_data[ItemIDs.CHARM_OF_POTENCE]["sell"]
-    charm_skill_sell = fetched_data[ItemIDs.CHARM_OF_SKILL]["sell"]
-
-    cost = charm_brilliance_buy * 3.0
-    reward = (
-        charm_brilliance_sell * 0.2
-        + charm_potence_sell * 0.4
-        + charm_skill_sell * 0.4
-    )
-    profit = (reward * TAX_RATE) - cost
-
-    data = {
-        **get_sub_dct("cost", cost),
-        **get_sub_dct("profit_per_try", profit),
-        **get_sub_dct("profit_per_shard", profit * 10.0),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/lodestone_forge")
-def get_lodestone_forge() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.ONYX_LODESTONE,
-                ItemIDs.CHARGED_LODESTONE,
-                ItemIDs.CORRUPTED_LODESTONE,
-                ItemIDs.DESTROYER_LODESTONE,
-                ItemIDs.CRYSTALINE_DUST,
-                ItemIDs.ONYX_CORE,
-                ItemIDs.DESTROYER_CORE,
-                ItemIDs.CORRUPTED_CORE,
-                ItemIDs.CHARGED_CORE,
-            ],
+    if item_id not in data:
+        return JSONResponse(
+            content={"error": f"Item {item_id} not found or not tradeable"},
+            status_code=404,
         )
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    onyx_sell = fetched_data[ItemIDs.ONYX_LODESTONE]["buy"]
-    charged_sell = fetched_data[ItemIDs.CHARGED_LODESTONE]["sell"]
-    corrupted_sell = fetched_data[ItemIDs.CORRUPTED_LODESTONE]["sell"]
-    destroyer_sell = fetched_data[ItemIDs.DESTROYER_LODESTONE]["sell"]
-    crystal_dust_buy = fetched_data[ItemIDs.CRYSTALINE_DUST]["buy"]
-    onyx_core_cost = fetched_data[ItemIDs.ONYX_CORE]["buy"]
-    charged_core_cost = fetched_data[ItemIDs.CHARGED_CORE]["buy"]
-    corrupted_core_cost = fetched_data[ItemIDs.CORRUPTED_CORE]["buy"]
-    destroyer_core_cost = fetched_data[ItemIDs.DESTROYER_CORE]["buy"]
+    return price_response(data[item_id])
 
-    elonian_cost = 2_500
 
-    onyx_cost = onyx_core_cost * 2 + crystal_dust_buy + elonian_cost
-    onyx_profit = (onyx_sell * 0.85) - onyx_cost
-
-    charged_cost = charged_core_cost * 2 + crystal_dust_buy + elonian_cost
-    charged_profit = (charged_sell * 0.85) - charged_cost
-
-    corrupted_cost = corrupted_core_cost * 2 + crystal_dust_buy + elonian_cost
-    corrupted_profit = (corrupted_sell * 0.85) - corrupted_cost
-
-    destroyer_cost = destroyer_core_cost * 2 + crystal_dust_buy + elonian_cost
-    destroyer_profit = (destroyer_sell * 0.85) - destroyer_cost
-
-    data = {
-        **get_sub_dct("onyx", onyx_profit),
-        **get_sub_dct("charged", charged_profit),
-        **get_sub_dct("corrupted", corrupted_profit),
-        **get_sub_dct("destroyer", destroyer_profit),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/thesis_on_masterful_malice")
-def get_thesis_on_masterful_malice() -> JSONResponse:
+@fastapi_app.get("/profits")
+async def get_profits(
+    sort: Literal["asc", "desc"] | None = None,
+    limit: Annotated[int | None, Query(ge=1)] = None,
+) -> JSONResponse:
+    crafts = sorted(API.CRAFTS)
     try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.THESIS_MASTERFUL_MALICE,
-                ItemIDs.WRIT_MASTERFUL_MALICE,
-                ItemIDs.CRYSTALINE_DUST,
-                ItemIDs.ANCIENT_WOOD_LOG,
-                ItemIDs.HARDENED_LEATHER,
-                ItemIDs.ORICHALCUM_ORE,
-                ItemIDs.GOSSAMER_SCRAP,
-                ItemIDs.GOSSAMER_THREAD,
-                ItemIDs.POUCH_OF_BLACK_PIGMENTS,
-                ItemIDs.POUCH_OF_WHITE_PIGMENTS,
-                ItemIDs.JUG_OF_WATER,
-            ],
-        )
+        fetched_data = await get_prices(section_item_ids(crafts))
     except Exception as e:
         return JSONResponse(content=jsonable_encoder({"error": str(e)}))
 
-    masterful_malice_data = fetched_data[ItemIDs.THESIS_MASTERFUL_MALICE]
-    masterful_malice_buy = fetched_data[ItemIDs.WRIT_MASTERFUL_MALICE]["buy"]
-    crystal_dust_buy = fetched_data[ItemIDs.CRYSTALINE_DUST]["buy"]
-    ancient_wood_log_buy = fetched_data[ItemIDs.ANCIENT_WOOD_LOG]["buy"]
-    hardened_leather_buy = fetched_data[ItemIDs.HARDENED_LEATHER]["buy"]
-    orichalcum_buy = fetched_data[ItemIDs.ORICHALCUM_ORE]["buy"]
-    gossamer_scrap_buy = fetched_data[ItemIDs.GOSSAMER_SCRAP]["buy"]
-    gossamer_thread_buy = fetched_data[ItemIDs.GOSSAMER_THREAD]["buy"]
-    pouch_of_black_buy = fetched_data[ItemIDs.POUCH_OF_BLACK_PIGMENTS]["buy"]
-    pouch_of_white_buy = fetched_data[ItemIDs.POUCH_OF_WHITE_PIGMENTS]["buy"]
-    jug_of_water = fetched_data[ItemIDs.JUG_OF_WATER]["buy"]
-
-    crafting_cost = (
-        masterful_malice_buy * 3.0
-        + crystal_dust_buy * 5.0
-        + ancient_wood_log_buy * 48.0
-        + hardened_leather_buy * 10.0
-        + orichalcum_buy * 12.0
-        + gossamer_scrap_buy * 20.0
-        + gossamer_thread_buy * 10.0
-        + pouch_of_black_buy * 3.0
-        + pouch_of_white_buy * 3.0
-        + jug_of_water * 20.0
-    )
-
-    sell = masterful_malice_data["sell"]
-    profit = (sell * TAX_RATE) - crafting_cost
-
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost),
-        **get_sub_dct("sell", sell),
-        **get_sub_dct("profit", profit),
+    results, errors = compute_sections(crafts, fetched_data)
+    profits = {
+        craft: gsc_dict_to_copper(section_data)
+        for craft, section_data in results.items()
     }
+    ranking = list(profits)
+    if sort is not None:
+        ranking.sort(key=profits.__getitem__, reverse=sort == "desc")
+    if limit is not None:
+        ranking = ranking[:limit]
 
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-def get_strap_data(sell: float, strap_buy: float) -> dict[str, Any]:
-    profit_per_salvage = (sell * TAX_RATE) - strap_buy
-    profit_per_stack = 250.0 * profit_per_salvage
-
-    return {
-        **get_sub_dct("buy", strap_buy),
-        **get_sub_dct("profit_per_salvage", profit_per_salvage),
-        **get_sub_dct("profit_per_stack", profit_per_stack),
-    }
-
-
-@fastapi_app.get("/thick_leather_strap")
-def get_thick_leather_strap() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.THICK_LEATHER_STRAP,
-                ItemIDs.COARSE_LEATHER,
-                ItemIDs.RUGGED_LEATHER,
-            ],
-        )
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    strap_buy = fetched_data[ItemIDs.THICK_LEATHER_STRAP]["buy"]
-    coarse_leather_section_sell = fetched_data[ItemIDs.COARSE_LEATHER]["sell"]
-    rugged_leather_section_sell = fetched_data[ItemIDs.RUGGED_LEATHER]["sell"]
-
-    coarse_leather_section_rate = 1.28
-    rugged_leather_section_rate = 0.08
-
-    sell = (coarse_leather_section_sell * coarse_leather_section_rate) + (
-        rugged_leather_section_sell * rugged_leather_section_rate
-    )
-    data = get_strap_data(sell, strap_buy)
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/rugged_leather_strap")
-def get_rugged_leather_strap() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.RUGGED_LEATHER_STRAP,
-                ItemIDs.THICK_LEATHER,
-                ItemIDs.RUGGED_LEATHER,
-            ],
-        )
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    strap_buy = fetched_data[ItemIDs.RUGGED_LEATHER_STRAP]["buy"]
-    thick_leather_section_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
-    rugged_leather_section_sell = fetched_data[ItemIDs.RUGGED_LEATHER]["sell"]
-
-    thick_leather_section_rate = 1.28
-    rugged_leather_section_rate = 0.08
-
-    sell = (thick_leather_section_sell * thick_leather_section_rate) + (
-        rugged_leather_section_sell * rugged_leather_section_rate
-    )
-    data = get_strap_data(sell, strap_buy)
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/hard_leather_strap")
-def get_hard_leather_strap() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.HARD_LEATHER_STRAP,
-                ItemIDs.THICK_LEATHER,
-                ItemIDs.HARDENED_LEATHER,
-            ],
-        )
-    except Exception as e:
-        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
-
-    strap_buy = fetched_data[ItemIDs.HARD_LEATHER_STRAP]["buy"]
-    thick_leather_section_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
-    hardd_leather_section_sell = fetched_data[ItemIDs.HARDENED_LEATHER]["sell"]
-
-    thick_leather_section_rate = 1.28
-    harden_leather_section_rate = 0.08
-
-    sell = (thick_leather_section_sell * thick_leather_section_rate) + (
-        hardd_leather_section_sell * harden_leather_section_rate
-    )
-    data = get_strap_data(sell, strap_buy)
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/sigil_of_impact")
-def get_sigil_of_impact() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.SIGIL_OF_IMPACT,
-                ItemIDs.ECTOPLASM,
-                ItemIDs.ONYX_LODESTONE,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.SYMBOL_OF_PAIN,
-            ],
-        )
-    except Exception:
+    data: dict[str, Any] = {}
+    for craft in ranking:
+        data.update(get_sub_dct(f"{craft}_profit", profits[craft]))
+    if errors:
+        data["errors"] = errors
+    return price_response(data)
+
+
+@fastapi_app.get("/flips")
+async def get_flips(
+    sort: FlipSort = "margin",
+    limit: Annotated[int, Query(ge=1, le=1000)] = 50,
+    min_volume: Annotated[int, Query(ge=0)] = 0,
+) -> JSONResponse:
+    scan = market_scanner.scan
+    if scan is None:
         return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
-        )
-
-    sigil_of_impact = fetched_data[ItemIDs.SIGIL_OF_IMPACT]
-    ectoplasm_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    onyx_lodestone_buy = fetched_data[ItemIDs.ONYX_LODESTONE]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-    symbol_of_pain_buy = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["buy"]
-    crafting_cost = (
-        ectoplasm_buy * 10.0
-        + onyx_lodestone_buy * 1.0
-        + lucent_mote_buy * 50.0
-        + symbol_of_pain_buy * 3.0
+            content={"error": "Market scan not finished yet"},
+            status_code=503,
+        )
+    return JSONResponse(
+        content={
+            "flips": scan.top(sort, limit, min_volume),
+            "scanned_items": len(scan.item_ids),
+            "scan_age": scan.age(),
+        }
     )
-    sell = sigil_of_impact["sell"]
-    profit = (sell * TAX_RATE) - crafting_cost
-
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost),
-        **get_sub_dct("sell", sell),
-        **get_sub_dct("profit", profit),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
 
 
-@fastapi_app.get("/sigil_of_doom")
-def get_sigil_of_doom() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.SIGIL_OF_DOOMM,
-                ItemIDs.ECTOPLASM,
-                ItemIDs.MOLTEN_LODESTONE,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.SYMBOL_OF_PAIN,
-            ],
-        )
-    except Exception:
+@fastapi_app.get("/batch")
+async def get_batch(
+    sections: str | None = None,
+    item_ids: str | None = None,
+) -> JSONResponse:
+    names = sections.split(",") if sections else list(SECTIONS)
+    unknown = [name for name in names if name not in SECTIONS]
+    if unknown:
         return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
+            content={"error": f"Unknown sections: {', '.join(unknown)}"},
+            status_code=400,
         )
-
-    sigil_of_doom = fetched_data[ItemIDs.SIGIL_OF_DOOMM]
-    ectoplasm_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    molten_lodestone_buy = fetched_data[ItemIDs.MOLTEN_LODESTONE]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-    symbol_of_pain_buy = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["buy"]
-    crafting_cost = (
-        ectoplasm_buy * 10.0
-        + molten_lodestone_buy * 1.0
-        + lucent_mote_buy * 100.0
-        + symbol_of_pain_buy * 2.0
-    )
-    sell = sigil_of_doom["sell"]
-    profit = (sell * TAX_RATE) - crafting_cost
-
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost),
-        **get_sub_dct("sell", sell),
-        **get_sub_dct("profit", profit),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/sigil_of_torment")
-def get_sigil_of_torment() -> JSONResponse:
     try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.SIGIL_OF_TORMENT,
-                ItemIDs.ECTOPLASM,
-                ItemIDs.PRISTINE_TOXIC_SPORE,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.SYMBOL_OF_PAIN,
-            ],
-        )
-    except Exception:
+        price_ids = [int(i) for i in item_ids.split(",")] if item_ids else []
+    except ValueError:
         return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
+            content={"error": "item_ids must be comma separated integers"},
+            status_code=400,
         )
 
-    sigil_of_torment = fetched_data[ItemIDs.SIGIL_OF_TORMENT]
-    ectoplasm_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    pristine_toxic_spore_buy = fetched_data[ItemIDs.PRISTINE_TOXIC_SPORE]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-    symbol_of_pain_buy = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["buy"]
-    crafting_cost = (
-        ectoplasm_buy * 10.0
-        + pristine_toxic_spore_buy * 100.0
-        + lucent_mote_buy * 150.0
-        + symbol_of_pain_buy * 1.0
-    )
-    sell = sigil_of_torment["sell"]
-    profit = (sell * TAX_RATE) - crafting_cost
-
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost),
-        **get_sub_dct("sell", sell),
-        **get_sub_dct("profit", profit),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/sigil_of_bursting")
-def get_sigil_of_bursting() -> JSONResponse:
     try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.SIGIL_OF_BURSTING,
-                ItemIDs.ECTOPLASM,
-                ItemIDs.WATCHWORK_SPROCKET,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.SYMBOL_OF_ENH,
-            ],
-        )
-    except Exception:
-        return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
-            )
+        fetched_data = await get_prices(
+            list(dict.fromkeys([*section_item_ids(names), *price_ids]))
         )
+    except Exception as e:
+        return JSONResponse(content=jsonable_encoder({"error": str(e)}))
 
-    sigil_of_bursting = fetched_data[ItemIDs.SIGIL_OF_BURSTING]
-    ectoplasm_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    watchwork_sprocket_buy = fetched_data[ItemIDs.WATCHWORK_SPROCKET]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-    symbol_of_enh_buy = fetched_data[ItemIDs.SYMBOL_OF_ENH]["buy"]
-    crafting_cost = (
-        ectoplasm_buy * 10.0
-        + watchwork_sprocket_buy * 250.0
-        + lucent_mote_buy * 150.0
-        + symbol_of_enh_buy * 1.0
-    )
-    sell = sigil_of_bursting["sell"]
-    profit = (sell * TAX_RATE) - crafting_cost
-
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost),
-        **get_sub_dct("sell", sell),
-        **get_sub_dct("profit", profit),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-@fastapi_app.get("/sigil_of_paralyzation")
-def get_sigil_of_paralyzation() -> JSONResponse:
-    try:
-        fetched_data = fetch_tp_prices(
-            [
-                ItemIDs.SIGIL_OF_PARALYSIS,
-                ItemIDs.ECTOPLASM,
-                ItemIDs.ONYX_LODESTONE,
-                ItemIDs.LUCENT_MOTE,
-                ItemIDs.SYMBOL_OF_CONTROL,
-            ],
-        )
-    except Exception:
-        return JSONResponse(
-            content=jsonable_encoder(
-                {
-                    "crafting_cost": -1,
-                    "sell": -1,
-                    "profit": -1,
-                }
+    results, errors = compute_sections(names, fetched_data)
+    data: dict[str, Any] = dict(results)
+    if price_ids:
+        data["price"] = {
+            item_id: fetched_data[item_id]
+            for item_id in price_ids
+            if item_id in fetched_data
+        }
+        missing = missing_item_ids(price_ids, fetched_data)
+        if missing:
+            data["missing"] = missing
+    if errors:
+        data["errors"] = errors
+    return price_response(data)
+
+
+@fastapi_app.get("/stream")
+async def get_stream() -> StreamingResponse:
+    return StreamingResponse(
+        stream_events(broadcaster.subscribe()),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def get_section_endpoint(
+    section: Section,
+) -> Callable[[], Awaitable[JSONResponse]]:
+    async def get_section() -> JSONResponse:
+        try:
+            fetched_data = await get_prices(section.item_ids)
+        except Exception as e:
+            content = section.error or {"error": str(e)}
+            return JSONResponse(content=jsonable_encoder(content))
+        return price_response(section.compute(fetched_data))
+
+    return get_section
+
+
+def get_depth_section_endpoint(
+    section: Section,
+    depth_item_id: int,
+) -> Callable[..., Awaitable[JSONResponse]]:
+    async def get_section(
+        depth: bool = False,
+        quantity: Annotated[int, Query(ge=1)] = int(STACK_SIZE),
+    ) -> JSONResponse:
+        try:
+            fetched_data = await get_prices(section.item_ids)
+        except Exception as e:
+            content = section.error or {"error": str(e)}
+            return JSONResponse(content=jsonable_encoder(content))
+        if not depth:
+            return price_response(
+                section.compute(fetched_data, quantity=quantity)
             )
-        )
-
-    sigil_of_paralysis = fetched_data[ItemIDs.SIGIL_OF_PARALYSIS]
-    ectoplasm_buy = fetched_data[ItemIDs.ECTOPLASM]["buy"]
-    onyx_lodestone_buy = fetched_data[ItemIDs.ONYX_LODESTONE]["buy"]
-    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
-    symbol_of_control_buy = fetched_data[ItemIDs.SYMBOL_OF_CONTROL]["buy"]
-    crafting_cost = (
-        ectoplasm_buy * 10.0
-        + onyx_lodestone_buy * 1.0
-        + lucent_mote_buy * 150.0
-        + symbol_of_control_buy * 1.0
-    )
-    sell = sigil_of_paralysis["sell"]
-    profit = (sell * TAX_RATE) - crafting_cost
 
-    data = {
-        **get_sub_dct("crafting_cost", crafting_cost),
-        **get_sub_dct("sell", sell),
-        **get_sub_dct("profit", profit),
-    }
-    return JSONResponse(content=jsonable_encoder(data))
-
-
-middleware = [Middleware(CORSMiddleware, allow_origins=["*"])]
+        try:
+            listings = await fetch_listings([depth_item_id])
+            sells = listings[depth_item_id]["sells"]
+        except Exception as e:
+            return JSONResponse(content=jsonable_encoder({"error": str(e)}))
+        # Buying the stack instantly walks the sell listings upwards.
+        stack_buy = sells.fill_cost(quantity)
+        if stack_buy is None:
+            error = f"Only {sells.depth} listed, {quantity} requested"
+            return JSONResponse(content=jsonable_encoder({"error": error}))
+        data = section.compute(
+            fetched_data,
+            quantity=quantity,
+            stack_buy=stack_buy,
+        )
+        return price_response({**data, "listed_quantity": sells.depth})
+
+    return get_section
+
+
+for section_name, section in SECTIONS.items():
+    fastapi_app.add_api_route(
+        f"/{section_name}",
+        get_section_endpoint(section)
+        if section.depth_item_id is None
+        else get_depth_section_endpoint(section, section.depth_item_id),
+        methods=["GET"],
+        name=f"get_{section_name}",
+    )
+
+
+@asynccontextmanager
+async def lifespan(
+    _app: Starlette,
+) -> AsyncIterator[None]:
+    init_db()
+    open_client()
+    tasks = [asyncio.create_task(run_snapshot_poller())]
+    if FLIP_SCAN_ENABLED:
+        tasks.append(asyncio.create_task(run_market_scanner()))
+    if SCHEDULER_ENABLED:
+        start_scheduler()
+    try:
+        yield
+    finally:
+        stop_scheduler()
+        for task in tasks:
+            task.cancel()
+            with suppress(asyncio.CancelledError):
+                await task
+        await close_client()
+
+
+middleware = [
+    Middleware(
+        CORSMiddleware,
+        allow_origins=["*"],
+        expose_headers=["X-Next-Cursor"],
+    )
+]
 app = Starlette(
     routes=[
         Mount("/api", app=fastapi_app),
     ],
     middleware=middleware,
+    lifespan=lifespan,
 )
-
-# start_scheduler()
@@ -0,0 +1,342 @@
+import asyncio
+import logging
+from typing import Any
+from typing import Awaitable
+from typing import Callable
+
+import httpx
+
+from gw2tp.constants import API
+from gw2tp.constants import TAX_RATE
+from gw2tp.helper import chunked
+from gw2tp.helper import copper_to_gsc
+
+from backend.config import BREAKER_RESET
+from backend.config import BREAKER_THRESHOLD
+from backend.config import HTTP2_ENABLED
+from backend.config import HTTP_KEEPALIVE_EXPIRY
+from backend.config import HTTP_MAX_CONNECTIONS
+from backend.config import HTTP_MAX_KEEPALIVE
+from backend.config import HTTP_TIMEOUT
+from backend.config import PRICE_CACHE_MAX_SIZE
+from backend.config import PRICE_CACHE_TTL
+from backend.config import UPSTREAM_BACKOFF_BASE
+from backend.config import UPSTREAM_BACKOFF_MAX
+from backend.config import UPSTREAM_BURST
+from backend.config import UPSTREAM_CONCURRENCY
+from backend.config import UPSTREAM_RATE
+from backend.config import UPSTREAM_RETRIES
+from backend.price_cache import PriceCache
+from backend.resilience import CircuitBreaker
+from backend.resilience import TokenBucket
+from backend.resilience import UpstreamBudget
+from backend.resilience import backoff_delay
+
+
+logger = logging.getLogger(__name__)
+
+
+class ItemsNotFoundError(RuntimeError):
+    pass
+
+
+price_cache = PriceCache(ttl=PRICE_CACHE_TTL, max_size=PRICE_CACHE_MAX_SIZE)
+# IDs the API did not return, so unknown items don't go upstream each time.
+not_found_cache = PriceCache(ttl=PRICE_CACHE_TTL, max_size=PRICE_CACHE_MAX_SIZE)
+# Budget for request-path misses and the snapshot poller.
+request_budget = UpstreamBudget(
+    limiter=TokenBucket(rate=UPSTREAM_RATE, capacity=UPSTREAM_BURST),
+    semaphore=asyncio.Semaphore(UPSTREAM_CONCURRENCY),
+)
+circuit_breaker = CircuitBreaker(
+    failure_threshold=BREAKER_THRESHOLD,
+    reset_timeout=BREAKER_RESET,
+)
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+PricesByID = dict[int, dict[str, Any]]
+# Shared fetch task per item ID, for callers asking at the same time.
+InflightTasks = dict[int, asyncio.Task[PricesByID]]
+_inflight: InflightTasks = {}
+_client: httpx.AsyncClient | None = None
+
+
+def _create_client() -> httpx.AsyncClient:
+    return httpx.AsyncClient(
+        http2=HTTP2_ENABLED,
+        timeout=HTTP_TIMEOUT,
+        limits=httpx.Limits(
+            max_connections=HTTP_MAX_CONNECTIONS,
+            max_keepalive_connections=HTTP_MAX_KEEPALIVE,
+            keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+        ),
+    )
+
+
+def get_client() -> httpx.AsyncClient:
+    global _client  # noqa: PLW0603
+    if _client is None or _client.is_closed:
+        _client = _create_client()
+    return _client
+
+
+def open_client() -> None:
+    get_client()
+
+
+async def close_client() -> None:
+    global _client  # noqa: PLW0603
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+def get_budget(
+    budget: UpstreamBudget | None = None,
+) -> UpstreamBudget:
+    # Resolved per call, so the module budget can be swapped out.
+    return budget or request_budget
+
+
+def _retry_after(
+    response: httpx.Response,
+) -> float | None:
+    try:
+        return float(response.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+async def _send_with_retries(
+    url: str,
+    params: dict[str, str],
+    limiter: TokenBucket,
+) -> httpx.Response:
+    attempt = 0
+    while True:
+        await limiter.acquire()
+        try:
+            response = await get_client().get(url, params=params)
+        except httpx.TransportError:
+            if attempt == UPSTREAM_RETRIES:
+                raise
+            retry_after = None
+        else:
+            if (
+                response.status_code not in RETRY_STATUS_CODES
+                or attempt == UPSTREAM_RETRIES
+            ):
+                return response
+            retry_after = _retry_after(response)
+        delay = backoff_delay(
+            attempt, UPSTREAM_BACKOFF_BASE, UPSTREAM_BACKOFF_MAX
+        )
+        await asyncio.sleep(max(delay, retry_after or 0.0))
+        attempt += 1
+
+
+async def upstream_get(
+    url: str,
+    params: dict[str, str],
+    budget: UpstreamBudget | None = None,
+) -> httpx.Response:
+    budget = get_budget(budget)
+    circuit_breaker.check()
+    try:
+        response = await _send_with_retries(url, params, budget.limiter)
+    except httpx.TransportError:
+        circuit_breaker.record_failure()
+        raise
+    if response.status_code in RETRY_STATUS_CODES:
+        circuit_breaker.record_failure()
+    else:
+        circuit_breaker.record_success()
+    response.raise_for_status()
+    return response
+
+
+def get_flip_profit(
+    buy_price: int,
+    sell_price: int,
+) -> int:
+    return int(round(sell_price * TAX_RATE, 6) - buy_price)
+
+
+def parse_price_item(
+    item: dict[str, Any],
+) -> dict[str, Any]:
+    buy_price = int(item["buys"]["unit_price"])
+    sell_price = int(item["sells"]["unit_price"])
+    flip_profit = get_flip_profit(buy_price, sell_price)
+    buy_g, buy_s, buy_c = copper_to_gsc(buy_price)
+    sell_g, sell_s, sell_c = copper_to_gsc(sell_price)
+    flip_g, flip_s, flip_c = copper_to_gsc(flip_profit)
+
+    return {
+        "buy": buy_price,
+        "sell": sell_price,
+        "buy_g": buy_g,
+        "buy_s": buy_s,
+        "buy_c": buy_c,
+        "sell_g": sell_g,
+        "sell_s": sell_s,
+        "sell_c": sell_c,
+        "flip_g": flip_g,
+        "flip_s": flip_s,
+        "flip_c": flip_c,
+        "sell_after_tax_g": int(sell_price * TAX_RATE // 10_000),
+        "sell_after_tax_s": int((sell_price * TAX_RATE % 10_000) // 100),
+        "sell_after_tax_c": int(sell_price * TAX_RATE % 100),
+    }
+
+
+async def fetch_tradeable_item_ids(
+    budget: UpstreamBudget | None = None,
+) -> list[int]:
+    # Without `ids` the endpoint lists every item on the trading post.
+    response = await upstream_get(API.GW2_COMMERCE_API_URL, {}, budget)
+    return [int(item_id) for item_id in response.json()]
+
+
+def parse_prices(
+    data: list[dict[str, Any]],
+) -> dict[int, dict[str, Any]]:
+    return {int(item["id"]): parse_price_item(item) for item in data}
+
+
+async def fetch_raw_prices(
+    item_ids: list[int],
+    budget: UpstreamBudget | None = None,
+) -> list[dict[str, Any]]:
+    params = {"ids": ",".join(str(i) for i in item_ids)}
+    try:
+        response = await upstream_get(API.GW2_COMMERCE_API_URL, params, budget)
+    except httpx.HTTPStatusError as e:
+        # The API answers 404 when none of the IDs is tradeable.
+        if e.response.status_code == httpx.codes.NOT_FOUND:
+            return []
+        raise
+    data: list[dict[str, Any]] = response.json()
+    return data
+
+
+async def _fetch_chunk(
+    item_ids: list[int],
+    budget: UpstreamBudget | None = None,
+) -> list[dict[str, Any]]:
+    budget = get_budget(budget)
+    async with budget.semaphore:
+        return await fetch_raw_prices(item_ids, budget)
+
+
+async def fetch_raw_prices_chunked(
+    item_ids: list[int],
+    budget: UpstreamBudget | None = None,
+) -> list[dict[str, Any]]:
+    chunks = await asyncio.gather(
+        *(
+            _fetch_chunk(chunk, budget)
+            for chunk in chunked(item_ids, API.GW2_MAX_IDS_PER_REQUEST)
+        ),
+        return_exceptions=True,
+    )
+    # One failed chunk shouldn't throw away the others, only give up when
+    # nothing came back at all.
+    errors = [chunk for chunk in chunks if isinstance(chunk, BaseException)]
+    for error in errors:
+        logger.warning("Price chunk fetch failed", exc_info=error)
+    if errors and len(errors) == len(chunks):
+        raise errors[0]
+    return [
+        item
+        for chunk in chunks
+        if not isinstance(chunk, BaseException)
+        for item in chunk
+    ]
+
+
+async def fetch_upstream_prices_chunked(
+    item_ids: list[int],
+) -> dict[int, dict[str, Any]]:
+    prices = parse_prices(await fetch_raw_prices_chunked(item_ids))
+    price_cache.put_many(prices)
+    return prices
+
+
+ChunkFetcher = Callable[[list[int]], Awaitable[PricesByID]]
+
+
+async def _fetch_and_store(
+    item_ids: list[int],
+    fetch: ChunkFetcher,
+    cache: PriceCache,
+    inflight: InflightTasks,
+    not_found: PriceCache | None,
+) -> PricesByID:
+    try:
+        upstream_data = await fetch(item_ids)
+        cache.put_many(upstream_data)
+        if not_found is not None:
+            not_found.put_many(
+                {i: {} for i in item_ids if i not in upstream_data}
+            )
+    finally:
+        for item_id in item_ids:
+            inflight.pop(item_id, None)
+    return upstream_data
+
+
+def missing_item_ids(
+    item_ids: list[int],
+    prices: dict[int, dict[str, Any]],
+) -> list[int]:
+    return [item_id for item_id in item_ids if item_id not in prices]
+
+
+async def fetch_coalesced(
+    item_ids: list[int],
+    fetch: ChunkFetcher,
+    cache: PriceCache,
+    inflight: InflightTasks,
+    not_found: PriceCache | None = None,
+) -> PricesByID:
+    """Cached entries for `item_ids`, misses fetched once across callers."""
+    fetched_data, missing_ids = cache.get_many(item_ids)
+    if not_found is not None:
+        skipped, _ = not_found.get_many(missing_ids)
+        missing_ids = [i for i in missing_ids if i not in skipped]
+    pending = {i: inflight[i] for i in missing_ids if i in inflight}
+    own_ids = [i for i in missing_ids if i not in pending]
+    # The API takes at most 200 IDs per request, larger sets are fetched
+    # as concurrent chunks bounded by the semaphore.
+    for chunk in chunked(own_ids, API.GW2_MAX_IDS_PER_REQUEST):
+        task = asyncio.create_task(
+            _fetch_and_store(chunk, fetch, cache, inflight, not_found)
+        )
+        for item_id in chunk:
+            inflight[item_id] = task
+            pending[item_id] = task
+
+    # Shield the shared tasks so one cancelled caller can't abort the
+    # upstream request the other callers are waiting on.
+    for item_id, shared_task in pending.items():
+        shared_data = await asyncio.shield(shared_task)
+        if item_id in shared_data:
+            fetched_data[item_id] = shared_data[item_id]
+    return fetched_data
+
+
+async def _fetch_price_chunk(
+    item_ids: list[int],
+) -> PricesByID:
+    return parse_prices(await _fetch_chunk(item_ids))
+
+
+async def fetch_tp_prices(
+    item_ids: list[int],
+) -> dict[int, dict[str, Any]]:
+    fetched_data = await fetch_coalesced(
+        item_ids, _fetch_price_chunk, price_cache, _inflight, not_found_cache
+    )
+    if len(fetched_data) == 0:
+        raise ItemsNotFoundError("No items found")
+    return fetched_data
@@ -0,0 +1,67 @@
+import os
+
+
+PRICE_CACHE_TTL: float = float(os.getenv("GW2TP_PRICE_CACHE_TTL", "60"))
+PRICE_CACHE_MAX_SIZE: int = int(os.getenv("GW2TP_PRICE_CACHE_MAX_SIZE", "4096"))
+LISTINGS_CACHE_TTL: float = float(os.getenv("GW2TP_LISTINGS_CACHE_TTL", "60"))
+
+HTTP2_ENABLED: bool = os.getenv("GW2TP_HTTP2", "1") == "1"
+HTTP_TIMEOUT: float = float(os.getenv("GW2TP_HTTP_TIMEOUT", "10"))
+HTTP_MAX_CONNECTIONS: int = int(os.getenv("GW2TP_HTTP_MAX_CONNECTIONS", "100"))
+HTTP_MAX_KEEPALIVE: int = int(os.getenv("GW2TP_HTTP_MAX_KEEPALIVE", "20"))
+HTTP_KEEPALIVE_EXPIRY: float = float(
+    os.getenv("GW2TP_HTTP_KEEPALIVE_EXPIRY", "30")
+)
+
+SNAPSHOT_INTERVAL: float = float(os.getenv("GW2TP_SNAPSHOT_INTERVAL", "60"))
+SNAPSHOT_STALE_AFTER: float = float(
+    os.getenv("GW2TP_SNAPSHOT_STALE_AFTER", str(2 * SNAPSHOT_INTERVAL))
+)
+
+UPSTREAM_RATE: float = float(os.getenv("GW2TP_UPSTREAM_RATE", "5"))
+UPSTREAM_BURST: float = float(os.getenv("GW2TP_UPSTREAM_BURST", "10"))
+UPSTREAM_CONCURRENCY: int = int(os.getenv("GW2TP_UPSTREAM_CONCURRENCY", "4"))
+UPSTREAM_RETRIES: int = int(os.getenv("GW2TP_UPSTREAM_RETRIES", "3"))
+UPSTREAM_BACKOFF_BASE: float = float(
+    os.getenv("GW2TP_UPSTREAM_BACKOFF_BASE", "0.5")
+)
+UPSTREAM_BACKOFF_MAX: float = float(
+    os.getenv("GW2TP_UPSTREAM_BACKOFF_MAX", "8")
+)
+BREAKER_THRESHOLD: int = int(os.getenv("GW2TP_BREAKER_THRESHOLD", "5"))
+BREAKER_RESET: float = float(os.getenv("GW2TP_BREAKER_RESET", "30"))
+
+STREAM_QUEUE_SIZE: int = int(os.getenv("GW2TP_STREAM_QUEUE_SIZE", "32"))
+STREAM_KEEPALIVE: float = float(os.getenv("GW2TP_STREAM_KEEPALIVE", "15"))
+
+HISTORY_INTERVAL: int = int(os.getenv("GW2TP_HISTORY_INTERVAL", "15"))
+ITEM_HISTORY_INTERVAL: int = int(os.getenv("GW2TP_ITEM_HISTORY_INTERVAL", "60"))
+
+DB_POOL_SIZE: int = int(os.getenv("GW2TP_DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW: int = int(os.getenv("GW2TP_DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT: float = float(os.getenv("GW2TP_DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE: int = int(os.getenv("GW2TP_DB_POOL_RECYCLE", "1800"))
+SQLITE_BUSY_TIMEOUT: int = int(os.getenv("GW2TP_SQLITE_BUSY_TIMEOUT", "5000"))
+SQLITE_MMAP_SIZE: int = int(
+    os.getenv("GW2TP_SQLITE_MMAP_SIZE", str(256 * 1024 * 1024))
+)
+# Negative values are in KiB, so this is a 64 MiB page cache.
+SQLITE_CACHE_SIZE: int = int(os.getenv("GW2TP_SQLITE_CACHE_SIZE", "-64000"))
+
+RETENTION_DAYS: int = int(os.getenv("GW2TP_RETENTION_DAYS", "14"))
+RETENTION_BATCH_SIZE: int = int(os.getenv("GW2TP_RETENTION_BATCH_SIZE", "5000"))
+# Empty disables the roll-up, otherwise one of the history buckets.
+RETENTION_ROLLUP: str = os.getenv("GW2TP_RETENTION_ROLLUP", "")
+if RETENTION_ROLLUP not in {"", "1h", "4h", "1d"}:
+    msg = f"GW2TP_RETENTION_ROLLUP must be 1h, 4h or 1d: {RETENTION_ROLLUP!r}"
+    raise ValueError(msg)
+
+SCHEDULER_ENABLED: bool = os.getenv("GW2TP_SCHEDULER", "1") == "1"
+SCHEDULER_LEASE_TTL: float = float(os.getenv("GW2TP_SCHEDULER_LEASE_TTL", "60"))
+
+# Off by default: every process that enables it scans the whole market.
+FLIP_SCAN_ENABLED: bool = os.getenv("GW2TP_FLIP_SCAN", "0") == "1"
+FLIP_SCAN_INTERVAL: float = float(os.getenv("GW2TP_FLIP_SCAN_INTERVAL", "600"))
+# Separate, slower budget, so a scan never queues ahead of live requests.
+FLIP_SCAN_RATE: float = float(os.getenv("GW2TP_FLIP_SCAN_RATE", "1"))
+FLIP_SCAN_CONCURRENCY: int = int(os.getenv("GW2TP_FLIP_SCAN_CONCURRENCY", "1"))
@@ -1,18 +1,190 @@
 import os
+import sqlite3
+from contextlib import contextmanager
 from pathlib import Path
+from typing import Any
+from typing import Iterator
 
+from sqlalchemy import URL
+from sqlalchemy import Engine
 from sqlalchemy import create_engine
+from sqlalchemy import event
+from sqlalchemy import make_url
+from sqlalchemy.exc import DatabaseError
+from sqlalchemy.orm import Session
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import ConnectionPoolEntry
 
+from backend.config import DB_MAX_OVERFLOW
+from backend.config import DB_POOL_RECYCLE
+from backend.config import DB_POOL_SIZE
+from backend.config import DB_POOL_TIMEOUT
+from backend.config import SQLITE_BUSY_TIMEOUT
+from backend.config import SQLITE_CACHE_SIZE
+from backend.config import SQLITE_MMAP_SIZE
 from backend.db_schema import Base
+from backend.db_schema import create_missing_columns
+from backend.db_schema import create_missing_indexes
+from backend.db_schema import legacy_table_names
+from backend.db_schema import migrate_legacy_table
+from backend.lease import acquire_lease
+from backend.lease import release_lease
 
 
 FILE_DIR = Path(__file__).parent
 DEFAULT_DB_PATH = FILE_DIR / "database" / "data.db"
-DATABASE_PATH = Path(os.getenv("DATABASE_URL", str(DEFAULT_DB_PATH)))
-DATABASE_URL = f"sqlite:///{DATABASE_PATH}"
-DATABASE_PATH.parent.mkdir(parents=True, exist_ok=True)
+POSTGRES_DRIVERNAMES = {"postgres", "postgresql"}
+MIGRATION_LEASE = "migration"
+MIGRATION_LEASE_TTL = 600.0
+SCHEMA_ATTEMPTS = 3
 
-db = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
+
+def set_sqlite_pragmas(
+    dbapi_connection: sqlite3.Connection,
+    _connection_record: ConnectionPoolEntry,
+) -> None:
+    # WAL lets /history readers run while the scheduler or cleanup writes.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.execute(f"PRAGMA cache_size={SQLITE_CACHE_SIZE}")
+    cursor.close()
+
+
+def get_database_url(
+    value: str,
+) -> URL:
+    # Plain paths keep working as SQLite files, anything with a scheme is
+    # a full SQLAlchemy URL.
+    if "://" not in value:
+        database_path = Path(value)
+        database_path.parent.mkdir(parents=True, exist_ok=True)
+        return make_url(f"sqlite:///{database_path}")
+    url = make_url(value)
+    if url.get_backend_name() in POSTGRES_DRIVERNAMES:
+        # The engine is synchronous, so Postgres always goes through
+        # psycopg, the driver the postgres extra installs.
+        return url.set(drivername="postgresql+psycopg")
+    if url.get_dialect().is_async:
+        msg = f"DATABASE_URL needs a synchronous driver, got {url.drivername}"
+        raise ValueError(msg)
+    return url
+
+
+def create_db_engine(
+    url: URL,
+) -> Engine:
+    if url.get_backend_name() != "sqlite":
+        return create_engine(
+            url,
+            pool_size=DB_POOL_SIZE,
+            max_overflow=DB_MAX_OVERFLOW,
+            pool_timeout=DB_POOL_TIMEOUT,
+            pool_recycle=DB_POOL_RECYCLE,
+            pool_pre_ping=True,
+        )
+
+    engine = create_engine(
+        url,
+        connect_args={"check_same_thread": False},
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    event.listen(engine, "connect", set_sqlite_pragmas)
+    return engine
+
+
+def _try_create_schema(
+    engine: Engine,
+) -> bool:
+    try:
+        Base.metadata.create_all(bind=engine)
+        create_missing_indexes(engine)
+        create_missing_columns(engine)
+    except DatabaseError:
+        # Workers start together, another one may have created a table
+        # between our check and our CREATE. The next pass skips it.
+        return False
+    return True
+
+
+def create_schema(
+    engine: Engine,
+) -> None:
+    for _ in range(SCHEMA_ATTEMPTS - 1):
+        if _try_create_schema(engine):
+            return
+    Base.metadata.create_all(bind=engine)
+    create_missing_indexes(engine)
+    create_missing_columns(engine)
+
+
+def migrate_legacy_tables(
+    engine: Engine,
+) -> None:
+    table_names = legacy_table_names(engine)
+    if not table_names:
+        return
+    # Every worker runs this on startup, only the lease holder migrates.
+    with Session(engine) as session:
+        if not acquire_lease(session, MIGRATION_LEASE, MIGRATION_LEASE_TTL):
+            return
+        try:
+            for table_name in table_names:
+                migrate_legacy_table(engine, table_name)
+        finally:
+            release_lease(session, MIGRATION_LEASE)
+
+
+DATABASE_URL = get_database_url(
+    os.getenv("DATABASE_URL") or str(DEFAULT_DB_PATH)
+)
+db = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(bind=db)
-Base.metadata.create_all(bind=db)
+
+
+def init_db(
+    engine: Engine = db,
+) -> None:
+    # Called on startup instead of at import, so importing the app never
+    # touches the configured database.
+    create_schema(engine)
+    migrate_legacy_tables(engine)
+
+
+def get_db() -> Iterator[Session]:
+    db = SessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+@contextmanager
+def session_scope() -> Iterator[Session]:
+    db = SessionLocal()
+    try:
+        yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def pool_stats() -> dict[str, Any]:
+    pool = db.pool
+    return {
+        "backend": db.dialect.name,
+        "pool": type(pool).__name__,
+        "size": getattr(pool, "size", lambda: None)(),
+        "checked_in": getattr(pool, "checkedin", lambda: None)(),
+        "checked_out": getattr(pool, "checkedout", lambda: None)(),
+        "overflow": getattr(pool, "overflow", lambda: None)(),
+        "status": pool.status(),
+    }
@@ -1,125 +1,304 @@
 import datetime
+from typing import Any
+from typing import Iterator
+from typing import NamedTuple
+from typing import Sequence
 
+from sqlalchemy import Engine
+from sqlalchemy import Index
+from sqlalchemy import MetaData
+from sqlalchemy import Row
+from sqlalchemy import Select
+from sqlalchemy import SQLColumnExpression
+from sqlalchemy import String
+from sqlalchemy import Table
+from sqlalchemy import insert
+from sqlalchemy import inspect
+from sqlalchemy import or_
+from sqlalchemy import select
+from sqlalchemy import text
+from sqlalchemy import union_all
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import Mapped
 from sqlalchemy.orm import Session
 from sqlalchemy.orm import mapped_column
 
+from gw2tp.constants import TAX_RATE
+from gw2tp.helper import gsc_to_copper
+
 
 Base = declarative_base()
 
+# Per-item tables used before price_history, migrated on startup.
+LEGACY_TABLES: list[str] = [
+    "scholar_rune",
+    "guardian_rune",
+    "dragonhunter_rune",
+    "relic_of_fireworks",
+    "relic_of_thief",
+    "relic_of_aristocracy",
+]
+
 
-class ItemBase:
-    __tablename__: str
+def timestamp_now() -> datetime.datetime:
+    return datetime.datetime.now(
+        tz=datetime.timezone(datetime.timedelta(hours=2), "UTC")
+    )
+
+
+class PriceHistory(Base):  # type: ignore
+    __tablename__ = "price_history"
+    __table_args__ = (
+        Index("ix_price_history_item_key_ts", "item_key", "ts"),
+        Index("ix_price_history_ts", "ts"),
+    )
 
-    id: Mapped[int] = mapped_column(primary_key=True, index=True, unique=True)
-    timestamp: Mapped[datetime.datetime] = mapped_column(
+    id: Mapped[int] = mapped_column(primary_key=True)
+    item_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    ts: Mapped[datetime.datetime] = mapped_column(
         nullable=False,
-        default=lambda: datetime.datetime.now(
-            tz=datetime.timezone(datetime.timedelta(hours=2), "UTC")
+        default=timestamp_now,
+    )
+    buy_copper: Mapped[int | None]
+    sell_copper: Mapped[int | None]
+    crafting_cost_copper: Mapped[int | None]
+    profit_copper: Mapped[int | None]
+
+    def __repr__(self) -> str:
+        return (
+            f"<PriceHistory("
+            f"id={self.id}, "
+            f"item_key={self.item_key}, "
+            f"ts={self.ts}, "
+            f"buy_copper={self.buy_copper}, "
+            f"sell_copper={self.sell_copper}, "
+            f"crafting_cost_copper={self.crafting_cost_copper}, "
+            f"profit_copper={self.profit_copper})>"
+        )
+
+
+class PriceHistoryRollup(Base):  # type: ignore
+    __tablename__ = "price_history_rollup"
+    __table_args__ = (
+        Index(
+            "ix_price_history_rollup_key",
+            "item_key",
+            "bucket",
+            "ts",
+            unique=True,
         ),
     )
 
-    crafting_cost_g: Mapped[int]
-    crafting_cost_s: Mapped[int]
-    crafting_cost_c: Mapped[int]
-    sell_g: Mapped[int]
-    sell_s: Mapped[int]
-    sell_c: Mapped[int]
+    id: Mapped[int] = mapped_column(primary_key=True)
+    item_key: Mapped[str] = mapped_column(String(64), nullable=False)
+    bucket: Mapped[str] = mapped_column(String(8), nullable=False)
+    ts: Mapped[datetime.datetime] = mapped_column(nullable=False)
+    samples: Mapped[int] = mapped_column(nullable=False, default=0)
+    buy_copper: Mapped[int | None]
+    sell_copper: Mapped[int | None]
+    crafting_cost_copper: Mapped[int | None]
+    profit_copper: Mapped[int | None]
+    # Non-NULL values behind each mean, a column can be NULL in some rows.
+    buy_copper_samples: Mapped[int | None]
+    sell_copper_samples: Mapped[int | None]
+    crafting_cost_copper_samples: Mapped[int | None]
+    profit_copper_samples: Mapped[int | None]
 
     def __repr__(self) -> str:
         return (
-            f"<ScholarRune("
-            f"id={self.id}, "
-            f"sell_g={self.sell_g}, "
-            f"sell_s={self.sell_s}, "
-            f"sell_c={self.sell_c}, "
-            f"crafting_cost_g={self.crafting_cost_g}, "
-            f"crafting_cost_s={self.crafting_cost_s}, "
-            f"crafting_cost_c={self.crafting_cost_c}, "
-            f"timestamp={self.timestamp})>"
+            f"<PriceHistoryRollup("
+            f"item_key={self.item_key}, "
+            f"bucket={self.bucket}, "
+            f"ts={self.ts}, "
+            f"samples={self.samples})>"
         )
 
 
-class ScholarRune(ItemBase, Base):  # type: ignore
-    __tablename__ = "scholar_rune"
+class SchedulerLease(Base):  # type: ignore
+    __tablename__ = "scheduler_lease"
 
+    name: Mapped[str] = mapped_column(String(64), primary_key=True)
+    holder: Mapped[str] = mapped_column(String(128), nullable=False)
+    expires_at: Mapped[datetime.datetime] = mapped_column(nullable=False)
 
-class GuardianRune(ItemBase, Base):  # type: ignore
-    __tablename__ = "guardian_rune"
+    def __repr__(self) -> str:
+        return (
+            f"<SchedulerLease("
+            f"name={self.name}, "
+            f"holder={self.holder}, "
+            f"expires_at={self.expires_at})>"
+        )
 
 
-class DragonHunterRune(ItemBase, Base):  # type: ignore
-    __tablename__ = "dragonhunter_rune"
+def _legacy_row_to_history(
+    item_key: str,
+    row: Row,
+) -> dict[str, Any]:
+    sell = int(gsc_to_copper(row.sell_g, row.sell_s, row.sell_c))
+    crafting_cost = int(
+        gsc_to_copper(
+            row.crafting_cost_g,
+            row.crafting_cost_s,
+            row.crafting_cost_c,
+        )
+    )
+    return {
+        "item_key": item_key,
+        "ts": row.timestamp,
+        "buy_copper": None,
+        "sell_copper": sell,
+        "crafting_cost_copper": crafting_cost,
+        "profit_copper": int(sell * TAX_RATE - crafting_cost),
+    }
 
 
-class FireworksRelic(ItemBase, Base):  # type: ignore
-    __tablename__ = "relic_of_fireworks"
+HISTORY_FIELDS = (
+    "ts",
+    "buy_copper",
+    "sell_copper",
+    "crafting_cost_copper",
+    "profit_copper",
+)
 
 
-class ThiefRelic(ItemBase, Base):  # type: ignore
-    __tablename__ = "relic_of_thief"
+def create_missing_indexes(
+    engine: Engine,
+) -> None:
+    # create_all() skips indexes on tables that already exist.
+    for index in PriceHistory.__table__.indexes:
+        index.create(engine, checkfirst=True)
 
 
-class AristocracyRelic(ItemBase, Base):  # type: ignore
-    __tablename__ = "relic_of_aristocracy"
+def create_missing_columns(
+    engine: Engine,
+) -> None:
+    # create_all() doesn't alter existing tables either, add new columns.
+    table = PriceHistoryRollup.__table__
+    existing = {
+        column["name"] for column in inspect(engine).get_columns(table.name)
+    }
+    with engine.begin() as conn:
+        for column in table.columns:
+            if column.name in existing:
+                continue
+            column_type = column.type.compile(engine.dialect)
+            conn.execute(
+                text(
+                    f"ALTER TABLE {table.name} "
+                    f"ADD COLUMN {column.name} {column_type}"
+                )
+            )
 
 
-DB_CLASSES: list[ItemBase] = [
-    ScholarRune,
-    GuardianRune,
-    DragonHunterRune,
-    FireworksRelic,
-    ThiefRelic,
-    AristocracyRelic,
-]
+def legacy_table_names(
+    engine: Engine,
+) -> list[str]:
+    inspector = inspect(engine)
+    return [name for name in LEGACY_TABLES if inspector.has_table(name)]
 
 
-def cleanup_old_records(
-    db: Session,
-    days: int = 14,
+def migrate_legacy_table(
+    engine: Engine,
+    table_name: str,
 ) -> None:
-    cutoff_date = datetime.datetime.now(
-        tz=datetime.timezone.utc
-    ) - datetime.timedelta(days=days)
-    try:
-        for db_class in DB_CLASSES:
-            db.query(db_class).filter(db_class.timestamp < cutoff_date).delete()
-        db.commit()
-    finally:
-        db.close()
+    # Copy and drop in one transaction, so the rows are never copied twice.
+    with engine.begin() as conn:
+        if not inspect(conn).has_table(table_name):
+            return
+        table = Table(table_name, MetaData(), autoload_with=conn)
+        rows = [
+            _legacy_row_to_history(table_name, row)
+            for row in conn.execute(select(table))
+        ]
+        if rows:
+            conn.execute(insert(PriceHistory), rows)
+        table.drop(conn)
+
+
+class HistoryCursor(NamedTuple):
+    """Last (ts, id) of a /history page, the next page starts after it."""
+
+    ts: datetime.datetime
+    # None for cursors from before ids were included, those skip ties.
+    id: int | None = None
+
+
+def _history_select(
+    model: type[PriceHistory] | type[PriceHistoryRollup],
+    row_id: SQLColumnExpression[int],
+    start_datetime: datetime.datetime | None = None,
+    end_datetime: datetime.datetime | None = None,
+    after: HistoryCursor | None = None,
+) -> Select:
+    query = select(
+        row_id.label("id"), *(getattr(model, key) for key in HISTORY_FIELDS)
+    )
+    if start_datetime:
+        query = query.where(model.ts >= start_datetime)
+    if end_datetime:
+        query = query.where(model.ts <= end_datetime)
+    if after and after.id is None:
+        query = query.where(model.ts > after.ts)
+    elif after:
+        # (ts, id) > cursor, spelled out so the (item_key, ts) index is
+        # still used for the range.
+        query = query.where(
+            model.ts >= after.ts,
+            or_(model.ts > after.ts, row_id > after.id),
+        )
+    return query
+
+
+def _history_query(
+    item_key: str,
+    start_datetime: datetime.datetime | None = None,
+    end_datetime: datetime.datetime | None = None,
+    after: HistoryCursor | None = None,
+    rollup_bucket: str | None = None,
+) -> Select:
+    window = (start_datetime, end_datetime, after)
+    query = _history_select(PriceHistory, PriceHistory.id, *window).where(
+        PriceHistory.item_key == item_key
+    )
+    if not rollup_bucket:
+        return query.order_by(PriceHistory.ts, PriceHistory.id)
+
+    # Rows past retention only survive as roll-up means, merge them in.
+    # Roll-up ids are negated so (ts, id) stays unique across both tables.
+    rollup = (
+        _history_select(PriceHistoryRollup, -PriceHistoryRollup.id, *window)
+        .where(PriceHistoryRollup.item_key == item_key)
+        .where(PriceHistoryRollup.bucket == rollup_bucket)
+    )
+    merged = union_all(rollup, query).subquery()
+    return select(*merged.c).order_by(merged.c.ts, merged.c.id)
 
 
 def get_db_data(
     db: Session,
-    table_name: str,
+    item_key: str,
+    start_datetime: datetime.datetime | None = None,
+    end_datetime: datetime.datetime | None = None,
+    after: HistoryCursor | None = None,
+    limit: int | None = None,
+    rollup_bucket: str | None = None,
+) -> Sequence[Row[Any]]:
+    query = _history_query(
+        item_key, start_datetime, end_datetime, after, rollup_bucket
+    )
+    return db.execute(query.limit(limit)).all()
+
+
+def iter_db_data(
+    db: Session,
+    item_key: str,
     start_datetime: datetime.datetime | None = None,
     end_datetime: datetime.datetime | None = None,
-) -> list[ItemBase]:
-    try:
-        for db_class in DB_CLASSES:
-            if db_class.__tablename__ == table_name:
-                if start_datetime and end_datetime:
-                    return (
-                        db.query(db_class)
-                        .filter(db_class.timestamp >= start_datetime)
-                        .filter(db_class.timestamp <= end_datetime)
-                        .all()
-                    )
-                if start_datetime:
-                    return (
-                        db.query(db_class)
-                        .filter(db_class.timestamp >= start_datetime)
-                        .all()
-                    )
-                if end_datetime:
-                    return (
-                        db.query(db_class)
-                        .filter(db_class.timestamp <= end_datetime)
-                        .all()
-                    )
-
-                return db.query(db_class).all()
-    finally:
-        db.close()
-    return []
+    after: HistoryCursor | None = None,
+    batch_size: int = 1000,
+    rollup_bucket: str | None = None,
+) -> Iterator[Row[Any]]:
+    query = _history_query(
+        item_key, start_datetime, end_datetime, after, rollup_bucket
+    )
+    yield from db.execute(query.execution_options(yield_per=batch_size))
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import asyncio
+import logging
+import time
+from typing import Any
+from typing import Literal
+from typing import NamedTuple
+
+import numpy as np
+
+from gw2tp.constants import TAX_RATE
+
+from backend.commerce import fetch_raw_prices_chunked
+from backend.commerce import fetch_tradeable_item_ids
+from backend.config import FLIP_SCAN_CONCURRENCY
+from backend.config import FLIP_SCAN_INTERVAL
+from backend.config import FLIP_SCAN_RATE
+from backend.resilience import TokenBucket
+from backend.resilience import UpstreamBudget
+
+
+logger = logging.getLogger(__name__)
+
+FlipSort = Literal["margin", "roi"]
+
+scan_budget = UpstreamBudget(
+    limiter=TokenBucket(rate=FLIP_SCAN_RATE, capacity=1),
+    semaphore=asyncio.Semaphore(FLIP_SCAN_CONCURRENCY),
+)
+
+
+class MarketScan(NamedTuple):
+    # One entry per item with both buy and sell orders, in columns.
+    item_ids: np.ndarray
+    buy: np.ndarray
+    sell: np.ndarray
+    buy_quantity: np.ndarray
+    sell_quantity: np.ndarray
+    # Units that can be flipped right away, the thinner side of the book.
+    volume: np.ndarray
+    margin: np.ndarray
+    roi: np.ndarray
+    # Row indices, best first, so a top-K query is a slice.
+    order: dict[str, np.ndarray]
+    updated_at: float
+
+    @classmethod
+    def from_prices(
+        cls,
+        items: list[dict[str, Any]],
+    ) -> MarketScan:
+        columns = np.array(
+            [
+                (
+                    item["id"],
+                    item["buys"]["unit_price"],
+                    item["sells"]["unit_price"],
+                    item["buys"]["quantity"],
+                    item["sells"]["quantity"],
+                )
+                for item in items
+            ],
+            dtype=np.int64,
+        ).reshape(-1, 5)
+        item_ids, buy, sell, buy_quantity, sell_quantity = columns.T
+        listed = (buy > 0) & (sell > 0)
+        item_ids, buy, sell = item_ids[listed], buy[listed], sell[listed]
+        buy_quantity = buy_quantity[listed]
+        sell_quantity = sell_quantity[listed]
+        # Same rounding as get_flip_profit, int() truncates towards zero.
+        margin = np.trunc(np.round(sell * TAX_RATE, 6) - buy).astype(np.int64)
+        roi = margin / buy
+        return cls(
+            item_ids=item_ids,
+            buy=buy,
+            sell=sell,
+            buy_quantity=buy_quantity,
+            sell_quantity=sell_quantity,
+            volume=np.minimum(buy_quantity, sell_quantity),
+            margin=margin,
+            roi=roi,
+            order={
+                "margin": np.argsort(-margin, kind="stable"),
+                "roi": np.argsort(-roi, kind="stable"),
+            },
+            updated_at=time.time(),
+        )
+
+    def age(self) -> float:
+        return round(time.time() - self.updated_at, 3)
+
+    def top(
+        self,
+        sort: FlipSort = "margin",
+        limit: int = 50,
+        min_volume: int = 0,
+    ) -> list[dict[str, Any]]:
+        order = self.order[sort]
+        if min_volume > 0:
+            order = order[self.volume[order] >= min_volume]
+        return [
+            {
+                "id": int(self.item_ids[i]),
+                "buy": int(self.buy[i]),
+                "sell": int(self.sell[i]),
+                "buy_quantity": int(self.buy_quantity[i]),
+                "sell_quantity": int(self.sell_quantity[i]),
+                "margin": int(self.margin[i]),
+                "roi": round(float(self.roi[i]), 4),
+            }
+            for i in order[:limit]
+        ]
+
+
+class MarketScanner:
+    def __init__(self) -> None:
+        self.scan: MarketScan | None = None
+
+    async def refresh(self) -> None:
+        item_ids = await fetch_tradeable_item_ids(scan_budget)
+        # A failed chunk only leaves its items out of this scan, the fetch
+        # raises when every chunk failed.
+        items = await fetch_raw_prices_chunked(item_ids, scan_budget)
+        # Swap in the finished scan, readers never see a partial one.
+        self.scan = MarketScan.from_prices(items)
+
+
+market_scanner = MarketScanner()
+
+
+async def run_market_scanner(
+    interval: float = FLIP_SCAN_INTERVAL,
+) -> None:
+    while True:
+        try:
+            await market_scanner.refresh()
+        except Exception:
+            logger.exception("Market flip scan failed")
+        await asyncio.sleep(interval)
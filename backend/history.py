@@ -0,0 +1,168 @@
+import json
+import math
+from typing import Any
+from typing import Iterable
+from typing import Iterator
+from typing import Literal
+from typing import Sequence
+
+import numpy as np
+from sqlalchemy import Row
+
+
+Bucket = Literal["1h", "4h", "1d"]
+Aggregation = Literal["ohlc", "mean", "last"]
+HistoryFormat = Literal["json", "ndjson"]
+Columns = dict[str, np.ndarray]
+
+BUCKET_SECONDS: dict[str, int] = {
+    "1h": 60 * 60,
+    "4h": 4 * 60 * 60,
+    "1d": 24 * 60 * 60,
+}
+VALUE_FIELDS = (
+    "buy_copper",
+    "sell_copper",
+    "crafting_cost_copper",
+    "profit_copper",
+)
+LTTB_FIELD = "sell_copper"
+
+
+def history_columns(
+    rows: Sequence[Row[Any]],
+) -> Columns:
+    columns: Columns = {
+        "ts": np.array([row.ts for row in rows], dtype="datetime64[us]"),
+    }
+    for key in VALUE_FIELDS:
+        columns[key] = np.array(
+            [getattr(row, key) for row in rows],
+            dtype=np.float64,
+        )
+    return columns
+
+
+def aggregate_columns(
+    columns: Columns,
+    bucket: Bucket,
+    agg: Aggregation,
+) -> Columns:
+    ts = columns["ts"]
+    if len(ts) == 0:
+        return columns
+
+    bucket_us = BUCKET_SECONDS[bucket] * 1_000_000
+    bucket_ids = ts.astype(np.int64) // bucket_us
+    # Rows are sorted by ts, so every bucket is one contiguous run.
+    starts = np.flatnonzero(np.diff(bucket_ids, prepend=bucket_ids[0] - 1))
+    ends = np.append(starts[1:], len(ts)) - 1
+
+    aggregated: Columns = {
+        "ts": (bucket_ids[starts] * bucket_us).astype("datetime64[us]"),
+    }
+    for key in VALUE_FIELDS:
+        values = columns[key]
+        if agg == "last":
+            aggregated[key] = values[ends]
+        elif agg == "mean":
+            present = ~np.isnan(values)
+            total = np.add.reduceat(np.where(present, values, 0.0), starts)
+            count = np.add.reduceat(present, starts)
+            with np.errstate(invalid="ignore"):
+                aggregated[key] = np.rint(total / count)
+        else:
+            aggregated[f"{key}_open"] = values[starts]
+            aggregated[f"{key}_high"] = np.fmax.reduceat(values, starts)
+            aggregated[f"{key}_low"] = np.fmin.reduceat(values, starts)
+            aggregated[f"{key}_close"] = values[ends]
+    return aggregated
+
+
+def lttb_indices(
+    x: np.ndarray,
+    y: np.ndarray,
+    points: int,
+) -> np.ndarray:
+    size = len(x)
+    if points >= size or points < 3:
+        return np.arange(size)
+
+    # First and last points are kept, the rest is split into points - 2
+    # buckets which each contribute the point spanning the largest
+    # triangle with the previous pick and the next bucket's average.
+    edges = np.linspace(1, size - 1, points - 1).astype(np.int64)
+    selected = np.empty(points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = size - 1
+    previous = 0
+    for i in range(points - 2):
+        start, end = edges[i], edges[i + 1]
+        next_end = edges[i + 2] if i + 2 < len(edges) else size
+        avg_x = x[end:next_end].mean()
+        avg_y = y[end:next_end].mean()
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(area))
+        selected[i + 1] = previous
+    return selected
+
+
+def downsample_columns(
+    columns: Columns,
+    points: int,
+) -> Columns:
+    y_key = LTTB_FIELD if LTTB_FIELD in columns else f"{LTTB_FIELD}_close"
+    indices = lttb_indices(
+        columns["ts"].astype(np.int64).astype(np.float64),
+        np.nan_to_num(columns[y_key]),
+        points,
+    )
+    return {key: values[indices] for key, values in columns.items()}
+
+
+def history_records(
+    columns: Columns,
+) -> list[dict[str, Any]]:
+    fields = {
+        key: [None if math.isnan(v) else int(v) for v in values.tolist()]
+        for key, values in columns.items()
+        if key != "ts"
+    }
+    timestamps = np.datetime_as_string(columns["ts"], unit="us").tolist()
+    return [
+        {"ts": ts, **{key: values[i] for key, values in fields.items()}}
+        for i, ts in enumerate(timestamps)
+    ]
+
+
+def history_record(
+    row: Row[Any],
+) -> dict[str, Any]:
+    return {
+        "ts": row.ts.isoformat(timespec="microseconds"),
+        **{key: getattr(row, key) for key in VALUE_FIELDS},
+    }
+
+
+def to_ndjson(
+    records: Iterable[dict[str, Any]],
+) -> Iterator[str]:
+    for record in records:
+        yield json.dumps(record) + "\n"
+
+
+def build_history(
+    rows: Sequence[Row[Any]],
+    bucket: Bucket | None = None,
+    agg: Aggregation = "mean",
+    points: int | None = None,
+) -> list[dict[str, Any]]:
+    columns = history_columns(rows)
+    if bucket is not None:
+        columns = aggregate_columns(columns, bucket, agg)
+    if points is not None:
+        columns = downsample_columns(columns, points)
+    return history_records(columns)
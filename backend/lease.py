@@ -0,0 +1,76 @@
+import datetime
+import os
+import socket
+import uuid
+
+from sqlalchemy import insert
+from sqlalchemy import or_
+from sqlalchemy import update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from backend.db_schema import SchedulerLease
+
+
+LEASE_HOLDER = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def _utc_now() -> datetime.datetime:
+    # Stored naive, so SQLite and Postgres compare the same values.
+    return datetime.datetime.now(tz=datetime.timezone.utc).replace(tzinfo=None)
+
+
+def acquire_lease(
+    db: Session,
+    name: str,
+    ttl: float,
+    holder: str = LEASE_HOLDER,
+) -> bool:
+    now = _utc_now()
+    expires_at = now + datetime.timedelta(seconds=ttl)
+    # Renew our own lease or take over an expired one in a single UPDATE,
+    # so two processes can never both see the lease as free.
+    result = db.execute(
+        update(SchedulerLease)
+        .where(
+            SchedulerLease.name == name,
+            or_(
+                SchedulerLease.holder == holder,
+                SchedulerLease.expires_at < now,
+            ),
+        )
+        .values(holder=holder, expires_at=expires_at)
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 1:  # type: ignore[attr-defined]
+        db.commit()
+        return True
+
+    try:
+        db.execute(
+            insert(SchedulerLease).values(
+                name=name,
+                holder=holder,
+                expires_at=expires_at,
+            )
+        )
+        db.commit()
+    except IntegrityError:
+        # Somebody else holds the lease.
+        db.rollback()
+        return False
+    return True
+
+
+def release_lease(
+    db: Session,
+    name: str,
+    holder: str = LEASE_HOLDER,
+) -> None:
+    db.execute(
+        update(SchedulerLease)
+        .where(SchedulerLease.name == name, SchedulerLease.holder == holder)
+        .values(expires_at=_utc_now())
+        .execution_options(synchronize_session=False)
+    )
+    db.commit()
@@ -0,0 +1,98 @@
+from __future__ import annotations
+
+from typing import Any
+from typing import NamedTuple
+
+import numpy as np
+
+from gw2tp.constants import API
+
+from backend.commerce import InflightTasks
+from backend.commerce import fetch_coalesced
+from backend.commerce import get_budget
+from backend.commerce import upstream_get
+from backend.config import LISTINGS_CACHE_TTL
+from backend.config import PRICE_CACHE_MAX_SIZE
+from backend.price_cache import PriceCache
+
+
+listings_cache = PriceCache(
+    ttl=LISTINGS_CACHE_TTL, max_size=PRICE_CACHE_MAX_SIZE
+)
+_inflight: InflightTasks = {}
+
+
+class OrderBookSide(NamedTuple):
+    # Best price first, with running totals for walking the book.
+    prices: np.ndarray
+    cum_quantity: np.ndarray
+    cum_cost: np.ndarray
+
+    @classmethod
+    def from_listings(
+        cls,
+        listings: list[dict[str, Any]],
+        *,
+        descending: bool,
+    ) -> OrderBookSide:
+        prices = np.array([e["unit_price"] for e in listings], dtype=np.int64)
+        quantities = np.array([e["quantity"] for e in listings], dtype=np.int64)
+        order = np.argsort(-prices if descending else prices, kind="stable")
+        prices = prices[order]
+        quantities = quantities[order]
+        return cls(
+            prices=prices,
+            cum_quantity=np.cumsum(quantities),
+            cum_cost=np.cumsum(prices * quantities),
+        )
+
+    @property
+    def depth(self) -> int:
+        return int(self.cum_quantity[-1]) if len(self.cum_quantity) else 0
+
+    def fill_cost(
+        self,
+        quantity: int,
+    ) -> float | None:
+        """Total price for `quantity` units, None if the book is too thin."""
+        index = int(np.searchsorted(self.cum_quantity, quantity))
+        if index >= len(self.prices):
+            return None
+        if index == 0:
+            return float(quantity * self.prices[0])
+        remaining = quantity - self.cum_quantity[index - 1]
+        return float(self.cum_cost[index - 1] + remaining * self.prices[index])
+
+
+def parse_listings_item(
+    item: dict[str, Any],
+) -> dict[str, Any]:
+    return {
+        "buys": OrderBookSide.from_listings(item["buys"], descending=True),
+        "sells": OrderBookSide.from_listings(item["sells"], descending=False),
+    }
+
+
+async def fetch_upstream_listings(
+    item_ids: list[int],
+) -> dict[int, dict[str, Any]]:
+    params = {"ids": ",".join(str(i) for i in item_ids)}
+    response = await upstream_get(API.GW2_LISTINGS_API_URL, params)
+    data: list[dict[str, Any]] = response.json()
+    return {int(item["id"]): parse_listings_item(item) for item in data}
+
+
+async def _fetch_chunk(
+    item_ids: list[int],
+) -> dict[int, dict[str, Any]]:
+    # Same concurrency budget as the price chunks.
+    async with get_budget().semaphore:
+        return await fetch_upstream_listings(item_ids)
+
+
+async def fetch_listings(
+    item_ids: list[int],
+) -> dict[int, dict[str, Any]]:
+    return await fetch_coalesced(
+        item_ids, _fetch_chunk, listings_cache, _inflight
+    )
@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any
+from typing import Iterable
+
+
+class PriceCache:
+    """Per-item TTL cache with a bounded size and LRU eviction."""
+
+    def __init__(
+        self,
+        ttl: float,
+        max_size: int,
+    ) -> None:
+        self.ttl = ttl
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[int, tuple[float, dict[str, Any]]] = (
+            OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_many(
+        self,
+        item_ids: Iterable[int],
+    ) -> tuple[dict[int, dict[str, Any]], list[int]]:
+        """Return the fresh cached prices and the IDs that must be fetched."""
+        now = time.monotonic()
+        found: dict[int, dict[str, Any]] = {}
+        missing: list[int] = []
+        with self._lock:
+            for item_id in dict.fromkeys(item_ids):
+                entry = self._entries.get(item_id)
+                if entry is None or now - entry[0] > self.ttl:
+                    missing.append(item_id)
+                    self.misses += 1
+                    continue
+                self._entries.move_to_end(item_id)
+                found[item_id] = entry[1]
+                self.hits += 1
+        return found, missing
+
+    def get_stale(
+        self,
+        item_ids: Iterable[int],
+    ) -> dict[int, dict[str, Any]]:
+        """Return cached prices regardless of age, for upstream outages."""
+        with self._lock:
+            return {
+                item_id: self._entries[item_id][1]
+                for item_id in item_ids
+                if item_id in self._entries
+            }
+
+    def put_many(
+        self,
+        prices: dict[int, dict[str, Any]],
+    ) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for item_id, price in prices.items():
+                self._entries[item_id] = (now, price)
+                self._entries.move_to_end(item_id)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "size": len(self._entries),
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
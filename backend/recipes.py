@@ -0,0 +1,341 @@
+from dataclasses import dataclass
+from typing import Any
+from typing import Iterable
+from typing import Literal
+from typing import NamedTuple
+
+import numpy as np
+
+from gw2tp.constants import TAX_RATE
+from gw2tp.constants import ItemIDs
+from gw2tp.helper import get_sub_dct
+
+
+PriceField = Literal["buy", "sell"]
+
+BOTTLE_OF_ELONIAN_WINE_COST: float = 2504.0
+
+CRAFT_ERROR: dict[str, float] = {
+    "crafting_cost": -1,
+    "sell": -1,
+    "profit": -1,
+}
+
+
+@dataclass(frozen=True)
+class Ingredient:
+    item_id: int
+    quantity: float
+    price: PriceField = "buy"
+
+
+@dataclass(frozen=True)
+class Recipe:
+    name: str
+    output_id: int
+    ingredients: tuple[Ingredient, ...]
+    # Interchangeable ingredient sets, the cheapest one is used.
+    alternatives: tuple[tuple[Ingredient, ...], ...] = ((),)
+    fixed_cost: float = 0.0
+
+    @property
+    def item_ids(self) -> list[int]:
+        ids = [self.output_id]
+        ids.extend(i.item_id for i in self.ingredients)
+        for alternative in self.alternatives:
+            ids.extend(i.item_id for i in alternative)
+        return list(dict.fromkeys(ids))
+
+    @property
+    def paths(self) -> list[tuple[Ingredient, ...]]:
+        return [self.ingredients + alt for alt in self.alternatives]
+
+
+LUCENT_ALTERNATIVES = {
+    quantity: (
+        (Ingredient(ItemIDs.PILE_OF_LUCENT_CRYSTAL, quantity),),
+        (Ingredient(ItemIDs.LUCENT_MOTE, quantity * 10.0),),
+    )
+    for quantity in (8.0, 48.0)
+}
+
+RECIPES: dict[str, Recipe] = {
+    recipe.name: recipe
+    for recipe in (
+        # runes
+        Recipe(
+            name="scholar_rune",
+            output_id=ItemIDs.SCHOLAR_RUNE,
+            ingredients=(
+                Ingredient(ItemIDs.ECTOPLASM, 5.0),
+                Ingredient(ItemIDs.ELABORATE_TOTEM, 5.0),
+                Ingredient(ItemIDs.CHARM_OF_BRILLIANCE, 2.0),
+            ),
+            alternatives=LUCENT_ALTERNATIVES[8.0],
+        ),
+        Recipe(
+            name="guardian_rune",
+            output_id=ItemIDs.GUARD_RUNE,
+            ingredients=(
+                Ingredient(ItemIDs.CHARGED_LODESTONE, 1.0, "sell"),
+                Ingredient(ItemIDs.CHARM_OF_POTENCE, 1.0),
+                Ingredient(ItemIDs.ECTOPLASM, 5.0),
+                Ingredient(ItemIDs.PILE_OF_LUCENT_CRYSTAL, 12.0),
+            ),
+        ),
+        Recipe(
+            name="dragonhunter_rune",
+            output_id=ItemIDs.DRAGONHUNTER_RUNE,
+            ingredients=(
+                # guardian rune
+                Ingredient(ItemIDs.CHARGED_LODESTONE, 1.0, "sell"),
+                Ingredient(ItemIDs.CHARM_OF_POTENCE, 1.0),
+                Ingredient(ItemIDs.ECTOPLASM, 5.0),
+                Ingredient(ItemIDs.PILE_OF_LUCENT_CRYSTAL, 12.0),
+                # upgrade
+                Ingredient(ItemIDs.EVERGREEN_LODESTONE, 1.0),
+                Ingredient(ItemIDs.BARBED_THORN, 10.0),
+            ),
+        ),
+        # relics
+        Recipe(
+            name="relic_of_fireworks",
+            output_id=ItemIDs.RELIC_OF_FIREWORKS,
+            ingredients=(
+                Ingredient(ItemIDs.ECTOPLASM, 15.0),
+                Ingredient(ItemIDs.CHARM_OF_SKILL, 3.0),
+            ),
+            alternatives=LUCENT_ALTERNATIVES[48.0],
+        ),
+        Recipe(
+            name="relic_of_thief",
+            output_id=ItemIDs.RELIC_OF_THIEF,
+            ingredients=(
+                Ingredient(ItemIDs.ECTOPLASM, 15.0),
+                Ingredient(ItemIDs.CHARM_OF_SKILL, 3.0),
+                Ingredient(ItemIDs.CURED_HARDENED_LEATHER_SQUARE, 5.0),
+            ),
+            alternatives=LUCENT_ALTERNATIVES[48.0],
+        ),
+        Recipe(
+            name="relic_of_aristocracy",
+            output_id=ItemIDs.RELIC_OF_ARISTOCRACY,
+            ingredients=(
+                Ingredient(ItemIDs.ECTOPLASM, 15.0),
+                Ingredient(ItemIDs.CHARM_OF_BRILLIANCE, 3.0),
+            ),
+            alternatives=LUCENT_ALTERNATIVES[48.0],
+            fixed_cost=BOTTLE_OF_ELONIAN_WINE_COST * 3.0,
+        ),
+        # sigils
+        Recipe(
+            name="sigil_of_impact",
+            output_id=ItemIDs.SIGIL_OF_IMPACT,
+            ingredients=(
+                Ingredient(ItemIDs.ECTOPLASM, 10.0),
+                Ingredient(ItemIDs.ONYX_LODESTONE, 1.0),
+                Ingredient(ItemIDs.LUCENT_MOTE, 50.0),
+                Ingredient(ItemIDs.SYMBOL_OF_PAIN, 3.0),
+            ),
+        ),
+        Recipe(
+            name="sigil_of_doom",
+            output_id=ItemIDs.SIGIL_OF_DOOMM,
+            ingredients=(
+                Ingredient(ItemIDs.ECTOPLASM, 10.0),
+                Ingredient(ItemIDs.MOLTEN_LODESTONE, 1.0),
+                Ingredient(ItemIDs.LUCENT_MOTE, 100.0),
+                Ingredient(ItemIDs.SYMBOL_OF_PAIN, 2.0),
+            ),
+        ),
+        Recipe(
+            name="sigil_of_torment",
+            output_id=ItemIDs.SIGIL_OF_TORMENT,
+            ingredients=(
+                Ingredient(ItemIDs.ECTOPLASM, 10.0),
+                Ingredient(ItemIDs.PRISTINE_TOXIC_SPORE, 100.0),
+                Ingredient(ItemIDs.LUCENT_MOTE, 150.0),
+                Ingredient(ItemIDs.SYMBOL_OF_PAIN, 1.0),
+            ),
+        ),
+        Recipe(
+            name="sigil_of_bursting",
+            output_id=ItemIDs.SIGIL_OF_BURSTING,
+            ingredients=(
+                Ingredient(ItemIDs.ECTOPLASM, 10.0),
+                Ingredient(ItemIDs.WATCHWORK_SPROCKET, 250.0),
+                Ingredient(ItemIDs.LUCENT_MOTE, 150.0),
+                Ingredient(ItemIDs.SYMBOL_OF_ENH, 1.0),
+            ),
+        ),
+        Recipe(
+            name="sigil_of_paralyzation",
+            output_id=ItemIDs.SIGIL_OF_PARALYSIS,
+            ingredients=(
+                Ingredient(ItemIDs.ECTOPLASM, 10.0),
+                Ingredient(ItemIDs.ONYX_LODESTONE, 1.0),
+                Ingredient(ItemIDs.LUCENT_MOTE, 150.0),
+                Ingredient(ItemIDs.SYMBOL_OF_CONTROL, 1.0),
+            ),
+        ),
+        # other
+        Recipe(
+            name="thesis_on_masterful_malice",
+            output_id=ItemIDs.THESIS_MASTERFUL_MALICE,
+            ingredients=(
+                Ingredient(ItemIDs.WRIT_MASTERFUL_MALICE, 3.0),
+                Ingredient(ItemIDs.CRYSTALINE_DUST, 5.0),
+                Ingredient(ItemIDs.ANCIENT_WOOD_LOG, 48.0),
+                Ingredient(ItemIDs.HARDENED_LEATHER, 10.0),
+                Ingredient(ItemIDs.ORICHALCUM_ORE, 12.0),
+                Ingredient(ItemIDs.GOSSAMER_SCRAP, 20.0),
+                Ingredient(ItemIDs.GOSSAMER_THREAD, 10.0),
+                Ingredient(ItemIDs.POUCH_OF_BLACK_PIGMENTS, 3.0),
+                Ingredient(ItemIDs.POUCH_OF_WHITE_PIGMENTS, 3.0),
+                Ingredient(ItemIDs.JUG_OF_WATER, 20.0),
+            ),
+        ),
+    )
+}
+
+
+def recipe_path_costs(
+    recipe: Recipe,
+    prices: dict[int, dict[str, Any]],
+) -> list[float]:
+    return [
+        recipe.fixed_cost
+        + sum(prices[i.item_id][i.price] * i.quantity for i in path)
+        for path in recipe.paths
+    ]
+
+
+def evaluate_recipe(
+    recipe: Recipe,
+    prices: dict[int, dict[str, Any]],
+) -> dict[str, Any]:
+    crafting_cost = min(recipe_path_costs(recipe, prices))
+    sell = prices[recipe.output_id]["sell"]
+    profit = sell * TAX_RATE - crafting_cost
+
+    return {
+        **get_sub_dct("crafting_cost", crafting_cost),
+        **get_sub_dct("sell", sell),
+        **get_sub_dct("profit", profit),
+    }
+
+
+class RecipeMatrixResult(NamedTuple):
+    path_costs: np.ndarray
+    crafting_cost: np.ndarray
+    sell: np.ndarray
+    sell_after_tax: np.ndarray
+    profit: np.ndarray
+
+
+class RecipeMatrix:
+    """Sparse ingredient-quantity matrix over all recipe paths.
+
+    Each row is one ingredient path of a recipe, each column one
+    (item, price side) pair, so every path cost is a single sparse
+    matrix-vector product with the price vector.
+    """
+
+    def __init__(
+        self,
+        recipes: Iterable[Recipe],
+    ) -> None:
+        self.recipes = list(recipes)
+        self.names = [recipe.name for recipe in self.recipes]
+        self.columns: dict[tuple[int, PriceField], int] = {}
+
+        rows: list[int] = []
+        cols: list[int] = []
+        quantities: list[float] = []
+        path_fixed_costs: list[float] = []
+        offsets: list[int] = []
+        output_cols: list[int] = []
+        for recipe in self.recipes:
+            offsets.append(len(path_fixed_costs))
+            output_cols.append(self._column(recipe.output_id, "sell"))
+            for path in recipe.paths:
+                row = len(path_fixed_costs)
+                path_fixed_costs.append(recipe.fixed_cost)
+                for ingredient in path:
+                    rows.append(row)
+                    cols.append(
+                        self._column(ingredient.item_id, ingredient.price)
+                    )
+                    quantities.append(ingredient.quantity)
+
+        self.rows = np.asarray(rows, dtype=np.intp)
+        self.cols = np.asarray(cols, dtype=np.intp)
+        self.quantities = np.asarray(quantities, dtype=np.float64)
+        self.path_fixed_costs = np.asarray(path_fixed_costs, dtype=np.float64)
+        self.offsets = np.asarray(offsets, dtype=np.intp)
+        self.output_cols = np.asarray(output_cols, dtype=np.intp)
+
+    def _column(
+        self,
+        item_id: int,
+        price: PriceField,
+    ) -> int:
+        return self.columns.setdefault((item_id, price), len(self.columns))
+
+    @property
+    def item_ids(self) -> list[int]:
+        return list(dict.fromkeys(item_id for item_id, _ in self.columns))
+
+    def price_vector(
+        self,
+        prices: dict[int, dict[str, Any]],
+    ) -> np.ndarray:
+        return np.fromiter(
+            (prices[item_id][price] for item_id, price in self.columns),
+            dtype=np.float64,
+            count=len(self.columns),
+        )
+
+    def evaluate(
+        self,
+        prices: dict[int, dict[str, Any]],
+    ) -> RecipeMatrixResult:
+        price_vector = self.price_vector(prices)
+        path_costs = self.path_fixed_costs + np.bincount(
+            self.rows,
+            weights=self.quantities * price_vector[self.cols],
+            minlength=len(self.path_fixed_costs),
+        )
+        crafting_cost = np.minimum.reduceat(path_costs, self.offsets)
+        sell = price_vector[self.output_cols]
+        sell_after_tax = sell * TAX_RATE
+        return RecipeMatrixResult(
+            path_costs=path_costs,
+            crafting_cost=crafting_cost,
+            sell=sell,
+            sell_after_tax=sell_after_tax,
+            profit=sell_after_tax - crafting_cost,
+        )
+
+
+RECIPE_MATRIX = RecipeMatrix(RECIPES.values())
+
+
+def evaluate_all(
+    prices: dict[int, dict[str, Any]],
+) -> dict[str, dict[str, Any]]:
+    result = RECIPE_MATRIX.evaluate(prices)
+    return {
+        name: {
+            **get_sub_dct("crafting_cost", float(crafting_cost)),
+            **get_sub_dct("sell", float(sell)),
+            **get_sub_dct("profit", float(profit)),
+        }
+        for name, crafting_cost, sell, profit in zip(
+            RECIPE_MATRIX.names,
+            result.crafting_cost,
+            result.sell,
+            result.profit,
+            strict=True,
+        )
+    }
@@ -0,0 +1,96 @@
+import asyncio
+import random
+import time
+from typing import Any
+from typing import NamedTuple
+
+
+class CircuitOpenError(RuntimeError):
+    pass
+
+
+class TokenBucket:
+    """Async token bucket shared by every upstream request."""
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+    ) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        elapsed = now - self._updated
+        self._tokens = min(self.capacity, self._tokens + elapsed * self.rate)
+        self._updated = now
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                # Holding the lock keeps waiters in FIFO order.
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+
+class UpstreamBudget(NamedTuple):
+    """Rate and concurrency limits shared by one class of requests."""
+
+    limiter: TokenBucket
+    semaphore: asyncio.Semaphore
+
+
+class CircuitBreaker:
+    """Opens after consecutive failures, lets one probe through later."""
+
+    def __init__(
+        self,
+        failure_threshold: int,
+        reset_timeout: float,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self._opened_at: float | None = None
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def check(self) -> None:
+        if self.state == "open":
+            raise CircuitOpenError("Upstream circuit is open")
+        if self.state == "half_open":
+            # Let this request probe, hold the others back until it's done.
+            self._opened_at = time.monotonic()
+
+    def record_success(self) -> None:
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self) -> None:
+        self.failures += 1
+        if self.failures >= self.failure_threshold:
+            self._opened_at = time.monotonic()
+
+    def stats(self) -> dict[str, Any]:
+        return {"state": self.state, "failures": self.failures}
+
+
+def backoff_delay(
+    attempt: int,
+    base: float,
+    maximum: float,
+) -> float:
+    # Full jitter, so retrying clients don't hit the API in lockstep.
+    return random.uniform(0, min(maximum, base * 2**attempt))  # noqa: S311
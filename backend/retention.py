@@ -0,0 +1,120 @@
+import datetime
+from collections import defaultdict
+from typing import Any
+from typing import Sequence
+
+from sqlalchemy import Row
+from sqlalchemy import delete
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.config import RETENTION_BATCH_SIZE
+from backend.config import RETENTION_DAYS
+from backend.config import RETENTION_ROLLUP
+from backend.db_schema import PriceHistory
+from backend.db_schema import PriceHistoryRollup
+from backend.db_schema import timestamp_now
+from backend.history import BUCKET_SECONDS
+from backend.history import VALUE_FIELDS
+
+
+EPOCH = datetime.datetime(1970, 1, 1)  # noqa: DTZ001
+
+
+def _bucket_start(
+    ts: datetime.datetime,
+    bucket_seconds: int,
+) -> datetime.datetime:
+    elapsed = (ts.replace(tzinfo=None) - EPOCH).total_seconds()
+    return ts - datetime.timedelta(seconds=elapsed % bucket_seconds)
+
+
+def _merge_rollup(
+    rollup: PriceHistoryRollup,
+    rows: list[Row[Any]],
+) -> None:
+    for key in VALUE_FIELDS:
+        values = [getattr(row, key) for row in rows]
+        values = [value for value in values if value is not None]
+        if not values:
+            continue
+        previous = getattr(rollup, key)
+        previous_count = getattr(rollup, f"{key}_samples")
+        if previous_count is None:
+            # Rolled up before per-column counts were stored.
+            previous_count = rollup.samples
+        total = float(sum(values))
+        count = len(values)
+        if previous is not None:
+            total += previous * previous_count
+            count += previous_count
+        setattr(rollup, key, round(total / count))
+        setattr(rollup, f"{key}_samples", count)
+    rollup.samples += len(rows)
+
+
+def rollup_rows(
+    db: Session,
+    rows: Sequence[Row[Any]],
+    bucket: str,
+) -> None:
+    bucket_seconds = BUCKET_SECONDS[bucket]
+    groups: dict[tuple[str, datetime.datetime], list[Row[Any]]]
+    groups = defaultdict(list)
+    for row in rows:
+        ts = _bucket_start(row.ts, bucket_seconds)
+        groups[row.item_key, ts].append(row)
+
+    for (item_key, ts), group in groups.items():
+        rollup = db.scalars(
+            select(PriceHistoryRollup).where(
+                PriceHistoryRollup.item_key == item_key,
+                PriceHistoryRollup.bucket == bucket,
+                PriceHistoryRollup.ts == ts,
+            )
+        ).one_or_none()
+        if rollup is None:
+            rollup = PriceHistoryRollup(
+                item_key=item_key,
+                bucket=bucket,
+                ts=ts,
+                samples=0,
+            )
+            db.add(rollup)
+        _merge_rollup(rollup, group)
+
+
+def cleanup_old_records(
+    db: Session,
+    days: int = RETENTION_DAYS,
+    batch_size: int = RETENTION_BATCH_SIZE,
+    rollup: str = RETENTION_ROLLUP,
+) -> int:
+    # Same clock the writers use, so the window is exactly `days` long.
+    cutoff_date = timestamp_now() - datetime.timedelta(days=days)
+    query = (
+        select(
+            PriceHistory.id,
+            PriceHistory.item_key,
+            PriceHistory.ts,
+            *(getattr(PriceHistory, key) for key in VALUE_FIELDS),
+        )
+        .where(PriceHistory.ts < cutoff_date)
+        .order_by(PriceHistory.id)
+        .limit(batch_size)
+    )
+    deleted = 0
+    # One short transaction per batch, so the fetch job can write in
+    # between instead of waiting for the whole cleanup.
+    while rows := db.execute(query).all():
+        if rollup:
+            rollup_rows(db, rows, rollup)
+        db.execute(
+            delete(PriceHistory).where(
+                PriceHistory.id.in_([row.id for row in rows])
+            ),
+            execution_options={"synchronize_session": False},
+        )
+        db.commit()
+        deleted += len(rows)
+    return deleted
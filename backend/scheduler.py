@@ -1,119 +1,229 @@
+import asyncio
 import datetime
+import inspect
+import time
+from dataclasses import dataclass
+from dataclasses import field
 from typing import Any
+from typing import Awaitable
+from typing import Callable
 
-import aiohttp
+from apscheduler.events import EVENT_JOB_SUBMITTED
+from apscheduler.events import JobSubmissionEvent
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from sqlalchemy.orm import Session
+from sqlalchemy import insert
 
-from gw2tp.helper import host_url
 from gw2tp.helper import is_running_on_railway
 
-from .db import SessionLocal
-from .db_schema import AristocracyRelic
-from .db_schema import DragonHunterRune
-from .db_schema import FireworksRelic
-from .db_schema import GuardianRune
-from .db_schema import ScholarRune
-from .db_schema import ThiefRelic
-from .db_schema import cleanup_old_records
+from .config import SCHEDULER_LEASE_TTL
+from .db import session_scope
+from .db_schema import PriceHistory
+from .db_schema import timestamp_now
+from .lease import LEASE_HOLDER
+from .lease import acquire_lease
+from .lease import release_lease
+from .retention import cleanup_old_records
+from .sections import compute_sections
+from .sections import section_item_ids
+from .snapshot import get_prices
+from .tracking import history_rows
+from .tracking import tracked_items
+from .tracking import tracked_sections
+from .tracking import tracking_intervals
 
 
-api_base = host_url()
+SCHEDULER_LEASE = "scheduler"
 
 
-async def _fetch_single_request(
-    db: Session,
-    api_command: str,
-    data_keys: list[str],
-    data_cls: type,
-) -> None:
-    async with aiohttp.ClientSession() as session:  # noqa: SIM117
-        async with session.get(f"{api_base}{api_command}") as response:
-            data: dict[str, Any] = await response.json()
-            if data.get("detail", "") == "Not Found":
-                print(f"API command '{api_command}' not found.")
-                return
-            kwargs = {}
-
-            for data_key in data_keys:
-                kwargs.update(
-                    {
-                        key: value
-                        for key, value in data.items()
-                        if key.startswith(data_key)
-                    }
-                )
-
-            db.add(
-                data_cls(
-                    **kwargs,
-                    timestamp=datetime.datetime.now(
-                        tz=datetime.timezone(datetime.timedelta(hours=2), "UTC")
-                    ),
-                )
-            )
-            db.commit()
+@dataclass
+class JobStats:
+    runs: int = 0
+    last_lag: float | None = None
+    last_started: float | None = None
+    last_duration: float | None = None
+    last_error: str | None = None
+
+
+@dataclass
+class SchedulerState:
+    leader: bool = False
+    scheduler: AsyncIOScheduler | None = None
+    jobs: dict[str, JobStats] = field(default_factory=dict)
+
 
+scheduler_state = SchedulerState()
 
-async def fetch_api_data() -> None:
+
+async def fetch_api_data(
+    interval: int | None = None,
+) -> None:
     print("Fetching data...")
-    fetch_keys = ["crafting_cost", "sell"]
-    db = SessionLocal()
-    requests = [
-        ("scholar_rune", ScholarRune),
-        ("guardian_rune", GuardianRune),
-        ("dragonhunter_rune", DragonHunterRune),
-        ("relic_of_fireworks", FireworksRelic),
-        ("relic_of_thief", ThiefRelic),
-        ("relic_of_aristocracy", AristocracyRelic),
-    ]
-    for request, cls in requests:
-        await _fetch_single_request(
-            db,
-            request,
-            fetch_keys,
-            cls,
-        )
-    db.close()
+    sections = tracked_sections(interval)
+    names = list(dict.fromkeys(sections.values()))
+    items = tracked_items(interval)
+    item_ids = section_item_ids(names) + list(items.values())
+    prices = await get_prices(list(dict.fromkeys(item_ids)))
+    results, errors = compute_sections(names, prices)
+    for name, error in errors.items():
+        print(f"Section '{name}' failed: {error}")
+
+    rows = history_rows(results, sections, items, prices, timestamp_now())
+    if rows:
+        with session_scope() as db:
+            db.execute(insert(PriceHistory), rows)
     print("Fetching done...")
 
 
-def start_scheduler() -> None:
-    scheduler = AsyncIOScheduler()
-    db = SessionLocal()
+def renew_lease() -> None:
+    try:
+        with session_scope() as db:
+            leader = acquire_lease(db, SCHEDULER_LEASE, SCHEDULER_LEASE_TTL)
+    except Exception:
+        # Unknown outcome, so assume the lease lapsed rather than keep
+        # writing next to whoever takes it over.
+        scheduler_state.leader = False
+        raise
+    scheduler_state.leader = leader
+
+
+def _leader_only(
+    job_id: str,
+    func: Callable[..., Any],
+) -> Callable[..., Awaitable[None]]:
+    async def run(*args: object) -> None:
+        if not scheduler_state.leader:
+            return
+        stats = scheduler_state.jobs.setdefault(job_id, JobStats())
+        stats.last_started = time.time()
+        start = time.perf_counter()
+        try:
+            if inspect.iscoroutinefunction(func):
+                await func(*args)
+            else:
+                # Blocking DB work must not stall the event loop.
+                await asyncio.to_thread(func, *args)
+        except Exception as e:
+            stats.last_error = str(e)
+            raise
+        else:
+            stats.last_error = None
+        finally:
+            stats.runs += 1
+            stats.last_duration = round(time.perf_counter() - start, 3)
+
+    return run
+
+
+def _record_lag(
+    event: JobSubmissionEvent,
+) -> None:
+    scheduled = event.scheduled_run_times[-1]
+    stats = scheduler_state.jobs.setdefault(event.job_id, JobStats())
+    stats.last_lag = round(
+        (
+            datetime.datetime.now(tz=scheduled.tzinfo) - scheduled
+        ).total_seconds(),
+        3,
+    )
+
 
-    async def fetch_job() -> None:
-        await fetch_api_data()
+def cleanup_job() -> None:
+    with session_scope() as db:
+        deleted = cleanup_old_records(db)
+    print(f"Database cleanup completed, {deleted} rows removed...")
 
-    def cleanup_job() -> None:
-        cleanup_old_records(db, days=14)
-        print("Database cleanup completed...")
+
+def start_scheduler() -> AsyncIOScheduler:
+    scheduler = AsyncIOScheduler()
+    scheduler.add_listener(_record_lag, EVENT_JOB_SUBMITTED)
+    # Every process renews the lease, only the holder runs the jobs.
+    scheduler.add_job(
+        renew_lease,
+        "interval",
+        id="lease",
+        seconds=SCHEDULER_LEASE_TTL / 3,
+        next_run_time=datetime.datetime.now(tz=datetime.timezone.utc),
+        max_instances=1,
+    )
 
     if is_running_on_railway():
+        # One job per interval, each recording all its entries in one pass.
+        for interval in tracking_intervals():
+            job_id = f"fetch_{interval}m"
+            scheduler.add_job(
+                _leader_only(job_id, fetch_api_data),
+                "interval",
+                id=job_id,
+                args=[interval],
+                minutes=interval,
+                max_instances=1,
+            )
         scheduler.add_job(
-            fetch_job,
-            "interval",
-            minutes=15,
-            max_instances=1,
-        )
-        scheduler.add_job(
-            cleanup_job,
+            _leader_only("cleanup", cleanup_job),
             "cron",
+            id="cleanup",
             hour=0,  # daily at midnight UTC
             minute=0,
             max_instances=1,
         )
     else:
         scheduler.add_job(
-            fetch_job,
+            _leader_only("fetch", fetch_api_data),
             "interval",
+            id="fetch",
             seconds=10,
             max_instances=1,
         )
         scheduler.add_job(
-            cleanup_job,
+            _leader_only("cleanup", cleanup_job),
             "interval",
+            id="cleanup",
             hours=1,
             max_instances=1,
         )
     scheduler.start()
+    scheduler_state.scheduler = scheduler
+    return scheduler
+
+
+def stop_scheduler() -> None:
+    scheduler = scheduler_state.scheduler
+    if scheduler is None:
+        return
+    scheduler.shutdown(wait=False)
+    scheduler_state.scheduler = None
+    if scheduler_state.leader:
+        with session_scope() as db:
+            release_lease(db, SCHEDULER_LEASE)
+        scheduler_state.leader = False
+
+
+def scheduler_health() -> dict[str, Any]:
+    scheduler = scheduler_state.scheduler
+    now = datetime.datetime.now(tz=datetime.timezone.utc)
+    jobs: dict[str, dict[str, Any]] = {}
+    for job in scheduler.get_jobs() if scheduler else []:
+        stats = scheduler_state.jobs.get(job.id, JobStats())
+        next_run = job.next_run_time
+        jobs[job.id] = {
+            "runs": stats.runs,
+            "lag": stats.last_lag,
+            "last_duration": stats.last_duration,
+            "last_error": stats.last_error,
+            "seconds_since_last_run": (
+                None
+                if stats.last_started is None
+                else round(time.time() - stats.last_started, 3)
+            ),
+            "overdue": (
+                None
+                if next_run is None
+                else max(0.0, round((now - next_run).total_seconds(), 3))
+            ),
+        }
+    return {
+        "running": scheduler is not None and scheduler.running,
+        "leader": scheduler_state.leader,
+        "holder": LEASE_HOLDER,
+        "jobs": jobs,
+    }
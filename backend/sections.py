@@ -0,0 +1,693 @@
+from dataclasses import dataclass
+from functools import partial
+from typing import Any
+from typing import Callable
+
+from gw2tp.constants import TAX_RATE
+from gw2tp.constants import ItemIDs
+from gw2tp.constants import Kits
+from gw2tp.helper import get_sub_dct
+
+from backend.recipes import CRAFT_ERROR
+from backend.recipes import RECIPE_MATRIX
+from backend.recipes import RECIPES
+from backend.recipes import evaluate_all
+from backend.recipes import evaluate_recipe
+
+
+Prices = dict[int, dict[str, Any]]
+
+STACK_SIZE: float = 250.0
+
+UNID_GEAR_ITEM_IDS: list[int] = [
+    ItemIDs.ECTOPLASM,
+    ItemIDs.LUCENT_MOTE,
+    ItemIDs.MIRTHIL,
+    ItemIDs.ELDER_WOOD,
+    ItemIDs.THICK_LEATHER,
+    ItemIDs.GOSSAMER_SCRAP,
+    ItemIDs.SILK_SCRAP,
+    ItemIDs.HARDENED_LEATHER,
+    ItemIDs.ANCIENT_WOOD_LOG,
+    ItemIDs.SYMBOL_OF_ENH,
+    ItemIDs.SYMBOL_OF_PAIN,
+    ItemIDs.ORICHALCUM_ORE,
+    ItemIDs.SYMBOL_OF_CONTROL,
+    ItemIDs.CHARM_OF_BRILLIANCE,
+    ItemIDs.CHARM_OF_POTENCE,
+    ItemIDs.CHARM_OF_SKILL,
+    ItemIDs.COMMON_GEAR,
+]
+
+
+@dataclass
+class Section:
+    item_ids: list[int]
+    compute: Callable[..., dict[str, Any]]
+    # Returned instead of {"error": ...} when prices are unavailable.
+    error: dict[str, Any] | None = None
+    # Item bought in bulk, its order book gives the depth-aware stack cost.
+    depth_item_id: int | None = None
+
+
+def get_strap_data(sell: float, strap_buy: float) -> dict[str, Any]:
+    profit_per_salvage = (sell * TAX_RATE) - strap_buy
+    profit_per_stack = 250.0 * profit_per_salvage
+
+    return {
+        **get_sub_dct("buy", strap_buy),
+        **get_sub_dct("profit_per_salvage", profit_per_salvage),
+        **get_sub_dct("profit_per_stack", profit_per_stack),
+    }
+
+
+def compute_rare_gear_salvage(
+    fetched_data: Prices,
+    quantity: float = STACK_SIZE,
+    stack_buy: float | None = None,
+) -> dict[str, Any]:
+    if stack_buy is None:
+        stack_buy = fetched_data[ItemIDs.RARE_UNID_GEAR]["buy"] * quantity
+    ecto_sell = fetched_data[ItemIDs.ECTOPLASM]["sell"]
+    lucent_mote_sell = fetched_data[ItemIDs.LUCENT_MOTE]["sell"]
+    mithril_sell = fetched_data[ItemIDs.MIRTHIL]["sell"]
+    elder_wood_sell = fetched_data[ItemIDs.ELDER_WOOD]["sell"]
+    thick_leather_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
+    gossamer_scrap_sell = fetched_data[ItemIDs.GOSSAMER_SCRAP]["sell"]
+    silk_scrap_sell = fetched_data[ItemIDs.SILK_SCRAP]["sell"]
+    hardened_sell = fetched_data[ItemIDs.HARDENED_LEATHER]["sell"]
+    ancient_wood_sell = fetched_data[ItemIDs.ANCIENT_WOOD_LOG]["sell"]
+    symbol_of_enh_sell = fetched_data[ItemIDs.SYMBOL_OF_ENH]["sell"]
+    symbol_of_pain_sell = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["sell"]
+    orichalcum_sell = fetched_data[ItemIDs.ORICHALCUM_ORE]["sell"]
+    symbol_of_control_sell = fetched_data[ItemIDs.SYMBOL_OF_CONTROL]["sell"]
+    charm_of_brilliance_sell = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["sell"]
+    charm_of_potence_sell = fetched_data[ItemIDs.CHARM_OF_POTENCE]["sell"]
+    charm_of_skill_sell = fetched_data[ItemIDs.CHARM_OF_SKILL]["sell"]
+
+    mats_value_after_tax = (
+        mithril_sell * (quantity * 0.4879) * TAX_RATE
+        + elder_wood_sell * (quantity * 0.3175) * TAX_RATE
+        + silk_scrap_sell * (quantity * 0.3367) * TAX_RATE
+        + thick_leather_sell * (quantity * 0.3457) * TAX_RATE
+        + orichalcum_sell * (quantity * 0.041) * TAX_RATE
+        + ancient_wood_sell * (quantity * 0.0249) * TAX_RATE
+        + gossamer_scrap_sell * (quantity * 0.018) * TAX_RATE
+        + hardened_sell * (quantity * 0.0162) * TAX_RATE
+        + ecto_sell * (quantity * 0.87) * TAX_RATE  # lowered
+        + lucent_mote_sell * (quantity * 0.2387) * TAX_RATE
+        + symbol_of_control_sell * (quantity * 0.001) * TAX_RATE
+        + symbol_of_enh_sell * (quantity * 0.0003) * TAX_RATE
+        + symbol_of_pain_sell * (quantity * 0.0004) * TAX_RATE
+        + charm_of_brilliance_sell * (quantity * 0.0006) * TAX_RATE
+        + charm_of_potence_sell * (quantity * 0.0009) * TAX_RATE
+        + charm_of_skill_sell * (quantity * 0.0009) * TAX_RATE
+    )
+
+    salvage_costs = Kits.SILVER_FED * quantity
+
+    profit_stack = mats_value_after_tax - stack_buy - salvage_costs
+
+    return {
+        **get_sub_dct("stack_buy", stack_buy),
+        **get_sub_dct("salvage_costs", salvage_costs),
+        **get_sub_dct("mats_value_after_tax", mats_value_after_tax),
+        **get_sub_dct("profit_stack", profit_stack),
+    }
+
+
+def compute_krait_shield_craft(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    ecto_sell_after_tax = fetched_data[ItemIDs.ECTOPLASM]["sell"] * TAX_RATE
+    mithril_ore_buy = fetched_data[ItemIDs.MITHRIL_ORE]["buy"]
+    mithril_ingot_buy = fetched_data[ItemIDs.MITHRIL_INGOT]["buy"]
+    elder_wood_log_buy = fetched_data[ItemIDs.ELDER_WOOD_LOG]["buy"]
+    elder_wood_plank_buy = fetched_data[ItemIDs.ELDER_WOOD_PLANK]["buy"]
+    large_claw_buy = fetched_data[ItemIDs.LARGE_CLAW]["buy"]
+    potent_blood_buy = fetched_data[ItemIDs.POTENT_BLOOD]["buy"]
+    large_bone_buy = fetched_data[ItemIDs.LARGE_BONE]["buy"]
+    intricate_totem_buy = fetched_data[ItemIDs.INTRICATE_TOTEM]["buy"]
+    large_fang_buy = fetched_data[ItemIDs.LARGE_FANG]["buy"]
+    potent_sac_buy = fetched_data[ItemIDs.POTENT_VENOM_SAC]["buy"]
+
+    lowest_t5_mat = min(
+        large_claw_buy,
+        potent_blood_buy,
+        large_bone_buy,
+        intricate_totem_buy,
+        large_fang_buy,
+        potent_sac_buy,
+    )
+
+    crafting_cost_ingot = (
+        mithril_ingot_buy
+        if mithril_ingot_buy < 2.0 * mithril_ore_buy
+        else mithril_ore_buy * 2.0
+    )
+    crafting_cost_plank = (
+        elder_wood_plank_buy
+        if elder_wood_plank_buy < 3.0 * elder_wood_log_buy
+        else elder_wood_log_buy * 3.0
+    )
+
+    crafting_cost_backing = 2.0 * crafting_cost_ingot
+    crafting_cost_boss = 2.0 * crafting_cost_ingot
+    crafting_cost_dowwl = 2.0 * crafting_cost_plank + 3.0 * crafting_cost_ingot
+    crafting_cost_inscr = 15.0 * lowest_t5_mat + 2.0 * crafting_cost_dowwl
+
+    crafting_cost_with_cheap_materials = (
+        crafting_cost_inscr + crafting_cost_backing + crafting_cost_boss
+    )
+    rare_gear_craft_profit = (
+        ecto_sell_after_tax * 0.9 - crafting_cost_with_cheap_materials
+    )
+
+    return {
+        **get_sub_dct("crafting_cost", crafting_cost_with_cheap_materials),
+        **get_sub_dct("ecto_sell_after_tax", ecto_sell_after_tax),
+        **get_sub_dct("profit", rare_gear_craft_profit),
+    }
+
+
+def compute_krait_trident_craft(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    ecto_sell_after_tax = fetched_data[ItemIDs.ECTOPLASM]["sell"] * TAX_RATE
+    mithril_ore_buy = fetched_data[ItemIDs.MITHRIL_ORE]["buy"]
+    mithril_ingot_buy = fetched_data[ItemIDs.MITHRIL_INGOT]["buy"]
+    elder_wood_log_buy = fetched_data[ItemIDs.ELDER_WOOD_LOG]["buy"]
+    elder_wood_plank_buy = fetched_data[ItemIDs.ELDER_WOOD_PLANK]["buy"]
+    large_claw_buy = fetched_data[ItemIDs.LARGE_CLAW]["buy"]
+    potent_blood_buy = fetched_data[ItemIDs.POTENT_BLOOD]["buy"]
+    large_bone_buy = fetched_data[ItemIDs.LARGE_BONE]["buy"]
+    intricate_totem_buy = fetched_data[ItemIDs.INTRICATE_TOTEM]["buy"]
+    large_fang_buy = fetched_data[ItemIDs.LARGE_FANG]["buy"]
+    potent_sac_buy = fetched_data[ItemIDs.POTENT_VENOM_SAC]["buy"]
+
+    lowest_t5_mat = min(
+        large_claw_buy,
+        potent_blood_buy,
+        large_bone_buy,
+        intricate_totem_buy,
+        large_fang_buy,
+        potent_sac_buy,
+    )
+
+    crafting_cost_ingot = (
+        mithril_ingot_buy
+        if mithril_ingot_buy < 2.0 * mithril_ore_buy
+        else mithril_ore_buy * 2.0
+    )
+    crafting_cost_plank = (
+        elder_wood_plank_buy
+        if elder_wood_plank_buy < 3.0 * elder_wood_log_buy
+        else elder_wood_log_buy * 3.0
+    )
+
+    crafting_cost_trident_head = 2.0 * crafting_cost_ingot
+    crafting_cost_trident_shaft = 2.0 * crafting_cost_plank
+    crafting_cost_dowwl = 2.0 * crafting_cost_plank + 3.0 * crafting_cost_ingot
+    crafting_cost_inscr = 15.0 * lowest_t5_mat + 2.0 * crafting_cost_dowwl
+
+    crafting_cost_with_cheap_materials = (
+        crafting_cost_inscr
+        + crafting_cost_trident_head
+        + crafting_cost_trident_shaft
+    )
+    rare_gear_craft_profit = (
+        ecto_sell_after_tax * 0.9 - crafting_cost_with_cheap_materials
+    )
+
+    return {
+        **get_sub_dct("crafting_cost", crafting_cost_with_cheap_materials),
+        **get_sub_dct("ecto_sell_after_tax", ecto_sell_after_tax),
+        **get_sub_dct("profit", rare_gear_craft_profit),
+    }
+
+
+def compute_t5_mats_buy(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    large_claw_buy = fetched_data[ItemIDs.LARGE_CLAW]["buy"]
+    potent_blood_buy = fetched_data[ItemIDs.POTENT_BLOOD]["buy"]
+    large_bone_buy = fetched_data[ItemIDs.LARGE_BONE]["buy"]
+    intricate_totem_buy = fetched_data[ItemIDs.INTRICATE_TOTEM]["buy"]
+    large_fang_buy = fetched_data[ItemIDs.LARGE_FANG]["buy"]
+    venom_sac_buy = fetched_data[ItemIDs.POTENT_VENOM_SAC]["buy"]
+    large_scale_buy = fetched_data[ItemIDs.LARGE_SCALE]["buy"]
+
+    return {
+        **get_sub_dct("large_claw", large_claw_buy),
+        **get_sub_dct("potent_blood", potent_blood_buy),
+        **get_sub_dct("large_bone", large_bone_buy),
+        **get_sub_dct("intricate_totem", intricate_totem_buy),
+        **get_sub_dct("large_fang", large_fang_buy),
+        **get_sub_dct("potent_venom", venom_sac_buy),
+        **get_sub_dct("large_scale", large_scale_buy),
+    }
+
+
+def compute_mats_crafting_compare(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    mithril_ore_buy = fetched_data[ItemIDs.MITHRIL_ORE]["buy"]
+    mithril_ingot_buy = fetched_data[ItemIDs.MITHRIL_INGOT]["buy"]
+    elder_wood_log_buy = fetched_data[ItemIDs.ELDER_WOOD_LOG]["buy"]
+    elder_wood_plank_buy = fetched_data[ItemIDs.ELDER_WOOD_PLANK]["buy"]
+    lucent_mote_buy = fetched_data[ItemIDs.LUCENT_MOTE]["buy"]
+    lucent_crystal_buy = fetched_data[ItemIDs.PILE_OF_LUCENT_CRYSTAL]["buy"]
+
+    lucent_mote_to_crystal = lucent_mote_buy * 10.0
+
+    return {
+        **get_sub_dct("mithril_ore_to_ingot", mithril_ore_buy * 2.0),
+        **get_sub_dct("mithril_ingot_buy", mithril_ingot_buy),
+        **get_sub_dct("elder_wood_log_to_plank", elder_wood_log_buy * 3.0),
+        **get_sub_dct("elder_wood_plank_buy", elder_wood_plank_buy),
+        **get_sub_dct("lucent_mote_to_crystal", lucent_mote_to_crystal),
+        **get_sub_dct("lucent_crystal_buy", lucent_crystal_buy),
+    }
+
+
+def compute_common_gear_salvage(
+    fetched_data: Prices,
+    quantity: float = STACK_SIZE,
+    stack_buy: float | None = None,
+) -> dict[str, Any]:
+    if stack_buy is None:
+        stack_buy = fetched_data[ItemIDs.COMMON_GEAR]["buy"] * quantity
+    ecto_sell = fetched_data[ItemIDs.ECTOPLASM]["sell"]
+    lucent_mote_sell = fetched_data[ItemIDs.LUCENT_MOTE]["sell"]
+    mithril_sell = fetched_data[ItemIDs.MIRTHIL]["sell"]
+    elder_wood_sell = fetched_data[ItemIDs.ELDER_WOOD]["sell"]
+    thick_leather_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
+    gossamer_scrap_sell = fetched_data[ItemIDs.GOSSAMER_SCRAP]["sell"]
+    silk_scrap_sell = fetched_data[ItemIDs.SILK_SCRAP]["sell"]
+    hardened_sell = fetched_data[ItemIDs.HARDENED_LEATHER]["sell"]
+    ancient_wood_sell = fetched_data[ItemIDs.ANCIENT_WOOD_LOG]["sell"]
+    symbol_of_enh_sell = fetched_data[ItemIDs.SYMBOL_OF_ENH]["sell"]
+    symbol_of_pain_sell = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["sell"]
+    orichalcum_sell = fetched_data[ItemIDs.ORICHALCUM_ORE]["sell"]
+    symbol_of_control_sell = fetched_data[ItemIDs.SYMBOL_OF_CONTROL]["sell"]
+    charm_of_brilliance_sell = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["sell"]
+    charm_of_potence_sell = fetched_data[ItemIDs.CHARM_OF_POTENCE]["sell"]
+    charm_of_skill_sell = fetched_data[ItemIDs.CHARM_OF_SKILL]["sell"]
+
+    mats_value_after_tax = (
+        mithril_sell * (quantity * 0.4291) * TAX_RATE
+        + elder_wood_sell * (quantity * 0.3884) * TAX_RATE
+        + silk_scrap_sell * (quantity * 0.3059) * TAX_RATE
+        + thick_leather_sell * (quantity * 0.25) * TAX_RATE  # lowered
+        + orichalcum_sell * (quantity * 0.0394) * TAX_RATE
+        + ancient_wood_sell * (quantity * 0.0305) * TAX_RATE
+        + gossamer_scrap_sell * (quantity * 0.0153) * TAX_RATE
+        + hardened_sell * (quantity * 0.0143) * TAX_RATE
+        + ecto_sell * (quantity * 0.007) * TAX_RATE  # lowered
+        + lucent_mote_sell * (quantity * 0.1075) * TAX_RATE  # lowered
+        + symbol_of_control_sell * (quantity * 0.0002) * TAX_RATE
+        + symbol_of_enh_sell * (quantity * 0.0006) * TAX_RATE
+        + symbol_of_pain_sell * (quantity * 0.0005) * TAX_RATE
+        + charm_of_brilliance_sell * (quantity * 0.0004) * TAX_RATE
+        + charm_of_potence_sell * (quantity * 0.0003) * TAX_RATE
+        + charm_of_skill_sell * (quantity * 0.0003) * TAX_RATE
+    )
+
+    salvage_costs = (
+        Kits.COPPER_FED * 223.0
+        + Kits.RUNECRAFTER * 25.0
+        + Kits.SILVER_FED * 2.0
+    ) * (quantity / STACK_SIZE)
+
+    profit_stack = mats_value_after_tax - stack_buy - salvage_costs
+
+    return {
+        **get_sub_dct("stack_buy", stack_buy),
+        **get_sub_dct("salvage_costs", salvage_costs),
+        **get_sub_dct("mats_value_after_tax", mats_value_after_tax),
+        **get_sub_dct("profit_stack", profit_stack),
+    }
+
+
+def compute_gear_salvage(
+    fetched_data: Prices,
+    quantity: float = STACK_SIZE,
+    stack_buy: float | None = None,
+) -> dict[str, Any]:
+    if stack_buy is None:
+        stack_buy = fetched_data[ItemIDs.UNID_GEAR]["buy"] * quantity
+    ecto_sell = fetched_data[ItemIDs.ECTOPLASM]["sell"]
+    lucent_mote_sell = fetched_data[ItemIDs.LUCENT_MOTE]["sell"]
+    mithril_sell = fetched_data[ItemIDs.MIRTHIL]["sell"]
+    elder_wood_sell = fetched_data[ItemIDs.ELDER_WOOD]["sell"]
+    thick_leather_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
+    gossamer_scrap_sell = fetched_data[ItemIDs.GOSSAMER_SCRAP]["sell"]
+    silk_scrap_sell = fetched_data[ItemIDs.SILK_SCRAP]["sell"]
+    hardened_sell = fetched_data[ItemIDs.HARDENED_LEATHER]["sell"]
+    ancient_wood_sell = fetched_data[ItemIDs.ANCIENT_WOOD_LOG]["sell"]
+    symbol_of_enh_sell = fetched_data[ItemIDs.SYMBOL_OF_ENH]["sell"]
+    symbol_of_pain_sell = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["sell"]
+    orichalcum_sell = fetched_data[ItemIDs.ORICHALCUM_ORE]["sell"]
+    symbol_of_control_sell = fetched_data[ItemIDs.SYMBOL_OF_CONTROL]["sell"]
+    charm_of_brilliance_sell = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["sell"]
+    charm_of_potence_sell = fetched_data[ItemIDs.CHARM_OF_POTENCE]["sell"]
+    charm_of_skill_sell = fetched_data[ItemIDs.CHARM_OF_SKILL]["sell"]
+
+    mats_value_after_tax = (
+        mithril_sell * (quantity * 0.4299) * TAX_RATE
+        + elder_wood_sell * (quantity * 0.3564) * TAX_RATE
+        + silk_scrap_sell * (quantity * 0.3521) * TAX_RATE
+        + thick_leather_sell * (quantity * 0.2673) * TAX_RATE
+        + orichalcum_sell * (quantity * 0.0387) * TAX_RATE
+        + ancient_wood_sell * (quantity * 0.0287) * TAX_RATE
+        + gossamer_scrap_sell * (quantity * 0.018) * TAX_RATE
+        + hardened_sell * (quantity * 0.0164) * TAX_RATE  # lowered
+        + ecto_sell * (quantity * 0.0291) * TAX_RATE  # lowered
+        + lucent_mote_sell * (quantity * 0.98) * TAX_RATE
+        + symbol_of_control_sell * (quantity * 0.0018) * TAX_RATE
+        + symbol_of_enh_sell * (quantity * 0.001) * TAX_RATE
+        + symbol_of_pain_sell * (quantity * 0.0006) * TAX_RATE
+        + charm_of_brilliance_sell * (quantity * 0.0042) * TAX_RATE
+        + charm_of_potence_sell * (quantity * 0.0029) * TAX_RATE
+        + charm_of_skill_sell * (quantity * 0.0028) * TAX_RATE
+    )
+
+    salvage_costs = (Kits.RUNECRAFTER * 245 + Kits.SILVER_FED * 5) * (
+        quantity / STACK_SIZE
+    )
+
+    profit_stack = mats_value_after_tax - stack_buy - salvage_costs
+
+    return {
+        **get_sub_dct("stack_buy", stack_buy),
+        **get_sub_dct("salvage_costs", salvage_costs),
+        **get_sub_dct("mats_value_after_tax", mats_value_after_tax),
+        **get_sub_dct("profit_stack", profit_stack),
+    }
+
+
+def compute_symbol_enh_forge(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    enh_buy = fetched_data[ItemIDs.SYMBOL_OF_ENH]["buy"]
+    enh_sell = fetched_data[ItemIDs.SYMBOL_OF_ENH]["sell"]
+    pain_sell = fetched_data[ItemIDs.SYMBOL_OF_PAIN]["sell"]
+    control_sell = fetched_data[ItemIDs.SYMBOL_OF_CONTROL]["sell"]
+
+    cost = enh_buy * 3.0
+    reward = enh_sell * 0.2 + pain_sell * 0.4 + control_sell * 0.4
+    profit = (reward * TAX_RATE) - cost
+
+    return {
+        **get_sub_dct("cost", cost),
+        **get_sub_dct("profit_per_try", profit),
+        **get_sub_dct("profit_per_shard", profit * 10.0),
+    }
+
+
+def compute_charm_brilliance_forge(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    charm_brilliance_buy = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["buy"]
+    charm_brilliance_sell = fetched_data[ItemIDs.CHARM_OF_BRILLIANCE]["sell"]
+    charm_potence_sell = fetched_data[ItemIDs.CHARM_OF_POTENCE]["sell"]
+    charm_skill_sell = fetched_data[ItemIDs.CHARM_OF_SKILL]["sell"]
+
+    cost = charm_brilliance_buy * 3.0
+    reward = (
+        charm_brilliance_sell * 0.2
+        + charm_potence_sell * 0.4
+        + charm_skill_sell * 0.4
+    )
+    profit = (reward * TAX_RATE) - cost
+
+    return {
+        **get_sub_dct("cost", cost),
+        **get_sub_dct("profit_per_try", profit),
+        **get_sub_dct("profit_per_shard", profit * 10.0),
+    }
+
+
+def compute_lodestone_forge(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    onyx_sell = fetched_data[ItemIDs.ONYX_LODESTONE]["buy"]
+    charged_sell = fetched_data[ItemIDs.CHARGED_LODESTONE]["sell"]
+    corrupted_sell = fetched_data[ItemIDs.CORRUPTED_LODESTONE]["sell"]
+    destroyer_sell = fetched_data[ItemIDs.DESTROYER_LODESTONE]["sell"]
+    crystal_dust_buy = fetched_data[ItemIDs.CRYSTALINE_DUST]["buy"]
+    onyx_core_cost = fetched_data[ItemIDs.ONYX_CORE]["buy"]
+    charged_core_cost = fetched_data[ItemIDs.CHARGED_CORE]["buy"]
+    corrupted_core_cost = fetched_data[ItemIDs.CORRUPTED_CORE]["buy"]
+    destroyer_core_cost = fetched_data[ItemIDs.DESTROYER_CORE]["buy"]
+
+    elonian_cost = 2_500
+
+    onyx_cost = onyx_core_cost * 2 + crystal_dust_buy + elonian_cost
+    onyx_profit = (onyx_sell * 0.85) - onyx_cost
+
+    charged_cost = charged_core_cost * 2 + crystal_dust_buy + elonian_cost
+    charged_profit = (charged_sell * 0.85) - charged_cost
+
+    corrupted_cost = corrupted_core_cost * 2 + crystal_dust_buy + elonian_cost
+    corrupted_profit = (corrupted_sell * 0.85) - corrupted_cost
+
+    destroyer_cost = destroyer_core_cost * 2 + crystal_dust_buy + elonian_cost
+    destroyer_profit = (destroyer_sell * 0.85) - destroyer_cost
+
+    return {
+        **get_sub_dct("onyx", onyx_profit),
+        **get_sub_dct("charged", charged_profit),
+        **get_sub_dct("corrupted", corrupted_profit),
+        **get_sub_dct("destroyer", destroyer_profit),
+    }
+
+
+def compute_thick_leather_strap(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    strap_buy = fetched_data[ItemIDs.THICK_LEATHER_STRAP]["buy"]
+    coarse_leather_section_sell = fetched_data[ItemIDs.COARSE_LEATHER]["sell"]
+    rugged_leather_section_sell = fetched_data[ItemIDs.RUGGED_LEATHER]["sell"]
+
+    coarse_leather_section_rate = 1.28
+    rugged_leather_section_rate = 0.08
+
+    sell = (coarse_leather_section_sell * coarse_leather_section_rate) + (
+        rugged_leather_section_sell * rugged_leather_section_rate
+    )
+    return get_strap_data(sell, strap_buy)
+
+
+def compute_rugged_leather_strap(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    strap_buy = fetched_data[ItemIDs.RUGGED_LEATHER_STRAP]["buy"]
+    thick_leather_section_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
+    rugged_leather_section_sell = fetched_data[ItemIDs.RUGGED_LEATHER]["sell"]
+
+    thick_leather_section_rate = 1.28
+    rugged_leather_section_rate = 0.08
+
+    sell = (thick_leather_section_sell * thick_leather_section_rate) + (
+        rugged_leather_section_sell * rugged_leather_section_rate
+    )
+    return get_strap_data(sell, strap_buy)
+
+
+def compute_hard_leather_strap(
+    fetched_data: Prices,
+) -> dict[str, Any]:
+    strap_buy = fetched_data[ItemIDs.HARD_LEATHER_STRAP]["buy"]
+    thick_leather_section_sell = fetched_data[ItemIDs.THICK_LEATHER]["sell"]
+    hardd_leather_section_sell = fetched_data[ItemIDs.HARDENED_LEATHER]["sell"]
+
+    thick_leather_section_rate = 1.28
+    harden_leather_section_rate = 0.08
+
+    sell = (thick_leather_section_sell * thick_leather_section_rate) + (
+        hardd_leather_section_sell * harden_leather_section_rate
+    )
+    return get_strap_data(sell, strap_buy)
+
+
+# The thesis endpoint always answered {"error": ...} instead of CRAFT_ERROR.
+PLAIN_ERROR_RECIPES = {"thesis_on_masterful_malice"}
+
+SECTIONS: dict[str, Section] = {
+    "rare_gear_salvage": Section(
+        item_ids=[ItemIDs.RARE_UNID_GEAR, *UNID_GEAR_ITEM_IDS],
+        compute=compute_rare_gear_salvage,
+        depth_item_id=ItemIDs.RARE_UNID_GEAR,
+    ),
+    "krait_shield_craft": Section(
+        item_ids=[
+            ItemIDs.ECTOPLASM,
+            ItemIDs.MITHRIL_INGOT,
+            ItemIDs.MITHRIL_ORE,
+            ItemIDs.ELDER_WOOD_PLANK,
+            ItemIDs.ELDER_WOOD_LOG,
+            ItemIDs.LARGE_CLAW,
+            ItemIDs.POTENT_BLOOD,
+            ItemIDs.LARGE_BONE,
+            ItemIDs.INTRICATE_TOTEM,
+            ItemIDs.LARGE_FANG,
+            ItemIDs.POTENT_VENOM_SAC,
+        ],
+        compute=compute_krait_shield_craft,
+    ),
+    "krait_trident_craft": Section(
+        item_ids=[
+            ItemIDs.ECTOPLASM,
+            ItemIDs.MITHRIL_INGOT,
+            ItemIDs.MITHRIL_ORE,
+            ItemIDs.ELDER_WOOD_PLANK,
+            ItemIDs.ELDER_WOOD_LOG,
+            ItemIDs.LARGE_CLAW,
+            ItemIDs.POTENT_BLOOD,
+            ItemIDs.LARGE_BONE,
+            ItemIDs.INTRICATE_TOTEM,
+            ItemIDs.LARGE_FANG,
+            ItemIDs.POTENT_VENOM_SAC,
+        ],
+        compute=compute_krait_trident_craft,
+    ),
+    "t5_mats_buy": Section(
+        item_ids=[
+            ItemIDs.LARGE_CLAW,
+            ItemIDs.POTENT_BLOOD,
+            ItemIDs.LARGE_BONE,
+            ItemIDs.INTRICATE_TOTEM,
+            ItemIDs.LARGE_FANG,
+            ItemIDs.POTENT_VENOM_SAC,
+            ItemIDs.LARGE_SCALE,
+        ],
+        compute=compute_t5_mats_buy,
+    ),
+    "mats_crafting_compare": Section(
+        item_ids=[
+            ItemIDs.MITHRIL_INGOT,
+            ItemIDs.MITHRIL_ORE,
+            ItemIDs.ELDER_WOOD_PLANK,
+            ItemIDs.ELDER_WOOD_LOG,
+            ItemIDs.LUCENT_MOTE,
+            ItemIDs.PILE_OF_LUCENT_CRYSTAL,
+        ],
+        compute=compute_mats_crafting_compare,
+    ),
+    "common_gear_salvage": Section(
+        item_ids=[ItemIDs.COMMON_GEAR, *UNID_GEAR_ITEM_IDS],
+        compute=compute_common_gear_salvage,
+        depth_item_id=ItemIDs.COMMON_GEAR,
+    ),
+    "gear_salvage": Section(
+        item_ids=[ItemIDs.UNID_GEAR, *UNID_GEAR_ITEM_IDS],
+        compute=compute_gear_salvage,
+        depth_item_id=ItemIDs.UNID_GEAR,
+    ),
+    "symbol_enh_forge": Section(
+        item_ids=[
+            ItemIDs.SYMBOL_OF_ENH,
+            ItemIDs.SYMBOL_OF_PAIN,
+            ItemIDs.SYMBOL_OF_CONTROL,
+        ],
+        compute=compute_symbol_enh_forge,
+    ),
+    "charm_brilliance_forge": Section(
+        item_ids=[
+            ItemIDs.CHARM_OF_BRILLIANCE,
+            ItemIDs.CHARM_OF_POTENCE,
+            ItemIDs.CHARM_OF_SKILL,
+        ],
+        compute=compute_charm_brilliance_forge,
+    ),
+    "lodestone_forge": Section(
+        item_ids=[
+            ItemIDs.ONYX_LODESTONE,
+            ItemIDs.CHARGED_LODESTONE,
+            ItemIDs.CORRUPTED_LODESTONE,
+            ItemIDs.DESTROYER_LODESTONE,
+            ItemIDs.CRYSTALINE_DUST,
+            ItemIDs.ONYX_CORE,
+            ItemIDs.DESTROYER_CORE,
+            ItemIDs.CORRUPTED_CORE,
+            ItemIDs.CHARGED_CORE,
+        ],
+        compute=compute_lodestone_forge,
+    ),
+    "thick_leather_strap": Section(
+        item_ids=[
+            ItemIDs.THICK_LEATHER_STRAP,
+            ItemIDs.COARSE_LEATHER,
+            ItemIDs.RUGGED_LEATHER,
+        ],
+        compute=compute_thick_leather_strap,
+    ),
+    "rugged_leather_strap": Section(
+        item_ids=[
+            ItemIDs.RUGGED_LEATHER_STRAP,
+            ItemIDs.THICK_LEATHER,
+            ItemIDs.RUGGED_LEATHER,
+        ],
+        compute=compute_rugged_leather_strap,
+    ),
+    "hard_leather_strap": Section(
+        item_ids=[
+            ItemIDs.HARD_LEATHER_STRAP,
+            ItemIDs.THICK_LEATHER,
+            ItemIDs.HARDENED_LEATHER,
+        ],
+        compute=compute_hard_leather_strap,
+    ),
+    **{
+        name: Section(
+            item_ids=recipe.item_ids,
+            compute=partial(evaluate_recipe, recipe),
+            error=None if name in PLAIN_ERROR_RECIPES else CRAFT_ERROR,
+        )
+        for name, recipe in RECIPES.items()
+    },
+}
+
+
+def section_item_ids(
+    names: list[str],
+) -> list[int]:
+    item_ids = [
+        item_id for name in names for item_id in SECTIONS[name].item_ids
+    ]
+    if any(name in RECIPES for name in names):
+        # Price every recipe input so compute_sections can use one pass.
+        item_ids.extend(RECIPE_MATRIX.item_ids)
+    return list(dict.fromkeys(item_ids))
+
+
+def compute_sections(
+    names: list[str],
+    prices: Prices,
+) -> tuple[dict[str, dict[str, Any]], dict[str, str]]:
+    results: dict[str, dict[str, Any]] = {}
+    errors: dict[str, str] = {}
+
+    if any(name in RECIPES for name in names):
+        try:
+            recipe_results = evaluate_all(prices)
+        except KeyError:
+            # Not every recipe input is priced, evaluate one by one below.
+            recipe_results = {}
+        results.update(
+            {
+                name: recipe_results[name]
+                for name in names
+                if name in recipe_results
+            }
+        )
+
+    for name in names:
+        if name in results:
+            continue
+        try:
+            results[name] = SECTIONS[name].compute(prices)
+        except Exception as e:
+            errors[name] = str(e)
+    return results, errors
@@ -0,0 +1,138 @@
+import asyncio
+import hashlib
+import json
+import logging
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from dataclasses import field
+from typing import Any
+from typing import Callable
+
+from gw2tp.constants import ItemIDs
+
+from backend.commerce import fetch_tp_prices
+from backend.commerce import fetch_upstream_prices_chunked
+from backend.commerce import price_cache
+from backend.config import SNAPSHOT_INTERVAL
+from backend.config import SNAPSHOT_STALE_AFTER
+
+
+logger = logging.getLogger(__name__)
+
+Prices = dict[int, dict[str, Any]]
+SnapshotListener = Callable[[Prices, Prices], None]
+
+SNAPSHOT_ITEM_IDS: list[int] = sorted(
+    {
+        value
+        for name, value in vars(ItemIDs).items()
+        if not name.startswith("_") and isinstance(value, int)
+    }
+)
+
+
+def _notify(
+    listener: SnapshotListener,
+    previous_prices: Prices,
+    prices: Prices,
+) -> None:
+    try:
+        listener(previous_prices, prices)
+    except Exception:
+        logger.exception("Price snapshot listener failed")
+
+
+@dataclass
+class PriceSnapshot:
+    prices: Prices = field(default_factory=dict)
+    version: int = 0
+    updated_at: float | None = None
+    etag: str | None = None
+    listeners: list[SnapshotListener] = field(default_factory=list)
+
+    def age(self) -> float | None:
+        if self.updated_at is None:
+            return None
+        return round(time.time() - self.updated_at, 3)
+
+    def is_stale(
+        self,
+        stale_after: float = SNAPSHOT_STALE_AFTER,
+    ) -> bool:
+        age = self.age()
+        return age is not None and age > stale_after
+
+    def max_age(
+        self,
+        interval: float = SNAPSHOT_INTERVAL,
+    ) -> int:
+        age = self.age()
+        if age is None:
+            return 0
+        return max(0, math.ceil(interval - age))
+
+    def update(
+        self,
+        prices: Prices,
+    ) -> None:
+        previous_prices = self.prices
+        self.prices = prices
+        self.version += 1
+        self.updated_at = time.time()
+        # Content hash, so replicas holding the same prices agree on it.
+        digest = hashlib.blake2b(
+            json.dumps(prices, sort_keys=True).encode(),
+            digest_size=8,
+        ).hexdigest()
+        self.etag = f'W/"{digest}"'
+        for listener in self.listeners:
+            _notify(listener, previous_prices, prices)
+
+
+snapshot = PriceSnapshot()
+# Set for the current request when get_prices fell back to old prices.
+_served_stale: ContextVar[bool] = ContextVar("served_stale", default=False)
+
+
+async def refresh_snapshot() -> None:
+    # Items of a failed chunk drop out until the next refresh, get_prices
+    # then fetches them on demand.
+    snapshot.update(await fetch_upstream_prices_chunked(SNAPSHOT_ITEM_IDS))
+
+
+async def run_snapshot_poller(
+    interval: float = SNAPSHOT_INTERVAL,
+) -> None:
+    while True:
+        try:
+            await refresh_snapshot()
+        except Exception:
+            logger.exception("Price snapshot refresh failed")
+        await asyncio.sleep(interval)
+
+
+async def get_prices(
+    item_ids: list[int],
+) -> dict[int, dict[str, Any]]:
+    prices = snapshot.prices
+    if all(item_id in prices for item_id in item_ids):
+        return {item_id: prices[item_id] for item_id in item_ids}
+    try:
+        return await fetch_tp_prices(item_ids)
+    except Exception:
+        # Upstream is down or rate limited, serve the last known prices if
+        # they cover the request and flag the response as stale.
+        fallback = {
+            **price_cache.get_stale(item_ids),
+            **{i: prices[i] for i in item_ids if i in prices},
+        }
+        if not all(item_id in fallback for item_id in item_ids):
+            raise
+        _served_stale.set(True)
+        return fallback
+
+
+def is_stale() -> bool:
+    return _served_stale.get() or snapshot.is_stale()
@@ -0,0 +1,123 @@
+import asyncio
+import json
+from typing import Any
+from typing import AsyncIterator
+from typing import NamedTuple
+
+from backend.commerce import get_flip_profit
+from backend.config import STREAM_KEEPALIVE
+from backend.config import STREAM_QUEUE_SIZE
+from backend.sections import SECTIONS
+from backend.sections import compute_sections
+from backend.snapshot import Prices
+from backend.snapshot import snapshot
+
+
+PRICE_STREAM_FIELDS = ("buy", "sell")
+
+
+class StreamEvent(NamedTuple):
+    name: str
+    data: dict[str, Any]
+
+    def encode(self) -> str:
+        return f"event: {self.name}\ndata: {json.dumps(self.data)}\n\n"
+
+
+class PriceBroadcaster:
+    def __init__(
+        self,
+        queue_size: int = STREAM_QUEUE_SIZE,
+    ) -> None:
+        self.queue_size = queue_size
+        self._subscribers: set[asyncio.Queue[StreamEvent]] = set()
+        self._sections: dict[str, dict[str, Any]] = {}
+
+    def __len__(self) -> int:
+        return len(self._subscribers)
+
+    def subscribe(self) -> asyncio.Queue[StreamEvent]:
+        if not self._subscribers:
+            # Section diffs are skipped while nobody listens, so take the
+            # baseline now instead of diffing against an old refresh.
+            self._sections, _ = compute_sections(
+                list(SECTIONS), snapshot.prices
+            )
+        queue: asyncio.Queue[StreamEvent] = asyncio.Queue(self.queue_size)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(
+        self,
+        queue: asyncio.Queue[StreamEvent],
+    ) -> None:
+        self._subscribers.discard(queue)
+
+    def publish(
+        self,
+        event: StreamEvent,
+    ) -> None:
+        for queue in self._subscribers:
+            if queue.full():
+                # Slow client, drop its oldest event instead of blocking.
+                queue.get_nowait()
+            queue.put_nowait(event)
+
+    def on_snapshot(
+        self,
+        previous_prices: Prices,
+        prices: Prices,
+    ) -> None:
+        if not self._subscribers:
+            return
+        # JSON object keys are strings, so the item IDs are sent as such.
+        item_changes = {
+            str(item_id): {
+                "buy": price["buy"],
+                "sell": price["sell"],
+                "flip": get_flip_profit(price["buy"], price["sell"]),
+            }
+            for item_id, price in prices.items()
+            if any(
+                previous_prices.get(item_id, {}).get(key) != price[key]
+                for key in PRICE_STREAM_FIELDS
+            )
+        }
+
+        sections, _ = compute_sections(list(SECTIONS), prices)
+        section_changes: dict[str, dict[str, Any]] = {}
+        for name, values in sections.items():
+            previous_values = self._sections.get(name, {})
+            changed = {
+                key: value
+                for key, value in values.items()
+                if previous_values.get(key) != value
+            }
+            if changed:
+                section_changes[name] = changed
+        self._sections = sections
+
+        if item_changes:
+            self.publish(StreamEvent("prices", item_changes))
+        if section_changes:
+            self.publish(StreamEvent("sections", section_changes))
+
+
+broadcaster = PriceBroadcaster()
+snapshot.listeners.append(broadcaster.on_snapshot)
+
+
+async def stream_events(
+    queue: asyncio.Queue[StreamEvent],
+) -> AsyncIterator[str]:
+    try:
+        yield f"retry: {int(STREAM_KEEPALIVE * 1000)}\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(queue.get(), STREAM_KEEPALIVE)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            yield event.encode()
+    finally:
+        broadcaster.unsubscribe(queue)
@@ -0,0 +1,159 @@
+import datetime
+from dataclasses import dataclass
+from typing import Any
+
+from gw2tp.helper import gsc_to_copper
+
+from backend.config import HISTORY_INTERVAL
+from backend.config import ITEM_HISTORY_INTERVAL
+from backend.recipes import RECIPES
+from backend.snapshot import SNAPSHOT_ITEM_IDS
+from backend.snapshot import Prices
+
+
+# price_history column -> g/s/c key prefix in the section result.
+FieldMapping = dict[str, str]
+
+RECIPE_FIELDS: FieldMapping = {
+    "sell_copper": "sell",
+    "crafting_cost_copper": "crafting_cost",
+    "profit_copper": "profit",
+}
+SALVAGE_FIELDS: FieldMapping = {
+    "sell_copper": "mats_value_after_tax",
+    "crafting_cost_copper": "stack_buy",
+    "profit_copper": "profit_stack",
+}
+FORGE_FIELDS: FieldMapping = {
+    "crafting_cost_copper": "cost",
+    "profit_copper": "profit_per_try",
+}
+KRAIT_FIELDS: FieldMapping = {
+    "crafting_cost_copper": "crafting_cost",
+    "profit_copper": "profit",
+}
+STRAP_FIELDS: FieldMapping = {
+    "buy_copper": "buy",
+    "profit_copper": "profit_per_stack",
+}
+# lodestone_forge reports one profit per lodestone, each gets its own key.
+LODESTONES = ("onyx", "charged", "corrupted", "destroyer")
+# Filled in for every row so the bulk insert sees one parameter shape.
+EMPTY_ROW: dict[str, Any] = {
+    "buy_copper": None,
+    "sell_copper": None,
+    "crafting_cost_copper": None,
+    "profit_copper": None,
+}
+
+
+@dataclass(frozen=True)
+class TrackedSection:
+    fields: FieldMapping
+    interval: int = HISTORY_INTERVAL
+    # Section to compute, if it differs from the history key.
+    section: str | None = None
+
+
+@dataclass(frozen=True)
+class TrackedItem:
+    item_id: int
+    interval: int = ITEM_HISTORY_INTERVAL
+
+
+TRACKED_SECTIONS: dict[str, TrackedSection] = {
+    **{name: TrackedSection(RECIPE_FIELDS) for name in RECIPES},
+    "krait_shield_craft": TrackedSection(KRAIT_FIELDS),
+    "krait_trident_craft": TrackedSection(KRAIT_FIELDS),
+    "rare_gear_salvage": TrackedSection(SALVAGE_FIELDS),
+    "common_gear_salvage": TrackedSection(SALVAGE_FIELDS),
+    "gear_salvage": TrackedSection(SALVAGE_FIELDS),
+    "symbol_enh_forge": TrackedSection(FORGE_FIELDS),
+    "charm_brilliance_forge": TrackedSection(FORGE_FIELDS),
+    "thick_leather_strap": TrackedSection(STRAP_FIELDS),
+    "rugged_leather_strap": TrackedSection(STRAP_FIELDS),
+    "hard_leather_strap": TrackedSection(STRAP_FIELDS),
+    **{
+        f"lodestone_forge:{lodestone}": TrackedSection(
+            {"profit_copper": lodestone},
+            section="lodestone_forge",
+        )
+        for lodestone in LODESTONES
+    },
+    # t5_mats_buy and mats_crafting_compare only report item buy prices and
+    # fixed multiples of them, which TRACKED_ITEMS already records.
+}
+
+TRACKED_ITEMS: dict[str, TrackedItem] = {
+    f"item:{item_id}": TrackedItem(item_id) for item_id in SNAPSHOT_ITEM_IDS
+}
+
+
+def tracking_intervals() -> list[int]:
+    return sorted(
+        {entry.interval for entry in TRACKED_SECTIONS.values()}
+        | {entry.interval for entry in TRACKED_ITEMS.values()}
+    )
+
+
+def tracked_sections(
+    interval: int | None = None,
+) -> dict[str, str]:
+    return {
+        item_key: entry.section or item_key
+        for item_key, entry in TRACKED_SECTIONS.items()
+        if interval is None or entry.interval == interval
+    }
+
+
+def tracked_items(
+    interval: int | None = None,
+) -> dict[str, int]:
+    return {
+        item_key: entry.item_id
+        for item_key, entry in TRACKED_ITEMS.items()
+        if interval is None or entry.interval == interval
+    }
+
+
+def _gsc_copper(
+    data: dict[str, Any],
+    key: str,
+) -> int:
+    return int(
+        gsc_to_copper(data[f"{key}_g"], data[f"{key}_s"], data[f"{key}_c"])
+    )
+
+
+def history_rows(
+    results: dict[str, dict[str, Any]],
+    sections: dict[str, str],
+    items: dict[str, int],
+    prices: Prices,
+    ts: datetime.datetime,
+) -> list[dict[str, Any]]:
+    rows = [
+        {
+            **EMPTY_ROW,
+            "item_key": item_key,
+            "ts": ts,
+            **{
+                column: _gsc_copper(results[name], key)
+                for column, key in TRACKED_SECTIONS[item_key].fields.items()
+            },
+        }
+        for item_key, name in sections.items()
+        if name in results
+    ]
+    rows.extend(
+        {
+            **EMPTY_ROW,
+            "item_key": item_key,
+            "ts": ts,
+            "buy_copper": prices[item_id]["buy"],
+            "sell_copper": prices[item_id]["sell"],
+        }
+        for item_key, item_id in items.items()
+        if item_id in prices
+    )
+    return rows
@@ -111,6 +111,8 @@ async def on_message(
         await message.channel.send(f"Request failed: {e}")
         return
 
+    data.pop("snapshot_age", None)
+    data.pop("stale", None)
     embed = create_price_embed(data, title)
     await message.channel.send(embed=embed)
 
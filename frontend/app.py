@@ -21,6 +21,7 @@ api_base = host_url()
 api_base = os.environ.get("BACKEND_URL", api_base)
 flask_app = Flask(__name__)
 FILE_DIR = Path(__file__).parent
+HISTORY_PLOT_POINTS = 300
 
 
 @flask_app.route("/")
@@ -33,8 +34,12 @@ def history_base(
     full_name: str,
 ) -> str:
     print(os.environ)
-    api_url = urljoin(api_base, f"/api/history?item_name={item_name}")
-    response = requests.get(api_url, timeout=10.0)
+    api_url = urljoin(api_base, "/api/history")
+    response = requests.get(
+        api_url,
+        params={"item_name": item_name, "points": HISTORY_PLOT_POINTS},
+        timeout=10.0,
+    )
     if response.status_code != 200:
         return f"Error fetching data: {response.text}"
 
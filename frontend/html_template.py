@@ -1,4 +1,5 @@
 # ruff: noqa: E501
+import json
 from pathlib import Path
 
 from gw2tp.constants import ItemIDs
@@ -407,40 +408,61 @@ PROFIT_CALCULATION_HTML = """
 """
 
 
-def get_fetch_price_html(item_id: int) -> str:
-    api_endpoint = f"price?item_id={item_id}"
-    return f"""
-const response = await fetch('{api_base}{api_endpoint}');
-const data = await response.json();
-if (data.error) {{
-    alert(data.error);
-    return;
-}}
-
-document.getElementById('{item_id}_buy_g').innerText = data.buy_g;
-document.getElementById('{item_id}_buy_s').innerText = data.buy_s;
-document.getElementById('{item_id}_buy_c').innerText = data.buy_c;
-
-document.getElementById('{item_id}_sell_g').innerText = data.sell_g;
-document.getElementById('{item_id}_sell_s').innerText = data.sell_s;
-document.getElementById('{item_id}_sell_c').innerText = data.sell_c;
-
-document.getElementById('{item_id}_flip_g').innerText = data.flip_g;
-document.getElementById('{item_id}_flip_s').innerText = data.flip_s;
-document.getElementById('{item_id}_flip_c').innerText = data.flip_c;
-"""
+DASHBOARD_SECTIONS = [
+    "rare_gear_salvage",
+    "gear_salvage",
+    "guardian_rune",
+    "scholar_rune",
+    "dragonhunter_rune",
+    "relic_of_fireworks",
+    "relic_of_thief",
+    "relic_of_aristocracy",
+    "krait_shield_craft",
+    "krait_trident_craft",
+    "t5_mats_buy",
+    "mats_crafting_compare",
+    "common_gear_salvage",
+    "symbol_enh_forge",
+    "charm_brilliance_forge",
+    "lodestone_forge",
+    "thesis_on_masterful_malice",
+    "thick_leather_strap",
+    "rugged_leather_strap",
+    "hard_leather_strap",
+    "sigil_of_impact",
+    "sigil_of_doom",
+    "sigil_of_torment",
+    "sigil_of_bursting",
+    "sigil_of_paralyzation",
+]
+DASHBOARD_ITEM_IDS = [
+    ItemIDs.RARE_UNID_GEAR,
+    ItemIDs.ECTOPLASM,
+]
 
 
-def get_all_fetch_price_html(
-    api_endpoint: str,
+def get_batch_fetch_html(
+    sections: list[str],
+    item_ids: list[int],
 ) -> str:
+    api_endpoint = (
+        f"batch?sections={','.join(sections)}"
+        f"&item_ids={','.join(str(i) for i in item_ids)}"
+    )
     return f"""
 try {{
     const response = await fetch('{api_base}{api_endpoint}');
     const data = await response.json();
+    if (data.error) {{
+        alert(data.error);
+        return;
+    }}
 
-    for (const [key, value] of Object.entries(data)) {{
-        document.getElementById(key + '##' + `{api_endpoint}`).innerText = value;
+    for (const section of {json.dumps(sections)}) {{
+        setSectionValues(section, data[section] ?? {{}});
+    }}
+    for (const [itemId, values] of Object.entries(data.price ?? {{}})) {{
+        setFlipValues(itemId, values);
     }}
 }} catch (error) {{
     console.error('Error fetching prices:', error);
@@ -453,35 +475,7 @@ with (FILE_DIR / "static" / "scripts.js").open() as f:
 
 FETCH_PRICES = f"""
 async function _fetchPrices() {{
-    await Promise.all([
-        (async () => {{ {get_fetch_price_html(ItemIDs.RARE_UNID_GEAR)} }})(),
-        (async () => {{ {get_fetch_price_html(ItemIDs.ECTOPLASM)} }})(),
-        (async () => {{ {get_all_fetch_price_html("rare_gear_salvage")} }})(),
-        (async () => {{ {get_all_fetch_price_html("gear_salvage")} }})(),
-        (async () => {{ {get_all_fetch_price_html("guardian_rune")} }})(),
-        (async () => {{ {get_all_fetch_price_html("scholar_rune")} }})(),
-        (async () => {{ {get_all_fetch_price_html("dragonhunter_rune")} }})(),
-        (async () => {{ {get_all_fetch_price_html("relic_of_fireworks")} }})(),
-        (async () => {{ {get_all_fetch_price_html("relic_of_thief")} }})(),
-        (async () => {{ {get_all_fetch_price_html("relic_of_aristocracy")} }})(),
-        (async () => {{ {get_all_fetch_price_html("krait_shield_craft")} }})(),
-        (async () => {{ {get_all_fetch_price_html("krait_trident_craft")} }})(),
-        (async () => {{ {get_all_fetch_price_html("t5_mats_buy")} }})(),
-        (async () => {{ {get_all_fetch_price_html("mats_crafting_compare")} }})(),
-        (async () => {{ {get_all_fetch_price_html("common_gear_salvage")} }})(),
-        (async () => {{ {get_all_fetch_price_html("symbol_enh_forge")} }})(),
-        (async () => {{ {get_all_fetch_price_html("charm_brilliance_forge")} }})(),
-        (async () => {{ {get_all_fetch_price_html("lodestone_forge")} }})(),
-        (async () => {{ {get_all_fetch_price_html("thesis_on_masterful_malice")} }})(),
-        (async () => {{ {get_all_fetch_price_html("thick_leather_strap")} }})(),
-        (async () => {{ {get_all_fetch_price_html("rugged_leather_strap")} }})(),
-        (async () => {{ {get_all_fetch_price_html("hard_leather_strap")} }})(),
-        (async () => {{ {get_all_fetch_price_html("sigil_of_impact")} }})(),
-        (async () => {{ {get_all_fetch_price_html("sigil_of_doom")} }})(),
-        (async () => {{ {get_all_fetch_price_html("sigil_of_torment")} }})(),
-        (async () => {{ {get_all_fetch_price_html("sigil_of_bursting")} }})(),
-        (async () => {{ {get_all_fetch_price_html("sigil_of_paralyzation")} }})(),
-    ]);
+    {get_batch_fetch_html(DASHBOARD_SECTIONS, DASHBOARD_ITEM_IDS)}
 }}
 """
 
@@ -492,6 +486,7 @@ SCRIPT = f"""
     window.addEventListener('DOMContentLoaded', () => {{
         fetchPrices();
         updateLastUpdated();
+        subscribeToPrices('{api_base}stream');
     }});
 </script>
 """
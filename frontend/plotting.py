@@ -13,20 +13,10 @@ def _get_plot_data(
     data: Sequence[dict],
 ) -> tuple[list[str], list[float], list[float]]:
     timestamps = [
-        datetime.fromisoformat(e["timestamp"]).strftime("%d %b %H:%M")
-        for e in data
-    ]
-    sell_price = [
-        (e["sell_g"] + e["sell_s"] / 100 + e["sell_c"] / 10_000) for e in data
-    ]
-    crafting_price = [
-        (
-            e["crafting_cost_g"]
-            + e["crafting_cost_s"] / 100
-            + e["crafting_cost_c"] / 10_000
-        )
-        for e in data
+        datetime.fromisoformat(e["ts"]).strftime("%d %b %H:%M") for e in data
     ]
+    sell_price = [e["sell_copper"] / 10_000 for e in data]
+    crafting_price = [e["crafting_cost_copper"] / 10_000 for e in data]
     return timestamps, sell_price, crafting_price
 
 
@@ -78,3 +78,60 @@ function updateLastUpdated() {
         span.innerText = text;
     }, 1000);
 }
+
+function setSectionValues(section, data) {
+    for (const [key, value] of Object.entries(data)) {
+        const element = document.getElementById(key + "##" + section);
+        if (element) {
+            element.innerText = value;
+        }
+    }
+}
+
+function setFlipValues(itemId, data) {
+    for (const name of ["buy", "sell", "flip"]) {
+        for (const unit of ["g", "s", "c"]) {
+            const key = `${name}_${unit}`;
+            const element = document.getElementById(`${itemId}_${key}`);
+            if (element && key in data) {
+                element.innerText = data[key];
+            }
+        }
+    }
+}
+
+function copperToGsc(copper) {
+    const sign = copper < 0 ? -1 : 1;
+    const value = Math.abs(copper);
+    return [
+        sign * Math.floor(value / 10000),
+        sign * Math.floor((value % 10000) / 100),
+        sign * Math.floor(value % 100),
+    ];
+}
+
+function subscribeToPrices(url) {
+    if (!window.EventSource) {
+        return;
+    }
+    const source = new EventSource(url);
+    source.addEventListener("prices", (event) => {
+        for (const [itemId, values] of Object.entries(JSON.parse(event.data))) {
+            const data = {};
+            for (const [name, copper] of Object.entries(values)) {
+                const [g, s, c] = copperToGsc(copper);
+                data[`${name}_g`] = g;
+                data[`${name}_s`] = s;
+                data[`${name}_c`] = c;
+            }
+            setFlipValues(itemId, data);
+        }
+        updateLastUpdated();
+    });
+    source.addEventListener("sections", (event) => {
+        for (const [section, values] of Object.entries(JSON.parse(event.data))) {
+            setSectionValues(section, values);
+        }
+        updateLastUpdated();
+    });
+}
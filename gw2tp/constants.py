@@ -97,6 +97,10 @@ TAX_RATE: float = 0.85
 
 class API:
     GW2_COMMERCE_API_URL: str = "https://api.guildwars2.com/v2/commerce/prices"
+    GW2_LISTINGS_API_URL: str = (
+        "https://api.guildwars2.com/v2/commerce/listings"
+    )
+    GW2_MAX_IDS_PER_REQUEST: int = 200
     PRODUCTION_API_URL: str = "https://gw2tp-production.up.railway.app/api/"
     DEV_API_URL: str = "http://localhost:8000/api/"
     COMMAND_PREFIX: str = "/gw2tp"
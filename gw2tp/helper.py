@@ -1,5 +1,8 @@
 import logging
 import os
+from typing import Any
+from typing import Iterator
+from typing import Sequence
 
 from gw2tp.constants import API
 
@@ -38,6 +41,18 @@ def copper_to_gsc(
     return gold, silver, copper_rest
 
 
+def get_sub_dct(
+    item_name: str,
+    copper_price: float,
+) -> dict[str, Any]:
+    g, s, c = copper_to_gsc(copper_price)
+    return {
+        f"{item_name}_g": g,
+        f"{item_name}_s": s,
+        f"{item_name}_c": c,
+    }
+
+
 def gsc_to_copper(
     gold: float,
     silver: float,
@@ -50,3 +65,11 @@ def gsc_dict_to_copper(
     dct: dict[str, float],
 ) -> float:
     return dct["profit_g"] * 10_000 + dct["profit_s"] * 100 + dct["profit_c"]
+
+
+def chunked(
+    values: Sequence[int],
+    size: int,
+) -> Iterator[list[int]]:
+    for start in range(0, len(values), size):
+        yield list(values[start : start + size])
@@ -0,0 +1,189 @@
+import asyncio
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any
+from typing import Iterator
+
+import httpx
+import pytest
+from fastapi.testclient import TestClient
+
+
+# Set before any backend import, so module-level engines never point at the
+# real database and the app never starts the scheduler.
+_TMP_DIR = Path(tempfile.mkdtemp(prefix="gw2tp-tests-"))
+os.environ["DATABASE_URL"] = str(_TMP_DIR / "unused.db")
+os.environ.setdefault("GW2TP_SCHEDULER", "0")
+
+from sqlalchemy import URL  # noqa: E402
+from sqlalchemy import Engine  # noqa: E402
+from sqlalchemy import text  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+from backend import commerce  # noqa: E402
+from backend import flips  # noqa: E402
+from backend import listings  # noqa: E402
+from backend.api import fastapi_app  # noqa: E402
+from backend.db import create_db_engine  # noqa: E402
+from backend.db import create_schema  # noqa: E402
+from backend.db import get_database_url  # noqa: E402
+from backend.db import get_db  # noqa: E402
+from backend.resilience import CircuitBreaker  # noqa: E402
+from backend.resilience import TokenBucket  # noqa: E402
+from backend.resilience import UpstreamBudget  # noqa: E402
+
+
+@contextmanager
+def _scratch_url(
+    tmp_path: Path,
+) -> Iterator[URL]:
+    # TEST_DATABASE_URL runs the storage tests against Postgres, inside a
+    # schema that is dropped afterwards.
+    value = os.getenv("TEST_DATABASE_URL")
+    if not value:
+        yield get_database_url(str(tmp_path / "test.db"))
+        return
+
+    url = get_database_url(value)
+    schema = f"gw2tp_test_{uuid.uuid4().hex[:8]}"
+    admin = create_db_engine(url)
+    with admin.begin() as conn:
+        conn.execute(text(f"CREATE SCHEMA {schema}"))
+    try:
+        yield url.update_query_dict({"options": f"-csearch_path={schema}"})
+    finally:
+        with admin.begin() as conn:
+            conn.execute(text(f"DROP SCHEMA {schema} CASCADE"))
+        admin.dispose()
+
+
+@pytest.fixture
+def engine(tmp_path: Path) -> Iterator[Engine]:
+    with _scratch_url(tmp_path) as url:
+        engine = create_db_engine(url)
+        create_schema(engine)
+        try:
+            yield engine
+        finally:
+            engine.dispose()
+
+
+@pytest.fixture
+def session(engine: Engine) -> Iterator[Session]:
+    with Session(engine) as session:
+        yield session
+
+
+@pytest.fixture
+def api_client(engine: Engine) -> Iterator[TestClient]:
+    def get_test_db() -> Iterator[Session]:
+        with Session(engine) as db:
+            yield db
+
+    fastapi_app.dependency_overrides[get_db] = get_test_db
+    try:
+        yield TestClient(fastapi_app)
+    finally:
+        fastapi_app.dependency_overrides.clear()
+
+
+class FakeUpstream:
+    """Stands in for the commerce API behind an httpx mock transport."""
+
+    def __init__(self) -> None:
+        self.item_ids = list(range(1, 1001))
+        self.calls: list[list[int]] = []
+        self.failing_ids: set[int] = set()
+        self.statuses: list[int] = []
+        self.gate: asyncio.Event | None = None
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(
+        self,
+        request: httpx.Request,
+    ) -> httpx.Response:
+        ids = request.url.params.get("ids")
+        if ids is None:
+            return httpx.Response(200, json=self.item_ids)
+        item_ids = [int(i) for i in ids.split(",")]
+        self.calls.append(item_ids)
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        try:
+            await asyncio.sleep(0)
+            if self.gate is not None:
+                await self.gate.wait()
+        finally:
+            self.active -= 1
+        if self.statuses:
+            return httpx.Response(self.statuses.pop(0))
+        if self.failing_ids.intersection(item_ids):
+            return httpx.Response(500)
+        known = [i for i in item_ids if i in self.item_ids]
+        if not known:
+            return httpx.Response(404)
+        if request.url.path.endswith("/listings"):
+            return httpx.Response(200, json=[fake_listing(i) for i in known])
+        return httpx.Response(200, json=[fake_item(i) for i in known])
+
+
+def fake_item(
+    item_id: int,
+) -> dict[str, Any]:
+    return {
+        "id": item_id,
+        "buys": {"unit_price": 100 + item_id, "quantity": 10},
+        "sells": {"unit_price": 200 + item_id, "quantity": 20},
+    }
+
+
+def _clear_caches() -> None:
+    commerce.price_cache.clear()
+    commerce.not_found_cache.clear()
+    commerce._inflight.clear()
+    listings.listings_cache.clear()
+    listings._inflight.clear()
+
+
+def fake_listing(
+    item_id: int,
+) -> dict[str, Any]:
+    return {
+        "id": item_id,
+        "buys": [{"listings": 1, "unit_price": 100, "quantity": 5}],
+        "sells": [
+            {"listings": 1, "unit_price": 200, "quantity": 5},
+            {"listings": 2, "unit_price": 300, "quantity": 10},
+        ],
+    }
+
+
+@pytest.fixture
+def upstream(monkeypatch: pytest.MonkeyPatch) -> Iterator[FakeUpstream]:
+    # Fresh budgets, breaker and caches, the module ones bind to the first
+    # event loop that uses them.
+    fake = FakeUpstream()
+    budget = UpstreamBudget(
+        limiter=TokenBucket(rate=10_000, capacity=100),
+        semaphore=asyncio.Semaphore(8),
+    )
+    monkeypatch.setattr(commerce, "request_budget", budget)
+    monkeypatch.setattr(flips, "scan_budget", budget)
+    monkeypatch.setattr(
+        commerce,
+        "circuit_breaker",
+        CircuitBreaker(failure_threshold=3, reset_timeout=60),
+    )
+    monkeypatch.setattr(commerce, "UPSTREAM_BACKOFF_BASE", 0.0)
+    monkeypatch.setattr(
+        commerce,
+        "_client",
+        httpx.AsyncClient(transport=httpx.MockTransport(fake)),
+    )
+    _clear_caches()
+    yield fake
+    _clear_caches()
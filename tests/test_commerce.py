@@ -0,0 +1,81 @@
+import asyncio
+
+import httpx
+import pytest
+from conftest import FakeUpstream
+
+from backend import commerce
+
+
+ITEM_IDS = list(range(1, 451))
+
+
+def test_overlapping_requests_share_one_call_per_chunk(
+    upstream: FakeUpstream,
+) -> None:
+    async def run() -> list[dict[int, dict]]:
+        upstream.gate = asyncio.Event()
+        requests = [ITEM_IDS] * 5 + [
+            ITEM_IDS[start : start + 200] for start in range(0, 250, 50)
+        ]
+        tasks = [
+            asyncio.create_task(commerce.fetch_tp_prices(item_ids))
+            for item_ids in requests
+        ]
+        await asyncio.sleep(0.01)
+        upstream.gate.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+
+    assert sorted(len(call) for call in upstream.calls) == [50, 200, 200]
+    assert sorted(i for call in upstream.calls for i in call) == ITEM_IDS
+    assert all(len(result) == 450 for result in results[:5])
+    assert all(len(result) == 200 for result in results[5:])
+    assert not commerce._inflight
+
+
+def test_cancelled_waiter_keeps_the_shared_request(
+    upstream: FakeUpstream,
+) -> None:
+    async def run() -> dict[int, dict]:
+        upstream.gate = asyncio.Event()
+        cancelled = asyncio.create_task(commerce.fetch_tp_prices(ITEM_IDS))
+        waiter = asyncio.create_task(commerce.fetch_tp_prices(ITEM_IDS))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        await asyncio.sleep(0.01)
+        upstream.gate.set()
+        assert cancelled.cancelled()
+        return await waiter
+
+    result = asyncio.run(run())
+
+    assert len(upstream.calls) == 3
+    assert result[1]["buy"] == 101
+    assert len(result) == len(ITEM_IDS)
+    cached, missing = commerce.price_cache.get_many(ITEM_IDS)
+    assert not missing
+    assert len(cached) == len(ITEM_IDS)
+
+
+def test_chunked_fetch_keeps_the_successful_chunks(
+    upstream: FakeUpstream,
+) -> None:
+    upstream.failing_ids = {250}
+
+    prices = asyncio.run(commerce.fetch_upstream_prices_chunked(ITEM_IDS))
+
+    assert sorted(prices) == ITEM_IDS[:200] + ITEM_IDS[400:]
+    cached, missing = commerce.price_cache.get_many(ITEM_IDS)
+    assert sorted(cached) == sorted(prices)
+    assert missing == ITEM_IDS[200:400]
+
+
+def test_chunked_fetch_raises_when_every_chunk_fails(
+    upstream: FakeUpstream,
+) -> None:
+    upstream.failing_ids = {1, 250}
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(commerce.fetch_raw_prices_chunked(ITEM_IDS[:400]))
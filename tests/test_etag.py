@@ -0,0 +1,92 @@
+from typing import Any
+from typing import Iterator
+
+import pytest
+from conftest import FakeUpstream
+from conftest import fake_item
+from fastapi.testclient import TestClient
+
+from gw2tp.constants import ItemIDs
+
+from backend.api import fastapi_app
+from backend.commerce import parse_price_item
+from backend.snapshot import SNAPSHOT_ITEM_IDS
+from backend.snapshot import snapshot
+
+
+def _snapshot_prices(
+    offset: int = 0,
+) -> dict[int, dict[str, Any]]:
+    return {
+        item_id: parse_price_item(fake_item(item_id + offset))
+        for item_id in SNAPSHOT_ITEM_IDS
+    }
+
+
+@pytest.fixture
+def client(monkeypatch: pytest.MonkeyPatch) -> Iterator[TestClient]:
+    for name in ("prices", "version", "updated_at", "etag"):
+        monkeypatch.setattr(snapshot, name, getattr(snapshot, name))
+    monkeypatch.setattr(snapshot, "listeners", [])
+    snapshot.update(_snapshot_prices())
+    yield TestClient(fastapi_app)
+
+
+def test_matching_if_none_match_returns_304(client: TestClient) -> None:
+    params = {"item_id": ItemIDs.ECTOPLASM}
+    response = client.get("/price", params=params)
+    etag = response.headers["ETag"]
+
+    cached = client.get(
+        "/price", params=params, headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 200
+    assert cached.status_code == 304
+    assert cached.headers["ETag"] == etag
+    assert not cached.content
+
+
+def test_refreshed_snapshot_changes_the_etag(client: TestClient) -> None:
+    params = {"item_id": ItemIDs.ECTOPLASM}
+    etag = client.get("/price", params=params).headers["ETag"]
+
+    snapshot.update(_snapshot_prices(offset=1))
+    response = client.get(
+        "/price", params=params, headers={"If-None-Match": etag}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["ETag"] != etag
+
+
+def test_unchanged_prices_keep_the_etag(client: TestClient) -> None:
+    etag = snapshot.etag
+
+    snapshot.update(_snapshot_prices())
+
+    assert snapshot.etag == etag
+
+
+@pytest.mark.parametrize(
+    ("path", "params"),
+    [
+        ("/cache_stats", {}),
+        ("/price", {"item_id": 1}),
+        ("/batch", {"sections": "scholar_rune", "item_ids": "1"}),
+        ("/scholar_rune", {"depth": 5}),
+    ],
+)
+def test_routes_outside_the_allow_list_send_no_etag(
+    client: TestClient,
+    upstream: FakeUpstream,
+    path: str,
+    params: dict[str, Any],
+) -> None:
+    response = client.get(path, params=params)
+
+    assert response.status_code == 200
+    assert "ETag" not in response.headers
+    assert client.get(
+        path, params=params, headers={"If-None-Match": snapshot.etag or ""}
+    ).status_code != 304
@@ -0,0 +1,35 @@
+import asyncio
+
+import httpx
+import pytest
+from conftest import FakeUpstream
+
+from backend.flips import MarketScanner
+from backend.resilience import CircuitOpenError
+
+
+def test_scan_survives_one_failing_chunk(upstream: FakeUpstream) -> None:
+    upstream.failing_ids = {450}
+    scanner = MarketScanner()
+
+    asyncio.run(scanner.refresh())
+
+    assert scanner.scan is not None
+    scanned = set(scanner.scan.item_ids.tolist())
+    assert len(scanned) == len(upstream.item_ids) - 200
+    assert scanned.isdisjoint(range(401, 601))
+    assert scanner.scan.top(limit=1)[0]["margin"] > 0
+
+
+def test_scan_keeps_the_previous_result_when_every_chunk_fails(
+    upstream: FakeUpstream,
+) -> None:
+    scanner = MarketScanner()
+    asyncio.run(scanner.refresh())
+    previous = scanner.scan
+    upstream.failing_ids = set(upstream.item_ids)
+
+    with pytest.raises((httpx.HTTPStatusError, CircuitOpenError)):
+        asyncio.run(scanner.refresh())
+
+    assert scanner.scan is previous
@@ -0,0 +1,191 @@
+import datetime
+
+import numpy as np
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy.orm import Session
+
+from backend import api
+from backend.db_schema import HistoryCursor
+from backend.db_schema import PriceHistory
+from backend.db_schema import PriceHistoryRollup
+from backend.db_schema import get_db_data
+from backend.history import aggregate_columns
+from backend.history import history_records
+from backend.history import lttb_indices
+
+
+ITEM_KEY = "scholar_rune"
+START = datetime.datetime(2026, 1, 1)
+
+
+def _columns(
+    minutes: list[int],
+    sell: list[float],
+) -> dict[str, np.ndarray]:
+    ts = [START + datetime.timedelta(minutes=m) for m in minutes]
+    nan = np.full(len(minutes), np.nan)
+    return {
+        "ts": np.array(ts, dtype="datetime64[us]"),
+        "buy_copper": nan,
+        "sell_copper": np.array(sell, dtype=np.float64),
+        "crafting_cost_copper": nan,
+        "profit_copper": nan,
+    }
+
+
+COLUMNS = _columns([0, 20, 40, 60, 90], [10, 30, np.nan, 5, 7])
+
+
+def test_aggregate_mean_skips_missing_values() -> None:
+    aggregated = aggregate_columns(COLUMNS, "1h", "mean")
+    records = history_records(aggregated)
+
+    assert [r["ts"] for r in records] == [
+        "2026-01-01T00:00:00.000000",
+        "2026-01-01T01:00:00.000000",
+    ]
+    assert [r["sell_copper"] for r in records] == [20, 6]
+    assert [r["buy_copper"] for r in records] == [None, None]
+
+
+def test_aggregate_last_takes_the_bucket_close() -> None:
+    aggregated = aggregate_columns(COLUMNS, "1h", "last")
+
+    assert np.isnan(aggregated["sell_copper"][0])
+    assert aggregated["sell_copper"][1] == 7
+
+
+def test_aggregate_ohlc() -> None:
+    aggregated = aggregate_columns(COLUMNS, "1h", "ohlc")
+
+    assert aggregated["sell_copper_open"].tolist() == [10, 5]
+    assert aggregated["sell_copper_high"].tolist() == [30, 7]
+    assert aggregated["sell_copper_low"].tolist() == [10, 5]
+    assert np.isnan(aggregated["sell_copper_close"][0])
+    assert aggregated["sell_copper_close"][1] == 7
+    assert "sell_copper" not in aggregated
+
+
+def test_lttb_keeps_the_ends_and_the_spike() -> None:
+    x = np.arange(100, dtype=np.float64)
+    y = np.zeros(100)
+    y[37] = 1000.0
+
+    indices = lttb_indices(x, y, 10)
+
+    assert len(indices) == 10
+    assert indices[0] == 0
+    assert indices[-1] == 99
+    assert 37 in indices
+    assert np.all(np.diff(indices) > 0)
+
+
+def test_lttb_returns_short_series_unchanged() -> None:
+    x = np.arange(5, dtype=np.float64)
+
+    assert lttb_indices(x, x, 10).tolist() == [0, 1, 2, 3, 4]
+
+
+def _add_tied_rows(
+    session: Session,
+) -> list[tuple[datetime.datetime, int]]:
+    # Three rows per timestamp, so page boundaries land inside a tie.
+    for minute in range(0, 50, 10):
+        for sell in range(3):
+            session.add(
+                PriceHistory(
+                    item_key=ITEM_KEY,
+                    ts=START + datetime.timedelta(minutes=minute),
+                    sell_copper=minute * 10 + sell,
+                )
+            )
+    session.commit()
+    return [
+        (row.ts, row.sell_copper)
+        for row in get_db_data(session, ITEM_KEY, START)
+    ]
+
+
+def _walk_pages(
+    client: TestClient,
+    limit: int,
+) -> list[tuple[str, int]]:
+    params: dict[str, str | int] = {
+        "item_name": ITEM_KEY,
+        "start": START.isoformat(),
+        "end": (START + datetime.timedelta(days=1)).isoformat(),
+        "limit": limit,
+    }
+    seen: list[tuple[str, int]] = []
+    while True:
+        response = client.get("/history", params=params)
+        assert response.status_code == 200
+        seen.extend((r["ts"], r["sell_copper"]) for r in response.json())
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            return seen
+        ts, row_id = next_cursor.split(",")
+        assert datetime.datetime.fromisoformat(ts)
+        assert int(row_id)
+        params["cursor"] = next_cursor
+
+
+@pytest.mark.parametrize("limit", [1, 2, 4, 5])
+def test_cursor_pages_split_tied_timestamps(
+    session: Session,
+    api_client: TestClient,
+    limit: int,
+) -> None:
+    rows = _add_tied_rows(session)
+
+    seen = _walk_pages(api_client, limit)
+
+    assert len(seen) == len(rows) == 15
+    assert [sell for _, sell in seen] == [sell for _, sell in rows]
+
+
+def test_cursor_pages_cover_rollup_and_raw_ties(
+    session: Session,
+    api_client: TestClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(api, "RETENTION_ROLLUP", "1h")
+    rows = _add_tied_rows(session)
+    session.add(
+        PriceHistoryRollup(
+            item_key=ITEM_KEY,
+            bucket="1h",
+            ts=START,
+            samples=4,
+            sell_copper=999,
+        )
+    )
+    session.commit()
+
+    seen = _walk_pages(api_client, 2)
+
+    assert [sell for _, sell in seen] == [999] + [sell for _, sell in rows]
+
+
+def test_timestamp_only_cursor_is_still_accepted(
+    session: Session,
+) -> None:
+    _add_tied_rows(session)
+
+    rows = get_db_data(
+        session,
+        ITEM_KEY,
+        START,
+        after=HistoryCursor(START + datetime.timedelta(minutes=30)),
+    )
+
+    assert [row.sell_copper for row in rows] == [400, 401, 402]
+
+
+def test_invalid_cursor_is_rejected(api_client: TestClient) -> None:
+    response = api_client.get(
+        "/history", params={"item_name": ITEM_KEY, "cursor": "not-a-ts,1"}
+    )
+
+    assert response.status_code == 400
@@ -0,0 +1,45 @@
+import asyncio
+
+import pytest
+from conftest import FakeUpstream
+
+from backend import commerce
+from backend.listings import fetch_listings
+from backend.resilience import UpstreamBudget
+
+
+ITEM_IDS = list(range(1, 451))
+
+
+def test_listings_share_one_call_per_chunk(upstream: FakeUpstream) -> None:
+    async def run() -> list[dict[int, dict]]:
+        upstream.gate = asyncio.Event()
+        tasks = [
+            asyncio.create_task(fetch_listings(ITEM_IDS)) for _ in range(5)
+        ]
+        await asyncio.sleep(0.01)
+        upstream.gate.set()
+        return await asyncio.gather(*tasks)
+
+    results = asyncio.run(run())
+
+    assert sorted(len(call) for call in upstream.calls) == [50, 200, 200]
+    assert all(len(result) == len(ITEM_IDS) for result in results)
+    assert results[0][1]["sells"].fill_cost(10) == 5 * 200 + 5 * 300
+
+
+def test_listings_hold_the_request_budget(
+    upstream: FakeUpstream,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    budget = commerce.request_budget
+    monkeypatch.setattr(
+        commerce,
+        "request_budget",
+        UpstreamBudget(limiter=budget.limiter, semaphore=asyncio.Semaphore(1)),
+    )
+
+    asyncio.run(fetch_listings(ITEM_IDS))
+
+    assert len(upstream.calls) == 3
+    assert upstream.max_active == 1
@@ -0,0 +1,67 @@
+import random
+from typing import Any
+
+import pytest
+
+from gw2tp.constants import ItemIDs
+
+from backend.recipes import RECIPE_MATRIX
+from backend.recipes import RECIPES
+from backend.recipes import evaluate_all
+from backend.recipes import evaluate_recipe
+from backend.recipes import recipe_path_costs
+
+
+def _prices(
+    seed: int,
+    crystal: int,
+    mote: int,
+) -> dict[int, dict[str, Any]]:
+    rng = random.Random(seed)
+    prices = {}
+    for item_id in RECIPE_MATRIX.item_ids:
+        buy = rng.randint(1, 200_000)
+        prices[item_id] = {"buy": buy, "sell": buy + rng.randint(0, 50_000)}
+    prices[ItemIDs.PILE_OF_LUCENT_CRYSTAL] = {"buy": crystal, "sell": crystal}
+    prices[ItemIDs.LUCENT_MOTE] = {"buy": mote, "sell": mote}
+    return prices
+
+
+@pytest.mark.parametrize(
+    ("crystal", "mote"),
+    [(150, 20), (250, 20)],
+    ids=["crystal-cheaper", "mote-cheaper"],
+)
+@pytest.mark.parametrize("seed", range(5))
+def test_evaluate_all_matches_evaluate_recipe(
+    seed: int,
+    crystal: int,
+    mote: int,
+) -> None:
+    prices = _prices(seed, crystal, mote)
+
+    results = evaluate_all(prices)
+
+    assert list(results) == list(RECIPES)
+    for name, recipe in RECIPES.items():
+        assert results[name] == evaluate_recipe(recipe, prices), name
+
+
+@pytest.mark.parametrize(
+    ("crystal", "mote", "path"),
+    [(150, 20, 0), (250, 20, 1)],
+)
+def test_lucent_alternatives_use_the_cheaper_path(
+    crystal: int,
+    mote: int,
+    path: int,
+) -> None:
+    prices = _prices(0, crystal, mote)
+    recipe = RECIPES["scholar_rune"]
+
+    costs = recipe_path_costs(recipe, prices)
+    result = RECIPE_MATRIX.evaluate(prices)
+
+    assert min(costs) == costs[path]
+    index = RECIPE_MATRIX.names.index(recipe.name)
+    assert result.crafting_cost[index] == costs[path]
@@ -0,0 +1,88 @@
+import asyncio
+
+import httpx
+import pytest
+from conftest import FakeUpstream
+from conftest import fake_item
+
+from backend import commerce
+from backend.resilience import CircuitOpenError
+from backend.snapshot import get_prices
+from backend.snapshot import is_stale
+
+
+@pytest.fixture(autouse=True)
+def retries(monkeypatch: pytest.MonkeyPatch) -> int:
+    monkeypatch.setattr(commerce, "UPSTREAM_RETRIES", 2)
+    return 2
+
+
+def test_breaker_opens_after_the_threshold(
+    upstream: FakeUpstream,
+    retries: int,
+) -> None:
+    upstream.failing_ids = {1}
+    breaker = commerce.circuit_breaker
+
+    for _ in range(breaker.failure_threshold):
+        with pytest.raises(httpx.HTTPStatusError):
+            asyncio.run(commerce.fetch_raw_prices([1]))
+
+    assert breaker.state == "open"
+    calls = len(upstream.calls)
+    assert calls == breaker.failure_threshold * (retries + 1)
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(commerce.fetch_raw_prices([1]))
+    assert len(upstream.calls) == calls
+
+
+@pytest.mark.parametrize("status", [429, 500, 502, 503, 504])
+def test_retryable_statuses_are_retried(
+    upstream: FakeUpstream,
+    status: int,
+) -> None:
+    upstream.statuses = [status, status]
+
+    data = asyncio.run(commerce.fetch_raw_prices([1]))
+
+    assert data == [fake_item(1)]
+    assert len(upstream.calls) == 3
+    assert commerce.circuit_breaker.state == "closed"
+
+
+def test_client_errors_are_not_retried(upstream: FakeUpstream) -> None:
+    upstream.statuses = [400]
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(commerce.fetch_raw_prices([1]))
+
+    assert len(upstream.calls) == 1
+
+
+def test_get_prices_serves_stale_prices_when_upstream_is_down(
+    upstream: FakeUpstream,
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    async def run() -> tuple[dict[int, dict], bool]:
+        fresh = await get_prices([1, 2])
+        assert not is_stale()
+        # Expire every cached price and take the API down.
+        monkeypatch.setattr(commerce.price_cache, "ttl", -1.0)
+        upstream.failing_ids = {1, 2}
+        prices = await get_prices([1, 2])
+        assert prices == fresh
+        return prices, is_stale()
+
+    prices, stale = asyncio.run(run())
+
+    assert sorted(prices) == [1, 2]
+    assert stale
+
+
+def test_get_prices_raises_without_a_stale_copy(
+    upstream: FakeUpstream,
+) -> None:
+    upstream.failing_ids = {1}
+
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(get_prices([1]))
@@ -0,0 +1,55 @@
+import datetime
+
+from sqlalchemy import func
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.db_schema import PriceHistory
+from backend.db_schema import PriceHistoryRollup
+from backend.db_schema import timestamp_now
+from backend.retention import cleanup_old_records
+
+
+def _add_row(
+    session: Session,
+    ts: datetime.datetime,
+    sell: int,
+) -> None:
+    session.add(
+        PriceHistory(
+            item_key="scholar_rune",
+            ts=ts,
+            buy_copper=sell - 10,
+            sell_copper=sell,
+            crafting_cost_copper=sell - 20,
+            profit_copper=20,
+        )
+    )
+
+
+def test_cleanup_cutoff_uses_writer_clock(session: Session) -> None:
+    cutoff = timestamp_now() - datetime.timedelta(days=7)
+    _add_row(session, cutoff + datetime.timedelta(minutes=1), 100)
+    _add_row(session, cutoff - datetime.timedelta(minutes=1), 200)
+    session.commit()
+
+    deleted = cleanup_old_records(session, days=7, rollup="1h")
+
+    assert deleted == 1
+    assert session.scalars(select(PriceHistory.sell_copper)).all() == [100]
+    rollup = session.scalars(select(PriceHistoryRollup)).one()
+    assert rollup.sell_copper == 200
+    assert rollup.samples == 1
+
+
+def test_cleanup_without_rollup_only_deletes(session: Session) -> None:
+    now = timestamp_now()
+    for days in (1, 8, 9):
+        _add_row(session, now - datetime.timedelta(days=days), 100 * days)
+    session.commit()
+
+    deleted = cleanup_old_records(session, days=7, rollup="")
+
+    assert deleted == 2
+    assert session.scalar(select(func.count(PriceHistory.id))) == 1
+    assert session.scalar(select(func.count(PriceHistoryRollup.id))) == 0
@@ -0,0 +1,129 @@
+import datetime
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import Column
+from sqlalchemy import DateTime
+from sqlalchemy import Engine
+from sqlalchemy import Integer
+from sqlalchemy import MetaData
+from sqlalchemy import Table
+from sqlalchemy import func
+from sqlalchemy import inspect
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from backend.db import migrate_legacy_tables
+from backend.db_schema import PriceHistory
+from backend.db_schema import PriceHistoryRollup
+from backend.db_schema import timestamp_now
+from backend.retention import cleanup_old_records
+
+
+LEGACY_TABLE = "scholar_rune"
+LEGACY_ROWS = 500
+RETENTION_DAYS = 7
+PAGE_SIZE = 64
+
+
+@pytest.fixture
+def now() -> datetime.datetime:
+    return timestamp_now().replace(microsecond=0)
+
+
+@pytest.fixture
+def legacy_engine(
+    engine: Engine,
+    now: datetime.datetime,
+) -> Engine:
+    table = Table(
+        LEGACY_TABLE,
+        MetaData(),
+        Column("id", Integer, primary_key=True),
+        Column("timestamp", DateTime),
+        *(
+            Column(f"{key}_{unit}", Integer)
+            for key in ("sell", "crafting_cost")
+            for unit in "gsc"
+        ),
+    )
+    # One row per hour, half an hour off the hour so none sits on the
+    # retention cutoff.
+    rows = [
+        {
+            "timestamp": now - datetime.timedelta(hours=hours, minutes=30),
+            "sell_g": 1,
+            "sell_s": hours % 100,
+            "sell_c": 0,
+            "crafting_cost_g": 0,
+            "crafting_cost_s": 50,
+            "crafting_cost_c": 0,
+        }
+        for hours in range(LEGACY_ROWS)
+    ]
+    with engine.begin() as conn:
+        table.create(conn)
+        conn.execute(table.insert(), rows)
+    return engine
+
+
+def _history_count(
+    db: Session,
+) -> int:
+    return db.scalar(
+        select(func.count()).where(PriceHistory.item_key == LEGACY_TABLE)
+    )
+
+
+def test_legacy_rows_migrate_exactly_once(legacy_engine: Engine) -> None:
+    migrate_legacy_tables(legacy_engine)
+    migrate_legacy_tables(legacy_engine)
+
+    assert not inspect(legacy_engine).has_table(LEGACY_TABLE)
+    with Session(legacy_engine) as db:
+        assert _history_count(db) == LEGACY_ROWS
+
+
+def test_history_pages_return_every_row_once(
+    legacy_engine: Engine,
+    api_client: TestClient,
+    now: datetime.datetime,
+) -> None:
+    migrate_legacy_tables(legacy_engine)
+    params = {
+        "item_name": LEGACY_TABLE,
+        "start": (now - datetime.timedelta(hours=LEGACY_ROWS + 1)).isoformat(),
+        "end": now.isoformat(),
+        "limit": PAGE_SIZE,
+    }
+    timestamps: list[str] = []
+    pages = 0
+    while True:
+        response = api_client.get("/history", params=params)
+        assert response.status_code == 200
+        timestamps.extend(record["ts"] for record in response.json())
+        pages += 1
+        next_cursor = response.headers.get("X-Next-Cursor")
+        if next_cursor is None:
+            break
+        params["cursor"] = next_cursor
+
+    assert pages == -(-LEGACY_ROWS // PAGE_SIZE)
+    assert len(timestamps) == LEGACY_ROWS
+    assert timestamps == sorted(set(timestamps))
+
+
+def test_retention_removes_exactly_the_expired_rows(
+    legacy_engine: Engine,
+) -> None:
+    migrate_legacy_tables(legacy_engine)
+    with Session(legacy_engine) as db:
+        deleted = cleanup_old_records(
+            db, days=RETENTION_DAYS, batch_size=50, rollup="1h"
+        )
+        expired = LEGACY_ROWS - RETENTION_DAYS * 24
+
+        assert deleted == expired
+        assert _history_count(db) == LEGACY_ROWS - expired
+        rolled_up = db.scalar(select(func.sum(PriceHistoryRollup.samples)))
+        assert rolled_up == expired
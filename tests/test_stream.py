@@ -0,0 +1,69 @@
+import asyncio
+from typing import Any
+
+import pytest
+from conftest import fake_item
+
+from backend import stream
+from backend.commerce import parse_price_item
+from backend.snapshot import SNAPSHOT_ITEM_IDS
+from backend.snapshot import snapshot
+from backend.stream import PriceBroadcaster
+
+
+def _prices(
+    offset: int = 0,
+) -> dict[int, dict[str, Any]]:
+    return {
+        item_id: parse_price_item(fake_item(item_id + offset))
+        for item_id in SNAPSHOT_ITEM_IDS
+    }
+
+
+def test_snapshot_without_subscribers_does_no_work(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    calls: list[int] = []
+    monkeypatch.setattr(
+        stream, "compute_sections", lambda *args: calls.append(1)
+    )
+    broadcaster = PriceBroadcaster()
+
+    broadcaster.on_snapshot({}, _prices())
+
+    assert not calls
+
+
+def test_first_subscriber_diffs_against_the_current_snapshot(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    broadcaster = PriceBroadcaster()
+    old_prices = _prices()
+    broadcaster.on_snapshot({}, old_prices)
+    monkeypatch.setattr(snapshot, "prices", old_prices)
+
+    async def run() -> list[stream.StreamEvent]:
+        queue = broadcaster.subscribe()
+        broadcaster.on_snapshot(old_prices, old_prices)
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    assert asyncio.run(run()) == []
+
+
+def test_subscriber_receives_price_and_section_changes(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    broadcaster = PriceBroadcaster()
+    old_prices = _prices()
+    new_prices = _prices(offset=1)
+    monkeypatch.setattr(snapshot, "prices", old_prices)
+
+    async def run() -> list[stream.StreamEvent]:
+        queue = broadcaster.subscribe()
+        broadcaster.on_snapshot(old_prices, new_prices)
+        return [queue.get_nowait() for _ in range(queue.qsize())]
+
+    events = asyncio.run(run())
+
+    assert [event.name for event in events] == ["prices", "sections"]
+    assert len(events[0].data) == len(SNAPSHOT_ITEM_IDS)